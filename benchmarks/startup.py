@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the command-line interface.
+
+Measures how long ``import src.cli`` takes, as reported by ``python -X
+importtime``, and how long whole CLI commands take against stores of
+different sizes and backends. Every figure is the best of several runs, in
+milliseconds.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--tasks N ...] [--max-import-ms MS]
+
+With --max-import-ms the script exits with status 1 when the import takes
+longer, so it can guard startup time in CI.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_DIR)
+
+from src.models.task import Task
+from src.services.storage import JsonStorage
+
+# One line of -X importtime output: self time, cumulative time, module
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_times(module: str, runs: int) -> Dict[str, float]:
+    """
+    Measure the import of a module and of its direct imports.
+
+    Args:
+        module: Module to import in a fresh interpreter
+        runs: Number of interpreters to start
+
+    Returns:
+        Best cumulative import time in milliseconds per module, for the
+        module itself and the modules it imports directly
+    """
+    best: Dict[str, float] = {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        )
+        # A module is reported after its imports, which are indented one
+        # level deeper; the interpreter's own startup imports come first
+        children: Dict[str, float] = {}
+        for match in filter(None, map(_IMPORTTIME_RE.match, result.stderr.splitlines())):
+            name, depth, cumulative = match.group(4), len(match.group(3)), int(match.group(2)) / 1000
+            if depth == 0:
+                if name == module:
+                    children[name] = cumulative
+                    break
+                children = {}
+            elif depth == 2:
+                children[name] = cumulative
+        for name, cumulative in children.items():
+            best[name] = min(best.get(name, cumulative), cumulative)
+    return best
+
+
+def command_time(cli: str, args: List[str], env: Dict[str, str], runs: int) -> float:
+    """
+    Measure a CLI command from process start to exit.
+
+    Args:
+        cli: Path of the cli.py to run
+        args: Command-line arguments
+        env: Environment of the process
+        runs: Number of runs
+
+    Returns:
+        Best wall-clock time in milliseconds
+    """
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, cli] + args, env=env, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def cli_project(directory: str) -> Tuple[str, str]:
+    """
+    Set up a project directory that runs the real CLI.
+
+    The CLI keeps its store in <project>/config, so benchmarks run it from a
+    project directory whose src links to the real one.
+
+    Args:
+        directory: Empty directory to set up
+
+    Returns:
+        The path of the cli.py to run and of the store it uses
+    """
+    os.symlink(os.path.join(PROJECT_DIR, "src"), os.path.join(directory, "src"))
+    store = os.path.join(directory, "config", "tasks.json")
+    os.makedirs(os.path.dirname(store))
+    return os.path.join(directory, "src", "cli.py"), store
+
+
+def write_store(path: str, count: int) -> None:
+    """Write a store of ``count`` tasks."""
+    tasks = [
+        Task.restore(i, f"Task {i}", f"Description of task {i}", "medium", i % 2 == 0, 1700000000 + i)
+        for i in range(1, count + 1)
+    ]
+    JsonStorage(path, durability="none").save(tasks)
+
+
+def main() -> int:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description="Measure CLI startup time")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per measurement")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[0, 100000], help="Store sizes")
+    parser.add_argument("--max-import-ms", type=float, help="Fail if importing src.cli takes longer")
+    args = parser.parse_args()
+
+    imports = import_times("src.cli", args.runs)
+    print("import src.cli (-X importtime, cumulative ms)")
+    for name, ms in sorted(imports.items(), key=lambda item: -item[1]):
+        print(f"  {ms:8.1f}  {name}")
+
+    print("\nCLI commands (wall clock ms)")
+    print(f"  {'tasks':>8}  {'backend':<8} {'add':>8} {'complete':>8} {'view':>8}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cli, store = cli_project(temp_dir)
+        for count in args.tasks:
+            for backend in ("json", "log"):
+                env = dict(os.environ, TASK_MANAGER_STORAGE=backend, TASK_MANAGER_DURABILITY="none")
+                for stale in (store, f"{store}.log"):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+                write_store(store, count)
+                timings = [
+                    command_time(cli, ["add", "Benchmark"], env, args.runs),
+                    command_time(cli, ["complete", str(count + 1)], env, args.runs),
+                    command_time(cli, ["view", str(count + 1)], env, args.runs),
+                ]
+                print(f"  {count:>8}  {backend:<8} " + " ".join(f"{ms:8.1f}" for ms in timings))
+
+    if args.max_import_ms is not None and imports["src.cli"] > args.max_import_ms:
+        print(f"\nimport src.cli took {imports['src.cli']:.1f} ms, over the {args.max_import_ms} ms limit")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the task service and CLI hot paths.
+
+Builds synthetic stores of several sizes, with titles and descriptions of
+varied length, and times loading and saving the store, adding tasks, id
+lookups, keyword search, the status and priority filters, and CLI commands
+started from a cold interpreter. Every figure is the best of several runs;
+throughput is in tasks (for load and save) or operations per second, and
+peak memory is what the operation allocated on top of the loaded store
+(for CLI commands: the peak resident size of the process).
+
+Results are compared against a stored baseline, and the script exits with
+status 1 when an operation got slower or hungrier than the baseline by more
+than the tolerance, so it can guard against regressions in CI.
+
+Usage:
+    python benchmarks/suite.py [--sizes N ...] [--repeat N] [--backend json|log]
+                               [--baseline FILE] [--save-baseline] [--tolerance F]
+                               [--no-memory]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from startup import PROJECT_DIR, cli_project
+
+from src.models.task import Task
+from src.services.storage import JsonStorage, create_storage
+from src.services.task_service import TaskService
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_BASELINE = os.path.join(PROJECT_DIR, "benchmarks", "baseline.json")
+
+# Operations per timed run of the per-operation benchmarks
+ADDS = 100
+LOOKUPS = 10000
+QUERIES = 100
+
+# Keywords searched: one in most tasks, one in about 0.1% of them, one in none
+COMMON_WORD = "report"
+RARE_WORD = "zeppelin"
+MISSING_WORD = "xylophone"
+
+# Differences below these are noise, whatever the tolerance
+MIN_SECONDS_DELTA = 0.005
+MIN_PEAK_MB_DELTA = 1.0
+
+_WORDS = (
+    "report meeting budget review client deploy server fix update plan draft "
+    "invoice call email design test release backlog sprint ticket urgent "
+    "follow-up quarterly numbers présentation réunion ünïcode 日本語 notes"
+).split()
+
+# name -> (function running one timed run, operations per run)
+Benchmarks = Dict[str, Tuple[Callable[[], object], int]]
+
+
+def make_tasks(count: int, seed: int = 42) -> List[Task]:
+    """
+    Build a reproducible list of synthetic tasks.
+
+    Titles run from 1 to 12 words. Two in five descriptions are empty, two
+    are a sentence or two and one is several paragraphs long.
+
+    Args:
+        count: Number of tasks
+        seed: Seed of the random generator
+
+    Returns:
+        Tasks with ids 1 to count
+    """
+    rng = random.Random(seed)
+    priorities = ("low", "medium", "high")
+    tasks = []
+    for i in range(1, count + 1):
+        title = " ".join(rng.choices(_WORDS, k=rng.randint(1, 12)))
+        kind = rng.random()
+        if kind < 0.4:
+            description = ""
+        elif kind < 0.8:
+            description = " ".join(rng.choices(_WORDS, k=rng.randint(5, 30)))
+        else:
+            description = " ".join(rng.choices(_WORDS, k=rng.randint(50, 300)))
+        if i % 1000 == 7:
+            description += f" {RARE_WORD}"
+        tasks.append(Task.restore(
+            i, title, description, rng.choice(priorities), rng.random() < 0.3, 1700000000 + i * 60
+        ))
+    return tasks
+
+
+def service_benchmarks(service: TaskService, count: int, seed: int = 42) -> Benchmarks:
+    """
+    Return the in-process benchmarks, run against a loaded service.
+
+    Args:
+        service: Service holding the synthetic store
+        count: Number of tasks in the store
+        seed: Seed of the random ids looked up
+
+    Returns:
+        Benchmarks by name
+    """
+    rng = random.Random(seed)
+    ids = [rng.randint(1, count) for _ in range(LOOKUPS)]
+
+    def add_tasks():
+        for i in range(ADDS):
+            service.add_task(f"Benchmark task {i}", "Added by the benchmark", "medium")
+
+    def lookups():
+        for task_id in ids:
+            service.get_task_by_id(task_id)
+
+    def build_search_index():
+        service._search_index = None
+        service.search_tasks(MISSING_WORD)
+
+    def searches():
+        for keyword in (COMMON_WORD, RARE_WORD, MISSING_WORD):
+            service.search_tasks(keyword)
+
+    def repeat(query: Callable[[], object]) -> Callable[[], None]:
+        def run():
+            for _ in range(QUERIES):
+                query()
+        return run
+
+    return {
+        "load_tasks": (service._load_tasks, count),
+        "save_tasks": (service._save_tasks, count),
+        "add_task": (add_tasks, ADDS),
+        "get_task_by_id": (lookups, LOOKUPS),
+        "search_index_build": (build_search_index, count),
+        "search_tasks": (searches, 3),
+        "filter_open_tasks": (lambda: service.query(completed=False), 1),
+        "filter_priority_page": (repeat(lambda: service.query(priority="high", limit=25, sort_by="created_at")), QUERIES),
+        "sort_priority_page": (repeat(lambda: service.get_all_tasks(sort_by="priority", limit=25)), QUERIES),
+        "count_tasks": (repeat(lambda: service.count_tasks(show_completed=False, priority="high")), QUERIES),
+    }
+
+
+def run_cli(cli: str, args: List[str], env: Dict[str, str]) -> Tuple[float, float]:
+    """
+    Run a CLI command in a fresh interpreter.
+
+    Args:
+        cli: Path of the cli.py to run
+        args: Command-line arguments
+        env: Environment of the process
+
+    Returns:
+        Wall-clock seconds and peak resident size in megabytes
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, cli] + args, env=env, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, [cli] + args)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return elapsed, usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def measure(run: Callable[[], object], operations: int, repeat: int, memory: bool) -> Dict[str, float]:
+    """
+    Time a benchmark and measure the memory it allocates.
+
+    Args:
+        run: Function doing one timed run
+        operations: Operations per run
+        repeat: Number of timed runs
+        memory: Whether to do one more run under tracemalloc, which is slow
+
+    Returns:
+        Best seconds per run, operations per second and peak megabytes
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    result = {"seconds": best, "ops_per_sec": operations / best if best else float("inf")}
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_size(count: int, backend: str, repeat: int, memory: bool) -> Dict[str, Dict[str, float]]:
+    """
+    Run every benchmark against a store of the given size.
+
+    Args:
+        count: Number of tasks in the store
+        backend: Storage backend of the service and the CLI
+        repeat: Number of timed runs per benchmark
+        memory: Whether to measure peak memory
+
+    Returns:
+        Results by benchmark name
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cli, store = cli_project(temp_dir)
+        JsonStorage(store, durability="none").save(make_tasks(count))
+
+        service = TaskService(store, storage=create_storage(store, backend, durability="none"))
+        for name, (run, operations) in service_benchmarks(service, count).items():
+            results[name] = measure(run, operations, repeat, memory)
+            print(f"  {count:>8}  {name:<22} {format_result(results[name])}", flush=True)
+        service.close()
+
+        env = dict(os.environ, TASK_MANAGER_STORAGE=backend, TASK_MANAGER_DURABILITY="none")
+        commands = {
+            "cli_view": ["view", str(count // 2)],
+            "cli_list": ["list", "-n", "10"],
+            "cli_search": ["search", RARE_WORD],
+            "cli_add": ["add", "Benchmark"],
+        }
+        for name, args in commands.items():
+            runs = [run_cli(cli, args, env) for _ in range(repeat)]
+            best = min(seconds for seconds, _ in runs)
+            results[name] = {"seconds": best, "ops_per_sec": 1 / best}
+            if memory:
+                results[name]["peak_mb"] = min(peak for _, peak in runs)
+            print(f"  {count:>8}  {name:<22} {format_result(results[name])}", flush=True)
+    return results
+
+
+def format_result(result: Dict[str, float]) -> str:
+    """Format one benchmark result as table columns."""
+    peak = f"{result['peak_mb']:9.1f}" if "peak_mb" in result else f"{'-':>9}"
+    return f"{result['seconds'] * 1000:11.2f} {result['ops_per_sec']:14,.1f} {peak}"
+
+
+def regressions(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    tolerance: float
+) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Results by store size (as a string) and benchmark name
+        baseline: Baseline results of the same shape
+        tolerance: Allowed slowdown or memory growth, as a fraction
+
+    Returns:
+        A description of every regression; benchmarks missing from the
+        baseline are not compared
+    """
+    found = []
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            for key, floor, unit, scale in (
+                ("seconds", MIN_SECONDS_DELTA, "ms", 1000), ("peak_mb", MIN_PEAK_MB_DELTA, "MB", 1)
+            ):
+                if key not in result or key not in base:
+                    continue
+                if result[key] > base[key] * (1 + tolerance) and result[key] - base[key] > floor:
+                    found.append(
+                        f"{name} on {size} tasks: {result[key] * scale:.2f} {unit}, "
+                        f"baseline {base[key] * scale:.2f} {unit} (+{result[key] / base[key] - 1:.0%})"
+                    )
+    return found
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    """Read a stored baseline, or return None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> int:
+    """Run the benchmarks, print the results and compare them with the baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark the task service and CLI hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Store sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--backend", choices=["json", "log"], default="log", help="Storage backend")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression, as a fraction")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the slower memory measurements")
+    args = parser.parse_args()
+
+    print(f"{'tasks':>10}  {'benchmark':<22} {'best ms':>11} {'ops/s':>14} {'peak MB':>9}")
+    results = {
+        str(count): run_size(count, args.backend, args.repeat, not args.no_memory)
+        for count in args.sizes
+    }
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline) or {}
+        baseline.setdefault("results", {}).update({
+            size: {name: {key: round(value, 6) for key, value in result.items()} for name, result in benchmarks.items()}
+            for size, benchmarks in results.items()
+        })
+        baseline["machine"] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to store one")
+        return 0
+    if baseline.get("machine", {}).get("backend", args.backend) != args.backend:
+        print(f"\nThe baseline was measured with the {baseline['machine']['backend']} backend; not comparing")
+        return 0
+    found = regressions(results, baseline["results"], args.tolerance)
+    if found:
+        print(f"\nRegressions over {args.tolerance:.0%} against {args.baseline}:")
+        for line in found:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions over {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,27 @@
 Streamlit web application for the task manager.
 """
 
+import functools
 import os
 import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Tuple
+
 import streamlit as st
 
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.services.base_task_service import BaseTaskService
+from src.services.sort_index import SORT_FIELDS
 from src.services.task_service import TaskService
-from src.utils.exceptions import TaskNotFoundException
-from src.localization.translations import get_text, LANGUAGES
+from src.utils.exceptions import TaskNotFoundException, StorageException, InvalidQueryException
+from src.localization.translations import get_catalog, get_text, LANGUAGES
+
+# Page sizes offered on the task list; rendering cost grows with the page size
+PAGE_SIZES = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
 
 
 def apply_dark_mode():
@@ -99,6 +110,90 @@ def apply_dark_mode():
         st.markdown(dark_mode_css, unsafe_allow_html=True)
 
 
+@st.cache_resource(show_spinner=False)
+def get_shared_task_service(storage_file: str) -> Tuple[TaskService, threading.Lock]:
+    """
+    Load the task store once per process and share it across sessions.
+
+    Streamlit reruns the script on every interaction; caching the service
+    means a rerun no longer re-reads and re-parses the whole store. Changes
+    made by other processes are picked up by TaskService.refresh(), which
+    only stats the store and reads whatever was appended since.
+
+    Args:
+        storage_file: Path to the JSON file for storing tasks
+
+    Returns:
+        The shared service and the lock that sessions hold while using it
+    """
+    return TaskService(storage_file), threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def get_shared_sqlite_service(storage_file: str) -> Tuple[BaseTaskService, threading.Lock]:
+    """
+    Open the SQLite store once per process and share it across sessions.
+
+    Reruns reuse the connection instead of opening a new one each time.
+    Sessions run in different threads, so the connection is opened for use
+    from any thread, and the lock keeps them from using it at once.
+
+    Args:
+        storage_file: Path to the JSON file the database sits next to
+
+    Returns:
+        The shared SqliteTaskService and the lock that sessions hold while using it
+    """
+    # Imported here so other backends never load sqlite3
+    from src.services.sqlite_task_service import open_sqlite_store
+    return open_sqlite_store(storage_file, check_same_thread=False), threading.Lock()
+
+
+class LockedTaskService:
+    """
+    A shared task service whose methods run under the sessions' lock.
+
+    The lock is held for each call only, never while the page renders, so
+    a slow page in one session does not hold up the others. Calls whose
+    results must agree with each other run together inside locked().
+    """
+
+    def __init__(self, service: BaseTaskService, lock: threading.Lock):
+        """
+        Wrap a shared service.
+
+        Args:
+            service: The service shared across sessions
+            lock: The lock to hold around each call on it
+        """
+        self._service = service
+        self._lock = lock
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._service, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def locked(*args: Any, **kwargs: Any) -> Any:
+            with self._lock:
+                return attribute(*args, **kwargs)
+
+        return locked
+
+    @contextmanager
+    def locked(self) -> Iterator[BaseTaskService]:
+        """
+        Hold the lock across several calls, so other sessions cannot change
+        the tasks between them.
+
+        Yields:
+            The shared service itself, to be used only inside the block
+        """
+        with self._lock:
+            yield self._service
+
+
 def main():
     """Main function for the Streamlit application."""
     # Initialize session state for language if it doesn't exist
@@ -125,9 +220,18 @@ def main():
     config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config")
     os.makedirs(config_dir, exist_ok=True)
     storage_file = os.path.join(config_dir, "tasks.json")
-    task_service = TaskService(storage_file)
+    try:
+        if os.environ.get("TASK_MANAGER_STORAGE") == "sqlite":
+            shared_service, service_lock = get_shared_sqlite_service(storage_file)
+        else:
+            shared_service, service_lock = get_shared_task_service(storage_file)
+    except StorageException as e:
+        st.error(get_text("error", lang).format(message=str(e)))
+        st.stop()
     
     # Sidebar for navigation and language selection
+    task_service = LockedTaskService(shared_service, service_lock)
+
     st.sidebar.title(get_text("navigation", lang))
     
     # Language selector
@@ -173,6 +277,12 @@ def main():
         ]
     )
     
+    try:
+        task_service.refresh()
+    except StorageException as e:
+        st.error(get_text("error", lang).format(message=str(e)))
+        st.stop()
+
     if page == get_text("view_tasks", lang):
         display_tasks_page(task_service, lang)
     elif page == get_text("add_task", lang):
@@ -183,6 +293,7 @@ def main():
 
 def display_tasks_page(task_service, lang):
     """Display the tasks page."""
+    catalog = get_catalog(lang)
     st.header(get_text("your_tasks", lang))
     
     # Filter options
@@ -192,36 +303,52 @@ def display_tasks_page(task_service, lang):
     with col2:
         filter_priority = st.selectbox(
             get_text("filter_by_priority", lang),
-            [
-                get_text("all", lang), 
-                get_text("low", lang), 
-                get_text("medium", lang), 
-                get_text("high", lang)
-            ]
+            [get_text("all", lang)] + list(catalog.priority_labels.values())
         )
     
-    # Get tasks
-    tasks = task_service.get_all_tasks(show_completed=True)
-    
-    # Apply filters
-    if not show_completed:
-        tasks = [task for task in tasks if not task.completed]
+    # Map localized priority back to English for filtering
+    filter_priority_en = catalog.priorities_by_label.get(filter_priority)
     
-    if filter_priority != get_text("all", lang):
-        # Map localized priority back to English for filtering
-        priority_map = {
-            get_text("low", lang): "low",
-            get_text("medium", lang): "medium",
-            get_text("high", lang): "high"
-        }
-        filter_priority_en = priority_map.get(filter_priority, "all")
-        if filter_priority_en != "all":
-            tasks = [task for task in tasks if task.priority.lower() == filter_priority_en]
-    
-    if not tasks:
+    # The total sizes the pager, so it and the page must come from the same
+    # state of the tasks; the lock is released before the page renders
+    with task_service.locked() as service:
+        service.refresh()
+        total = service.count_tasks(show_completed=show_completed, priority=filter_priority_en)
+        if total:
+            # Sort and pagination options
+            col1, col2 = st.columns(2)
+            with col1:
+                sort_by = st.selectbox(
+                    get_text("sort_by", lang),
+                    SORT_FIELDS,
+                    format_func=lambda field: get_text(f"sort_{field}", lang)
+                )
+                page_size = st.selectbox(
+                    get_text("tasks_per_page", lang),
+                    PAGE_SIZES,
+                    index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE)
+                )
+            page_count = (total + page_size - 1) // page_size
+            with col2:
+                descending = st.checkbox(get_text("reverse_order", lang), value=False)
+                page = st.number_input(get_text("page", lang), min_value=1, max_value=page_count, value=1, step=1)
+
+            # Only fetch the current page; the service filters and sorts first
+            offset = (page - 1) * page_size
+            tasks = service.get_all_tasks(
+                show_completed=show_completed,
+                priority=filter_priority_en,
+                offset=offset,
+                limit=page_size,
+                sort_by=sort_by,
+                descending=descending
+            )
+    if not total:
         st.info(get_text("no_tasks_found", lang))
         return
     
+    st.caption(get_text("showing_tasks", lang).format(start=offset + 1, end=offset + len(tasks), total=total))
+    
     # Display tasks
     for task in tasks:
         with st.container():
@@ -238,12 +365,7 @@ def display_tasks_page(task_service, lang):
                     st.write(f"**{get_text('created_at', lang)}:** {task.created_at}")
             
             with col2:
-                # Map English priority to localized display
-                priority_display = {
-                    "low": get_text("low", lang),
-                    "medium": get_text("medium", lang),
-                    "high": get_text("high", lang)
-                }.get(task.priority.lower(), task.priority)
+                priority_display = catalog.priority_label(task.priority)
                 
                 priority_color = {
                     "low": "blue",
@@ -266,6 +388,7 @@ def display_tasks_page(task_service, lang):
 
 def add_task_page(task_service, lang):
     """Display the add task page."""
+    catalog = get_catalog(lang)
     st.header(get_text("add_new_task", lang))
     
     with st.form("add_task_form"):
@@ -273,8 +396,8 @@ def add_task_page(task_service, lang):
         description = st.text_area(get_text("description", lang), max_chars=200)
         priority = st.select_slider(
             get_text("priority", lang),
-            options=[get_text("low", lang), get_text("medium", lang), get_text("high", lang)],
-            value=get_text("medium", lang)
+            options=list(catalog.priority_labels.values()),
+            value=catalog.priority_labels["medium"]
         )
         
         submitted = st.form_submit_button(get_text("add_task", lang))
@@ -284,12 +407,7 @@ def add_task_page(task_service, lang):
                 st.error(get_text("title_required", lang))
             else:
                 # Map localized priority back to English for storage
-                priority_map = {
-                    get_text("low", lang): "low",
-                    get_text("medium", lang): "medium",
-                    get_text("high", lang): "high"
-                }
-                priority_en = priority_map.get(priority, "medium")
+                priority_en = catalog.priorities_by_label.get(priority, "medium")
                 
                 task = task_service.add_task(
                     title=title,
@@ -301,45 +419,48 @@ def add_task_page(task_service, lang):
 
 def search_tasks_page(task_service, lang):
     """Display the search tasks page."""
+    catalog = get_catalog(lang)
     st.header(get_text("search_tasks", lang))
     
-    keyword = st.text_input(get_text("search_for_tasks", lang), placeholder=get_text("enter_keyword", lang))
+    keyword = st.text_input(
+        get_text("search_for_tasks", lang),
+        placeholder=get_text("enter_keyword", lang),
+        help=get_text("search_query_help", lang)
+    )
     
     if keyword:
-        results = task_service.search_tasks(keyword)
-        
-        if not results:
-            st.info(get_text("no_tasks_matching", lang).format(keyword=keyword))
+        try:
+            results = task_service.search_query(keyword)
+        except InvalidQueryException as e:
+            st.error(get_text("error", lang).format(message=str(e)))
         else:
-            st.write(get_text("found_tasks_matching", lang).format(count=len(results), keyword=keyword))
+            if not results:
+                st.info(get_text("no_tasks_matching", lang).format(keyword=keyword))
+            else:
+                st.write(get_text("found_tasks_matching", lang).format(count=len(results), keyword=keyword))
             
-            for task in results:
-                with st.container():
-                    col1, col2 = st.columns([4, 1])
+                for task in results:
+                    with st.container():
+                        col1, col2 = st.columns([4, 1])
                     
-                    with col1:
-                        status = get_text("completed", lang) if task.completed else get_text("active", lang)
-                        st.markdown(f"**{task.title}** ({status})")
+                        with col1:
+                            status = catalog.status_labels[task.completed]
+                            st.markdown(f"**{task.title}** ({status})")
                         
-                        # Map English priority to localized display
-                        priority_display = {
-                            "low": get_text("low", lang),
-                            "medium": get_text("medium", lang),
-                            "high": get_text("high", lang)
-                        }.get(task.priority.lower(), task.priority)
+                            priority_display = catalog.priority_label(task.priority)
                         
-                        st.write(f"{get_text('priority', lang)}: {priority_display}")
+                            st.write(f"{get_text('priority', lang)}: {priority_display}")
                         
-                        with st.expander(get_text("details", lang)):
-                            st.write(f"**{get_text('description', lang)}:** {task.description}")
-                            st.write(f"**{get_text('created_at', lang)}:** {task.created_at}")
+                            with st.expander(get_text("details", lang)):
+                                st.write(f"**{get_text('description', lang)}:** {task.description}")
+                                st.write(f"**{get_text('created_at', lang)}:** {task.created_at}")
                     
-                    with col2:
-                        if st.button(get_text("view", lang), key=f"view_{task.id}"):
-                            st.session_state.task_to_view = task.id
-                            st.rerun()
+                        with col2:
+                            if st.button(get_text("view", lang), key=f"view_{task.id}"):
+                                st.session_state.task_to_view = task.id
+                                st.rerun()
                     
-                    st.divider()
+                        st.divider()
     
     # View task details if selected
     if hasattr(st.session_state, 'task_to_view'):
@@ -350,16 +471,11 @@ def search_tasks_page(task_service, lang):
             st.write(f"**{get_text('id', lang)}:** {task.id}")
             st.write(f"**{get_text('description', lang)}:** {task.description}")
             
-            # Map English priority to localized display
-            priority_display = {
-                "low": get_text("low", lang),
-                "medium": get_text("medium", lang),
-                "high": get_text("high", lang)
-            }.get(task.priority.lower(), task.priority)
+            priority_display = catalog.priority_label(task.priority)
             
             st.write(f"**{get_text('priority', lang)}:** {priority_display}")
             
-            status = get_text("completed", lang) if task.completed else get_text("active", lang)
+            status = catalog.status_labels[task.completed]
             st.write(f"**{get_text('status', lang)}:** {status}")
             st.write(f"**{get_text('created_at', lang)}:** {task.created_at}")
             
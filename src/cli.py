@@ -4,72 +4,281 @@ Command-line interface for the task manager application.
 """
 
 import argparse
+import itertools
 import os
+import signal
 import sys
+from typing import List
 
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.services.task_service import TaskService
-from src.utils.exceptions import TaskNotFoundException
-from src.localization.translations import get_text, LANGUAGES
+# The task services and output writers are imported by the commands that
+# use them, so `add` and --help never load the search and storage engine
+from src.utils.exceptions import TaskNotFoundException, StorageException, InvalidQueryException
+from src.localization.translations import get_catalog, get_text, LANGUAGES
 
 
-def main():
-    """Main function to handle command-line arguments."""
-    # Get the language from environment variable if set, otherwise use default
-    default_lang = os.environ.get("TASK_MANAGER_LANG", "en")
-    
+def _default_language() -> str:
+    """Return the language from the TASK_MANAGER_LANG environment variable, or English."""
+    return os.environ.get("TASK_MANAGER_LANG", "en")
+
+
+class LocalizedHelpFormatter(argparse.HelpFormatter):
+    """
+    Help formatter whose help strings are translation keys.
+
+    Keys are translated only when help is printed, so parsing a command
+    never loads the translations for the help of every option. Strings
+    that are not keys are printed as they are.
+    """
+
+    def _get_help_string(self, action: argparse.Action) -> str:
+        return get_text(action.help, _default_language())
+
+
+def _non_negative_int(value: str) -> int:
+    """Parse a count given on the command line, which must not be negative."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"expected a non-negative integer, got '{value}'")
+    return number
+
+
+def _add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments of the add command."""
+    parser.add_argument("title", help="title")
+    parser.add_argument("-d", "--description", help="description", default="")
+    parser.add_argument(
+        "-p", "--priority", 
+        help="priority", 
+        choices=["low", "medium", "high"], 
+        default="medium"
+    )
+
+
+def _list_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments of the list command."""
+    from src.services.sort_index import SORT_FIELDS
+
+    parser.add_argument(
+        "-a", "--all", 
+        help="show_completed_tasks", 
+        action="store_true"
+    )
+    parser.add_argument(
+        "-n", "--limit",
+        help="limit",
+        type=_non_negative_int,
+        default=None
+    )
+    parser.add_argument(
+        "-s", "--sort",
+        help="sort_by",
+        choices=SORT_FIELDS,
+        default="id"
+    )
+    parser.add_argument(
+        "-r", "--reverse",
+        help="reverse_order",
+        action="store_true"
+    )
+    _format_argument(parser)
+
+
+def _format_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the output format argument of the list and search commands."""
+    from src.utils.task_output import OUTPUT_FORMATS
+
+    parser.add_argument(
+        "-f", "--format",
+        help="output_format",
+        choices=OUTPUT_FORMATS,
+        default="table"
+    )
+
+
+def _id_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the task id argument of the complete, delete and view commands."""
+    parser.add_argument("id", type=int, help="id")
+
+
+def _search_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments of the search command."""
+    parser.add_argument("keyword", help="search_query_help")
+    _format_argument(parser)
+
+
+def _api_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments of the api command."""
+    parser.add_argument("--host", help="host", default="127.0.0.1")
+    parser.add_argument("--port", help="port", type=int, default=8080)
+
+
+# Subcommands: name -> (translation key of the help, function adding the
+# arguments, or None for commands without any)
+COMMANDS = {
+    "add": ("add_task", _add_arguments),
+    "list": ("view_tasks", _list_arguments),
+    "complete": ("mark_as_complete", _id_argument),
+    "delete": ("task_deleted", _id_argument),
+    "search": ("search_tasks", _search_arguments),
+    "view": ("view", _id_argument),
+    "serve": ("serve_tasks", None),
+    "api": ("serve_api", _api_arguments),
+    "metrics": ("show_metrics", None),
+}
+
+
+def build_parser(argv: List[str]) -> argparse.ArgumentParser:
+    """
+    Build the argument parser for a command line.
+
+    Every subcommand is registered so the top-level help lists them all, but
+    only the one named on the command line gets its arguments.
+
+    Args:
+        argv: Command-line arguments, without the program name
+
+    Returns:
+        The argument parser
+    """
     # Create the main parser
-    parser = argparse.ArgumentParser(description="Task Manager - A CLI task management app")
+    parser = argparse.ArgumentParser(
+        description="Task Manager - A CLI task management app",
+        formatter_class=LocalizedHelpFormatter
+    )
     
     # Add language option to the main parser
     parser.add_argument(
         "-l", "--language", 
         help="Language for the interface", 
         choices=list(LANGUAGES.keys()), 
-        default=default_lang
+        default=_default_language()
     )
     
     # Create subparsers for commands
     subparsers = parser.add_subparsers(dest="command", help="Command to execute", required=True)
+    # Language codes never clash with command names, so the first one found is the command
+    command = next((arg for arg in argv if arg in COMMANDS), None)
+    for name, (help_key, add_arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_key, formatter_class=LocalizedHelpFormatter)
+        if name == command and add_arguments is not None:
+            add_arguments(subparser)
+    return parser
 
-    # Add task command
-    add_parser = subparsers.add_parser("add", help=get_text("add_task", default_lang))
-    add_parser.add_argument("title", help=get_text("title", default_lang))
-    add_parser.add_argument("-d", "--description", help=get_text("description", default_lang), default="")
-    add_parser.add_argument(
-        "-p", "--priority", 
-        help=get_text("priority", default_lang), 
-        choices=["low", "medium", "high"], 
-        default="medium"
-    )
 
-    # List tasks command
-    list_parser = subparsers.add_parser("list", help=get_text("view_tasks", default_lang))
-    list_parser.add_argument(
-        "-a", "--all", 
-        help=get_text("show_completed_tasks", default_lang), 
-        action="store_true"
-    )
+def open_task_service(storage_file: str, lazy: bool = True):
+    """
+    Open the task service configured by TASK_MANAGER_STORAGE.
 
-    # Complete task command
-    complete_parser = subparsers.add_parser("complete", help=get_text("mark_as_complete", default_lang))
-    complete_parser.add_argument("id", type=int, help=get_text("id", default_lang))
+    Args:
+        storage_file: Path to the JSON task file
+        lazy: Defer loading the tasks of an in-memory service until needed
 
-    # Delete task command
-    delete_parser = subparsers.add_parser("delete", help=get_text("task_deleted", default_lang))
-    delete_parser.add_argument("id", type=int, help=get_text("id", default_lang))
+    Returns:
+        A TaskService, or a SqliteTaskService for the sqlite backend
+    """
+    if os.environ.get("TASK_MANAGER_STORAGE") == "sqlite":
+        # Imported here so other backends never load sqlite3
+        from src.services.sqlite_task_service import open_sqlite_store
+        return open_sqlite_store(storage_file)
+    from src.services.task_service import TaskService
+    return TaskService(storage_file, lazy=lazy)
 
-    # Search tasks command
-    search_parser = subparsers.add_parser("search", help=get_text("search_tasks", default_lang))
-    search_parser.add_argument("keyword", help=get_text("search_for_tasks", default_lang))
 
-    # View task command
-    view_parser = subparsers.add_parser("view", help=get_text("view", default_lang))
-    view_parser.add_argument("id", type=int, help=get_text("id", default_lang))
+def serve(storage_file: str, lang: str) -> None:
+    """
+    Keep the tasks loaded and answer other commands until interrupted.
 
-    # Parse arguments once after all parsers are defined
+    Args:
+        storage_file: Path to the JSON task file
+        lang: Language of the messages
+    """
+    from src.services.daemon import TaskServer, socket_path_for
+
+    task_service = open_task_service(storage_file, lazy=False)
+    try:
+        server = TaskServer(task_service, socket_path_for(storage_file))
+    except StorageException as e:
+        task_service.close()
+        print(get_text("error", lang).format(message=str(e)))
+        return
+    # Shut down cleanly on SIGTERM too, so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(get_text("daemon_serving", lang).format(path=server.socket_path))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        task_service.close()
+
+
+def serve_api(storage_file: str, lang: str, host: str, port: int) -> None:
+    """
+    Keep the tasks loaded and answer HTTP API requests until interrupted.
+
+    Args:
+        storage_file: Path to the JSON task file
+        lang: Language of the messages
+        host: Address to listen on
+        port: Port to listen on
+    """
+    from src.services.http_api import TaskAPIServer
+
+    task_service = open_task_service(storage_file, lazy=False)
+    try:
+        server = TaskAPIServer(task_service, (host, port))
+    except OSError as e:
+        task_service.close()
+        print(get_text("error", lang).format(message=str(e)))
+        return
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(get_text("api_serving", lang).format(url=f"http://{host}:{server.server_address[1]}"))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        task_service.close()
+
+
+def show_metrics(storage_file: str) -> None:
+    """
+    Print task service metrics in the Prometheus text format.
+
+    A running daemon reports what it recorded since it started, if it was
+    started with TASK_MANAGER_METRICS=1. Without one, the store is loaded
+    with metrics enabled and the load is reported.
+
+    Args:
+        storage_file: Path to the JSON task file
+    """
+    from src.services.daemon import connect, socket_path_for
+    from src.utils import metrics
+
+    client = connect(socket_path_for(storage_file))
+    if client is not None:
+        try:
+            text = client.metrics()
+        finally:
+            client.close()
+    else:
+        metrics.enable()
+        open_task_service(storage_file, lazy=False).close()
+        text = metrics.REGISTRY.exposition()
+    sys.stdout.write(text)
+
+
+def main():
+    """Main function to handle command-line arguments."""
+    parser = build_parser(sys.argv[1:])
     args = parser.parse_args()
     
     # Update language if specified in arguments
@@ -79,101 +288,108 @@ def main():
     config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config")
     os.makedirs(config_dir, exist_ok=True)
     storage_file = os.path.join(config_dir, "tasks.json")
-    task_service = TaskService(storage_file)
+    if args.command == "serve":
+        serve(storage_file, lang)
+        return
+    if args.command == "api":
+        serve_api(storage_file, lang, args.host, args.port)
+        return
+    if args.command == "metrics":
+        show_metrics(storage_file)
+        return
 
-    # Language is already set from the parsed arguments
+    task_service = None
+    if os.path.exists(f"{storage_file}.sock"):
+        # A daemon may be serving the store; importing the client costs
+        # nothing when there is none
+        from src.services.daemon import connect, socket_path_for
+        task_service = connect(socket_path_for(storage_file))
+    if task_service is None:
+        task_service = open_task_service(storage_file)
+
+    # Language is already set from the parsed arguments; its catalog
+    # holds the labels every row reuses
+    catalog = get_catalog(lang)
 
     try:
         if args.command == "add":
             task = task_service.add_task(args.title, args.description, args.priority)
-            print(get_text("task_added_success", lang).format(title=task.title, id=task.id))
+            print(catalog.format("task_added_success", title=task.title, id=task.id))
             
         elif args.command == "list":
-            tasks = task_service.get_all_tasks(show_completed=args.all)
-            if not tasks:
-                print(get_text("no_tasks_found", lang))
+            from src.utils.task_output import write_tasks
+
+            if args.sort == "id" and not args.reverse:
+                # Stream tasks so output starts before the whole store is parsed
+                tasks = iter(task_service.iter_tasks(show_completed=args.all))
+                if args.limit is not None:
+                    tasks = itertools.islice(tasks, args.limit)
+            else:
+                tasks = iter(task_service.get_all_tasks(
+                    show_completed=args.all,
+                    limit=args.limit,
+                    sort_by=args.sort,
+                    descending=args.reverse
+                ))
+            first_task = next(tasks, None)
+            if first_task is None and args.format == "table":
+                print(catalog.text("no_tasks_found"))
                 return
-                
-            print("\n" + "=" * 60)
-            print(f"{get_text('id', lang):^5}|{get_text('title', lang):^20}|{get_text('priority', lang):^10}|{get_text('status', lang):^10}|{get_text('created_at', lang):^20}")
-            print("=" * 60)
-            
-            for task in tasks:
-                status = get_text("completed", lang) if task.completed else get_text("active", lang)
-                
-                # Map English priority to localized display
-                priority_display = {
-                    "low": get_text("low", lang),
-                    "medium": get_text("medium", lang),
-                    "high": get_text("high", lang)
-                }.get(task.priority.lower(), task.priority)
-                
-                print(f"{task.id:^5}|{task.title[:18]:^20}|{priority_display:^10}|{status:^10}|{task.created_at:^20}")
-            
-            print("=" * 60 + "\n")
+
+            if first_task is not None:
+                tasks = itertools.chain([first_task], tasks)
+            if args.format == "table":
+                sys.stdout.write("\n")
+            write_tasks(tasks, sys.stdout, args.format, catalog)
             
         elif args.command == "complete":
             task = task_service.complete_task(args.id)
-            print(get_text("task_marked_complete", lang).format(id=task.id))
+            print(catalog.format("task_marked_complete", id=task.id))
             
         elif args.command == "delete":
             task = task_service.delete_task(args.id)
-            print(get_text("task_deleted", lang).format(title=task.title))
+            print(catalog.format("task_deleted", title=task.title))
             
         elif args.command == "search":
-            results = task_service.search_tasks(args.keyword)
-            
-            if not results:
-                print(get_text("no_tasks_matching", lang).format(keyword=args.keyword))
-                return
-                
-            print(get_text("found_tasks_matching", lang).format(count=len(results), keyword=args.keyword))
-            print("=" * 60)
-            print(f"{get_text('id', lang):^5}|{get_text('title', lang):^20}|{get_text('priority', lang):^10}|{get_text('status', lang):^10}")
-            print("=" * 60)
+            from src.utils.task_output import write_tasks
+
+            results = task_service.search_query(args.keyword)
             
-            for task in results:
-                status = get_text("completed", lang) if task.completed else get_text("active", lang)
-                
-                # Map English priority to localized display
-                priority_display = {
-                    "low": get_text("low", lang),
-                    "medium": get_text("medium", lang),
-                    "high": get_text("high", lang)
-                }.get(task.priority.lower(), task.priority)
-                
-                print(f"{task.id:^5}|{task.title[:18]:^20}|{priority_display:^10}|{status:^10}")
-            
-            print("=" * 60 + "\n")
+            if args.format == "table":
+                if not results:
+                    print(catalog.format("no_tasks_matching", keyword=args.keyword))
+                    return
+                print(catalog.format("found_tasks_matching", count=len(results), keyword=args.keyword))
+            write_tasks(results, sys.stdout, args.format, catalog, created_at=False)
             
         elif args.command == "view":
             task = task_service.get_task_by_id(args.id)
             print("\n" + "=" * 60)
-            print(f"{get_text('id', lang)}: {task.id}")
-            print(f"{get_text('title', lang)}: {task.title}")
-            print(f"{get_text('description', lang)}: {task.description}")
+            print(f"{catalog.text('id')}: {task.id}")
+            print(f"{catalog.text('title')}: {task.title}")
+            print(f"{catalog.text('description')}: {task.description}")
             
-            # Map English priority to localized display
-            priority_display = {
-                "low": get_text("low", lang),
-                "medium": get_text("medium", lang),
-                "high": get_text("high", lang)
-            }.get(task.priority.lower(), task.priority)
+            priority_display = catalog.priority_label(task.priority)
             
-            print(f"{get_text('priority', lang)}: {priority_display}")
+            print(f"{catalog.text('priority')}: {priority_display}")
             
-            status = get_text("completed", lang) if task.completed else get_text("active", lang)
-            print(f"{get_text('status', lang)}: {status}")
-            print(f"{get_text('created_at', lang)}: {task.created_at}")
+            status = catalog.status_labels[task.completed]
+            print(f"{catalog.text('status')}: {status}")
+            print(f"{catalog.text('created_at')}: {task.created_at}")
             print("=" * 60 + "\n")
             
         else:
             parser.print_help()
             
-    except TaskNotFoundException as e:
-        print(get_text("error", lang).format(message=str(e)))
+    except BrokenPipeError:
+        # The reader stopped early, as with `| head`; silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except (TaskNotFoundException, StorageException, InvalidQueryException) as e:
+        print(catalog.format("error", message=str(e)))
     except Exception as e:
-        print(get_text("unexpected_error", lang).format(message=str(e)))
+        print(catalog.format("unexpected_error", message=str(e)))
+    finally:
+        task_service.close()
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ Translation functions for the task manager application.
 
 import json
 import os
-from typing import Dict, Any
+from typing import Callable, Dict, Any
 
 # Available languages
 LANGUAGES = {
@@ -15,9 +15,15 @@ LANGUAGES = {
 # Default language
 DEFAULT_LANGUAGE = "en"
 
+# Task priorities, which are also the keys of their localized labels
+PRIORITY_KEYS = ("low", "medium", "high")
+
 # Cache for loaded translations
 _translations: Dict[str, Dict[str, str]] = {}
 
+# Cache for catalogs built from the loaded translations
+_catalogs: Dict[str, "Catalog"] = {}
+
 
 def load_translations(lang_code: str) -> Dict[str, str]:
     """
@@ -56,6 +62,104 @@ def load_translations(lang_code: str) -> Dict[str, str]:
             return {}
 
 
+class Catalog:
+    """
+    Translations of one language, prepared for rendering many rows.
+
+    Labels for task priorities and statuses are looked up once, when the
+    catalog is built, and templates keep their bound format method, so a row
+    costs a dictionary lookup per label.
+    """
+
+    def __init__(self, lang_code: str, translations: Dict[str, str]):
+        """
+        Build a catalog.
+
+        Args:
+            lang_code: Language code (e.g., 'en', 'it')
+            translations: Translations of the language, by key
+        """
+        self.lang_code = lang_code
+        self._get = translations.get
+        self._templates: Dict[str, Callable[..., str]] = {}
+        # Localized label of each priority, and the priority of each label
+        self.priority_labels = {priority: self.text(priority) for priority in PRIORITY_KEYS}
+        self.priorities_by_label = {label: priority for priority, label in self.priority_labels.items()}
+        # Localized status label, by whether the task is completed
+        self.status_labels = {True: self.text("completed"), False: self.text("active")}
+
+    def text(self, key: str) -> str:
+        """
+        Get the translated text for a key.
+
+        Args:
+            key: Translation key
+
+        Returns:
+            Translated text or the key itself if translation is not found
+        """
+        return self._get(key, key)
+
+    def template(self, key: str) -> Callable[..., str]:
+        """
+        Get the format function of a translated template.
+
+        Args:
+            key: Translation key of a template with {name} fields
+
+        Returns:
+            The bound format method of the translated text
+        """
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = self.text(key).format
+        return template
+
+    def format(self, key: str, **values: Any) -> str:
+        """
+        Fill in a translated template.
+
+        Args:
+            key: Translation key of a template with {name} fields
+            **values: Values of the fields
+
+        Returns:
+            The formatted text
+        """
+        return self.template(key)(**values)
+
+    def priority_label(self, priority: str) -> str:
+        """
+        Get the localized label of a priority.
+
+        Args:
+            priority: Priority of a task, in any case
+
+        Returns:
+            The label, or the priority itself if it has none
+        """
+        label = self.priority_labels.get(priority)
+        if label is None:
+            label = self.priority_labels.get(priority.lower(), priority)
+        return label
+
+
+def get_catalog(lang_code: str = DEFAULT_LANGUAGE) -> Catalog:
+    """
+    Get the catalog of a language, building it on first use.
+
+    Args:
+        lang_code: Language code (e.g., 'en', 'it')
+
+    Returns:
+        The language's Catalog
+    """
+    catalog = _catalogs.get(lang_code)
+    if catalog is None:
+        catalog = _catalogs[lang_code] = Catalog(lang_code, load_translations(lang_code))
+    return catalog
+
+
 def get_text(key: str, lang_code: str = DEFAULT_LANGUAGE) -> str:
     """
     Get the translated text for a given key.
@@ -67,5 +171,7 @@ def get_text(key: str, lang_code: str = DEFAULT_LANGUAGE) -> str:
     Returns:
         Translated text or the key itself if translation is not found
     """
-    translations = load_translations(lang_code)
-    return translations.get(key, key)
\ No newline at end of file
+    catalog = _catalogs.get(lang_code)
+    if catalog is None:
+        catalog = get_catalog(lang_code)
+    return catalog.text(key)
\ No newline at end of file
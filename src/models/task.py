@@ -2,13 +2,135 @@
 Task model representing a task entity in the task manager application.
 """
 
-from datetime import datetime
-from typing import Dict, Any, Optional
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, Any, Optional, Tuple, Union
+
+from src.utils.exceptions import InvalidTaskDataException
+
+# Format of the created_at strings stored in task files
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+# Strings in TIMESTAMP_FORMAT, which format_timestamp gives back unchanged
+_CANONICAL_TIMESTAMP_RE = re.compile(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d")
+
+
+class Priority(str, Enum):
+    """Known task priority levels, shared by every task that uses them."""
+
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+    def __str__(self) -> str:
+        return self.value
+
+    @classmethod
+    def coerce(cls, value: str) -> str:
+        """
+        Map a priority string to its shared representation.
+
+        The spelling is kept: only the exact, lowercase values of the known
+        levels map to their members. Code comparing priorities ignores case.
+
+        Args:
+            value: Priority as read from storage or user input
+
+        Returns:
+            The matching Priority member, or the interned string for
+            any other spelling or priority
+        """
+        try:
+            return cls(value)
+        except ValueError:
+            return sys.intern(value)
+
+
+def parse_timestamp(value: str) -> int:
+    """
+    Convert a created_at string into an integer timestamp.
+
+    Timestamps are naive wall-clock times counted in seconds from
+    1970-01-01 00:00:00, so they round-trip exactly with format_timestamp.
+
+    Args:
+        value: Timestamp in TIMESTAMP_FORMAT
+
+    Returns:
+        Seconds since the epoch
+
+    Raises:
+        InvalidTaskDataException: If the value is not a valid timestamp
+    """
+    try:
+        return int((datetime.fromisoformat(value) - _EPOCH).total_seconds())
+    except (TypeError, ValueError):
+        raise InvalidTaskDataException(f"Invalid created_at timestamp '{value}'")
+
+
+def read_timestamp(value: str) -> Tuple[int, Optional[str]]:
+    """
+    Convert a stored created_at string into an integer timestamp, keeping
+    the string wherever the timestamp cannot reproduce it.
+
+    Strings in TIMESTAMP_FORMAT are the common case and convert exactly.
+    Other ISO 8601 strings, with fractional seconds or a time zone offset,
+    get the timestamp of their wall-clock time, truncated to the second.
+    Anything else gets timestamp 0, so it sorts as the oldest.
+
+    Args:
+        value: The created_at string
+
+    Returns:
+        The timestamp, and the string itself unless format_timestamp
+        returns it unchanged
+
+    Raises:
+        InvalidTaskDataException: If the value is not a string
+    """
+    if not isinstance(value, str):
+        raise InvalidTaskDataException(f"Invalid created_at timestamp {value!r}")
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return 0, value
+    if moment.tzinfo is not None:
+        moment = moment.replace(tzinfo=None)
+    timestamp = (moment - _EPOCH) // _SECOND
+    if _CANONICAL_TIMESTAMP_RE.fullmatch(value):
+        return timestamp, None
+    return timestamp, value
+
+
+def format_timestamp(timestamp: int) -> str:
+    """
+    Convert an integer timestamp back into a created_at string.
+
+    Args:
+        timestamp: Seconds since the epoch, as returned by parse_timestamp
+
+    Returns:
+        Timestamp in TIMESTAMP_FORMAT
+    """
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(timestamp))
+
+
+def current_timestamp() -> int:
+    """Return the current local time as an integer timestamp."""
+    return int((datetime.now().replace(microsecond=0) - _EPOCH).total_seconds())
 
 
 class Task:
     """Task model class representing a single task."""
 
+    __slots__ = ("id", "title", "description", "_priority", "completed", "created_ts", "created_text")
+
     def __init__(
         self,
         task_id: int,
@@ -16,7 +138,7 @@ class Task:
         description: str = "",
         priority: str = "medium",
         completed: bool = False,
-        created_at: Optional[str] = None
+        created_at: Optional[Union[str, int]] = None
     ):
         """
         Initialize a new Task instance.
@@ -27,14 +149,43 @@ class Task:
             description: Detailed description of the task
             priority: Priority level (low, medium, high)
             completed: Whether the task is completed
-            created_at: Timestamp when the task was created
+            created_at: Timestamp when the task was created, either as a
+                string or as an integer timestamp; see read_timestamp for
+                strings outside TIMESTAMP_FORMAT
         """
         self.id = task_id
         self.title = title
         self.description = description
         self.priority = priority
         self.completed = completed
-        self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if isinstance(created_at, int):
+            self.created_ts = created_at
+            self.created_text = None
+        elif not created_at:
+            self.created_ts = current_timestamp()
+            self.created_text = None
+        else:
+            self.created_ts, self.created_text = read_timestamp(created_at)
+
+    @property
+    def priority(self) -> str:
+        """Priority level of the task."""
+        return self._priority
+
+    @priority.setter
+    def priority(self, value: str) -> None:
+        self._priority = Priority.coerce(value)
+
+    @property
+    def created_at(self) -> str:
+        """Creation time formatted with TIMESTAMP_FORMAT, or as stored if it was not."""
+        if self.created_text is not None:
+            return self.created_text
+        return format_timestamp(self.created_ts)
+
+    @created_at.setter
+    def created_at(self, value: str) -> None:
+        self.created_ts, self.created_text = read_timestamp(value)
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -47,11 +198,58 @@ class Task:
             "id": self.id,
             "title": self.title,
             "description": self.description,
-            "priority": self.priority,
+            "priority": str(self._priority),
             "completed": self.completed,
             "created_at": self.created_at
         }
 
+    @classmethod
+    def restore(
+        cls,
+        task_id: int,
+        title: str,
+        description: str,
+        priority: str,
+        completed: bool,
+        created_ts: int,
+        created_text: Optional[str] = None
+    ) -> 'Task':
+        """
+        Rebuild a task from fields that were validated when it was stored.
+
+        Skips timestamp parsing and priority coercion, which dominate the cost
+        of loading large stores.
+
+        Args:
+            task_id: Unique identifier for the task
+            title: Title of the task
+            description: Detailed description of the task
+            priority: Priority already passed through Priority.coerce
+            completed: Whether the task is completed
+            created_ts: Integer creation timestamp
+            created_text: The created_at string, if the timestamp does not
+                reproduce it
+
+        Returns:
+            A new Task instance
+        """
+        task = cls.__new__(cls)
+        task.id = task_id
+        task.title = title
+        task.description = description
+        task._priority = priority
+        task.completed = completed
+        task.created_ts = created_ts
+        task.created_text = created_text
+        return task
+
+    def copy(self) -> 'Task':
+        """Return a detached copy, safe to read while this task changes."""
+        return Task.restore(
+            self.id, self.title, self.description, self._priority, self.completed,
+            self.created_ts, self.created_text
+        )
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Task':
         """
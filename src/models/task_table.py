@@ -0,0 +1,200 @@
+"""
+Columnar representation of a collection of tasks.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.models.task import Task, Priority
+from src.utils.exceptions import InvalidTaskDataException, TaskNotFoundException
+
+
+class TaskTable:
+    """
+    Column store for large task collections.
+
+    Fixed-size fields live in typed arrays (8 bytes per id and timestamp,
+    4 bytes per priority code, 1 byte per flag) and strings in plain lists,
+    so a row costs about 60% of a Task object; the strings take most of the
+    rest. Rows are materialized as Task objects only when read. Rows must
+    be appended in ascending id order, which is how TaskService allocates
+    ids; lookups by id use binary search.
+    """
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self.ids = array("q")
+        self.completed = array("b")
+        self.priorities = array("I")
+        self.created = array("q")
+        # created_at strings the timestamps do not reproduce, by row
+        self.created_texts: Dict[int, str] = {}
+        self.titles: List[str] = []
+        self.descriptions: List[str] = []
+        # Priority code -> value; known levels first, others appended on demand
+        self._priority_values: List[str] = list(Priority)
+        self._priority_codes: Dict[str, int] = {value: code for code, value in enumerate(self._priority_values)}
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Task]) -> 'TaskTable':
+        """
+        Build a table from Task objects.
+
+        Args:
+            tasks: Tasks in ascending id order
+
+        Returns:
+            A new TaskTable
+
+        Raises:
+            InvalidTaskDataException: If the ids are not ascending
+        """
+        table = cls()
+        for task in tasks:
+            table.append(task)
+        return table
+
+    @classmethod
+    def from_dicts(cls, task_dicts: Iterable[Dict[str, Any]]) -> 'TaskTable':
+        """
+        Build a table from task dictionaries as stored in task files.
+
+        Args:
+            task_dicts: Task dictionaries in ascending id order
+
+        Returns:
+            A new TaskTable
+
+        Raises:
+            InvalidTaskDataException: If the ids are not ascending
+        """
+        return cls.from_tasks(Task.from_dict(task_dict) for task_dict in task_dicts)
+
+    def _priority_code(self, priority: str) -> int:
+        """Return the code for a priority, registering unknown values."""
+        code = self._priority_codes.get(priority)
+        if code is None:
+            code = self._priority_codes[priority] = len(self._priority_values)
+            self._priority_values.append(priority)
+        return code
+
+    def append(self, task: Task) -> None:
+        """
+        Append a task as a new row.
+
+        Args:
+            task: Task whose id is greater than every id in the table
+
+        Raises:
+            InvalidTaskDataException: If the id is not greater than every id
+                in the table
+        """
+        if self.ids and task.id <= self.ids[-1]:
+            raise InvalidTaskDataException(
+                f"Task {task.id} appended after task {self.ids[-1]}; rows must be in ascending id order"
+            )
+        if task.created_text is not None:
+            self.created_texts[len(self.ids)] = task.created_text
+        self.ids.append(task.id)
+        self.completed.append(task.completed)
+        self.priorities.append(self._priority_code(task.priority))
+        self.created.append(task.created_ts)
+        self.titles.append(task.title)
+        self.descriptions.append(task.description)
+
+    def row_of(self, task_id: int) -> int:
+        """
+        Find the row holding a task.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            Row index of the task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        lo, hi = 0, len(self.ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ids[mid] < task_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(self.ids) or self.ids[lo] != task_id:
+            raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        return lo
+
+    def task(self, row: int) -> Task:
+        """
+        Materialize a row as a Task.
+
+        Args:
+            row: Row index
+
+        Returns:
+            A new Task with the row's values
+        """
+        return Task.restore(
+            self.ids[row],
+            self.titles[row],
+            self.descriptions[row],
+            self._priority_values[self.priorities[row]],
+            bool(self.completed[row]),
+            self.created[row],
+            self.created_texts.get(row)
+        )
+
+    def get(self, task_id: int) -> Task:
+        """
+        Materialize the task with the given ID.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            The requested Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        return self.task(self.row_of(task_id))
+
+    def rows(self, completed: Optional[bool] = None, priority: Optional[str] = None) -> List[int]:
+        """
+        Select rows by status and priority without materializing tasks.
+
+        Args:
+            completed: Only rows with this completion flag, if given
+            priority: Only rows with this priority, ignoring case, if given
+
+        Returns:
+            Matching row indexes in table order
+        """
+        selected = range(len(self.ids))
+        if completed is not None:
+            flags = self.completed
+            selected = [row for row in selected if bool(flags[row]) == completed]
+        if priority is not None:
+            wanted = priority.lower()
+            matching = {code for value, code in self._priority_codes.items() if value.lower() == wanted}
+            codes = self.priorities
+            selected = [row for row in selected if codes[row] in matching]
+        return list(selected)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Convert every row to the dictionary format used by task files.
+
+        Returns:
+            List of task dictionaries
+        """
+        return [task.to_dict() for task in self]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Task]:
+        for row in range(len(self.ids)):
+            yield self.task(row)
@@ -0,0 +1,204 @@
+"""
+Asyncio front end for the task service.
+"""
+
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+from src.models.task import Task
+from src.services.task_service import TaskService
+
+
+class AsyncTaskService:
+    """
+    Async API over a TaskService, for event-loop based front ends.
+
+    Mutations update the tasks in memory right away, on the event loop, and
+    queue their records. A single writer persists the queue off the loop in
+    an executor thread: everything queued while one write is in progress
+    goes out together in the next, as one storage.record_batch() call. Each
+    mutation returns once the write holding its record has finished.
+
+    Reads are answered from memory and never wait for a write; they see
+    every mutation already made, written or not. The tasks are only touched
+    on the event loop, so the service needs no locking of its own, but it
+    must be the store's only writer while it is open, like the daemon.
+    """
+
+    def __init__(self, service: TaskService):
+        """
+        Take over writing for a task service.
+
+        Args:
+            service: The service to wrap; it should not be used directly
+                afterwards
+
+        Raises:
+            TypeError: If the service is not a TaskService; only its storage
+                backend can take deferred writes
+        """
+        if not isinstance(service, TaskService):
+            raise TypeError(f"AsyncTaskService needs a TaskService, not {type(service).__name__}")
+        self.service = service
+        service.defer_writes()
+        # Completes when the records queued since the last write are stored;
+        # None while nothing is queued
+        self._next_write: Optional[asyncio.Future] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def open(cls, storage_file: str = "tasks.json", **kwargs: Any) -> "AsyncTaskService":
+        """
+        Load a store off the event loop and wrap its service.
+
+        Args:
+            storage_file: Path to the task storage file
+            **kwargs: Further TaskService arguments
+
+        Returns:
+            A new AsyncTaskService
+        """
+        loop = asyncio.get_running_loop()
+        service = await loop.run_in_executor(None, lambda: TaskService(storage_file, **kwargs))
+        return cls(service)
+
+    async def _persist(self) -> None:
+        """Wait until every record queued so far is stored."""
+        if self._next_write is None:
+            self._next_write = asyncio.get_running_loop().create_future()
+            if self._writer is None:
+                self._writer = asyncio.ensure_future(self._write_queued())
+        # Shielded: one caller giving up must not cancel the others' write
+        await asyncio.shield(self._next_write)
+
+    async def _write_queued(self) -> None:
+        """Write queued records, one batch per round, until the queue is empty."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._next_write is not None:
+                done, self._next_write = self._next_write, None
+                # Copies, as the tasks may change on the loop during the write
+                records = [(op, task.copy()) for op, task in self.service.take_deferred_writes()]
+                # Only a snapshot write needs every task; appending to a log does not
+                tasks = []
+                if self.service.storage.needs_snapshot(len(records)):
+                    tasks = [task.copy() for task in self.service.tasks]
+                try:
+                    await loop.run_in_executor(None, self._write, records, tasks)
+                except Exception as e:
+                    await self._fail(done, e)
+                else:
+                    done.set_result(None)
+        finally:
+            self._writer = None
+
+    def _write(self, records: List[Tuple[str, Task]], tasks: List[Task]) -> None:
+        """Store a batch of records; runs in an executor thread."""
+        with self.service.storage.lock():
+            self.service.storage.record_batch(records, tasks)
+
+    async def _fail(self, done: asyncio.Future, error: Exception) -> None:
+        """
+        Recover from a failed write.
+
+        The store still holds the state before the failed batch, so the
+        tasks are reloaded from it, off the loop like the writes. Mutations
+        queued behind the batch, including those made during the reload,
+        were made on top of it and are dropped too. The failed mutations
+        raise once the tasks are restored.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            tasks = await loop.run_in_executor(None, self.service.storage.load)
+        finally:
+            done.set_exception(error)
+            if self._next_write is not None:
+                self._next_write.set_exception(error)
+                self._next_write = None
+            self.service.take_deferred_writes()
+        self.service.reload(tasks)
+
+    async def add_task(self, title: str, description: str = "", priority: str = "medium") -> Task:
+        """
+        Add a new task; see TaskService.add_task.
+
+        Returns:
+            The newly created Task, once it is stored
+        """
+        task = self.service.add_task(title, description, priority)
+        await self._persist()
+        return task
+
+    async def update_task(self, task_id: int, **kwargs: Any) -> Task:
+        """
+        Update a task; see TaskService.update_task.
+
+        Returns:
+            The updated Task, once the change is stored
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        task = self.service.update_task(task_id, **kwargs)
+        await self._persist()
+        return task
+
+    async def complete_task(self, task_id: int) -> Task:
+        """
+        Mark a task as complete; see TaskService.complete_task.
+
+        Returns:
+            The updated Task, once the change is stored
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        return await self.update_task(task_id, completed=True)
+
+    async def delete_task(self, task_id: int) -> Task:
+        """
+        Delete a task; see TaskService.delete_task.
+
+        Returns:
+            The deleted Task, once the deletion is stored
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        task = self.service.delete_task(task_id)
+        await self._persist()
+        return task
+
+    async def get_task_by_id(self, task_id: int) -> Task:
+        """
+        Get a task by its ID; see TaskService.get_task_by_id.
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        return self.service.get_task_by_id(task_id)
+
+    async def search_tasks(self, keyword: str) -> List[Task]:
+        """Search tasks by keyword; see TaskService.search_tasks."""
+        return self.service.search_tasks(keyword)
+
+    async def search_query(self, query: str) -> List[Task]:
+        """Search tasks with the query language; see TaskService.search_query."""
+        return self.service.search_query(query)
+
+    async def get_all_tasks(self, *args: Any, **kwargs: Any) -> List[Task]:
+        """List tasks; takes the arguments of TaskService.get_all_tasks."""
+        return self.service.get_all_tasks(*args, **kwargs)
+
+    async def flush(self) -> None:
+        """Wait until every mutation made so far is stored."""
+        if self._next_write is not None:
+            await asyncio.shield(self._next_write)
+        elif self._writer is not None:
+            # Only the write already in progress is left
+            await asyncio.shield(self._writer)
+
+    async def close(self) -> None:
+        """Store any pending mutations and release the storage backend."""
+        await self.flush()
+        self.service.close()
@@ -0,0 +1,305 @@
+"""
+Interface shared by the task services.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.models.task import Task
+from src.utils import metrics
+from src.utils.exceptions import InvalidTaskDataException
+
+
+class BaseTaskService(ABC):
+    """
+    The query and CRUD operations every task service provides.
+
+    TaskService keeps the tasks in memory over a storage backend, and
+    SqliteTaskService queries a database; front ends such as the CLI, the
+    daemon, the API server and the web app use either through this
+    interface. Operations built from the others are implemented here once.
+    """
+
+    storage_file: str
+
+    @abstractmethod
+    def add_task(self, title: str, description: str = "", priority: str = "medium") -> Task:
+        """
+        Add a new task.
+
+        Args:
+            title: Task title
+            description: Task description
+            priority: Task priority (low, medium, high)
+
+        Returns:
+            The newly created Task
+        """
+
+    @abstractmethod
+    def bulk_add(self, entries: Iterable[Dict[str, Any]]) -> List[Task]:
+        """
+        Add many tasks in one batch.
+
+        Args:
+            entries: Dicts with a title and optionally description and priority
+
+        Returns:
+            The newly created Tasks, in order
+
+        Raises:
+            InvalidTaskDataException: If an entry has no title; no task is added
+        """
+
+    @abstractmethod
+    def update_task(self, task_id: int, **kwargs) -> Task:
+        """
+        Update a task with the given ID.
+
+        Args:
+            task_id: ID of the task to update
+            **kwargs: Task attributes to update
+
+        Returns:
+            The updated Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+
+    @abstractmethod
+    def delete_task(self, task_id: int) -> Task:
+        """
+        Delete a task.
+
+        Args:
+            task_id: ID of the task to delete
+
+        Returns:
+            The deleted Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+
+    @abstractmethod
+    def get_task_by_id(self, task_id: int) -> Task:
+        """
+        Get a task by its ID.
+
+        Args:
+            task_id: ID of the task to retrieve
+
+        Returns:
+            The requested Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "id",
+        descending: bool = False
+    ) -> List[Task]:
+        """
+        Find tasks by status and priority.
+
+        Args:
+            completed: Only return tasks with this status; any status if None
+            priority: Only return tasks with this priority, ignoring case; any
+                priority if None
+            offset: Number of matching tasks to skip
+            limit: Maximum number of tasks to return; all remaining if None
+            sort_by: "id", "created_at" (oldest first) or "priority" (high to low)
+            descending: Reverse the order
+
+        Returns:
+            List of Task objects
+
+        Raises:
+            ValueError: If sort_by is not one of SORT_FIELDS
+        """
+
+    @abstractmethod
+    def count_tasks(self, show_completed: bool = True, priority: Optional[str] = None) -> int:
+        """
+        Count the tasks get_all_tasks would return without offset and limit.
+
+        Args:
+            show_completed: Whether to include completed tasks
+            priority: Only count tasks with this priority (low, medium, high)
+
+        Returns:
+            Number of matching tasks
+        """
+
+    @abstractmethod
+    def iter_tasks(self, show_completed: bool = True) -> Iterator[Task]:
+        """
+        Iterate over tasks without building a list.
+
+        Args:
+            show_completed: Whether to include completed tasks
+
+        Yields:
+            Task objects
+        """
+
+    @abstractmethod
+    def search_tasks(self, keyword: str) -> List[Task]:
+        """
+        Search for tasks containing the keyword.
+
+        Args:
+            keyword: Keyword to search for in task titles and descriptions
+
+        Returns:
+            List of matching Task objects
+        """
+
+    @abstractmethod
+    def search_query(self, query: str) -> List[Task]:
+        """
+        Search for tasks with the query language of the search_query module.
+
+        Args:
+            query: The query
+
+        Returns:
+            List of matching Task objects, most relevant first
+
+        Raises:
+            InvalidQueryException: If the query is malformed
+        """
+
+    @abstractmethod
+    def batch(self) -> Iterator["BaseTaskService"]:
+        """
+        Group several mutations, as a context manager, so they are stored
+        together, or not at all if the block raises. Nested batches join the
+        outermost one.
+
+        Yields:
+            This service
+        """
+
+    @abstractmethod
+    def refresh(self) -> None:
+        """Pick up changes other processes have written to the store."""
+
+    @abstractmethod
+    def compact(self) -> None:
+        """Fold any pending mutations into the store's compact form."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the resources held by the service."""
+
+    @staticmethod
+    def _task_from_entry(task_id: int, entry: Dict[str, Any], created_ts: int) -> Task:
+        """
+        Build a new task from a bulk_add entry.
+
+        Raises:
+            InvalidTaskDataException: If the entry has no title
+        """
+        if not entry.get("title"):
+            raise InvalidTaskDataException(f"Task entry {entry!r} has no title")
+        return Task(
+            task_id, entry["title"], entry.get("description", ""),
+            entry.get("priority", "medium"), created_at=created_ts
+        )
+
+    def get_all_tasks(
+        self,
+        show_completed: bool = True,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "id",
+        descending: bool = False
+    ) -> List[Task]:
+        """
+        Get all tasks, optionally filtering by status and priority.
+
+        Filters are applied before offset and limit, so consecutive pages of
+        a filtered listing never overlap or skip tasks.
+
+        Args:
+            show_completed: Whether to include completed tasks
+            priority: Only return tasks with this priority (low, medium, high)
+            offset: Number of matching tasks to skip
+            limit: Maximum number of tasks to return; all remaining if None
+            sort_by: "id", "created_at" or "priority"; see query()
+            descending: Reverse the order
+
+        Returns:
+            List of Task objects
+        """
+        return self.query(
+            completed=None if show_completed else False,
+            priority=priority,
+            offset=offset,
+            limit=limit,
+            sort_by=sort_by,
+            descending=descending
+        )
+
+    def complete_task(self, task_id: int) -> Task:
+        """
+        Mark a task as complete.
+
+        Args:
+            task_id: ID of the task to mark as complete
+
+        Returns:
+            The updated Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        return self.update_task(task_id, completed=True)
+
+    def bulk_update(self, task_ids: Iterable[int], **kwargs) -> List[Task]:
+        """
+        Apply the same update to many tasks in one batch.
+
+        Args:
+            task_ids: IDs of the tasks to update
+            **kwargs: Task attributes to update
+
+        Returns:
+            The updated Tasks, in order
+
+        Raises:
+            TaskNotFoundException: If any ID does not exist; no task is updated
+        """
+        with self.batch():
+            return [self.update_task(task_id, **kwargs) for task_id in task_ids]
+
+    def bulk_delete(self, task_ids: Iterable[int]) -> List[Task]:
+        """
+        Delete many tasks in one batch.
+
+        Args:
+            task_ids: IDs of the tasks to delete
+
+        Returns:
+            The deleted Tasks, in order
+
+        Raises:
+            TaskNotFoundException: If any ID does not exist; no task is deleted
+        """
+        with self.batch():
+            return [self.delete_task(task_id) for task_id in task_ids]
+
+
+# Timed while metrics are enabled, for every service; the services time
+# their own methods
+metrics.instrument(BaseTaskService, ("get_all_tasks", "complete_task", "bulk_update", "bulk_delete"))
@@ -0,0 +1,520 @@
+"""
+Compact binary snapshot format for task stores.
+
+A snapshot stores the tasks column by column, sorted by id. All integers are
+little-endian, and the 8-byte columns are 8-byte aligned:
+
+    header           magic b"TSKS", u16 version, u16 flags, u64 task count
+    ids              count x i64
+    created          count x i64, the tasks' integer timestamps
+    title offsets    (count + 1) x u64 byte offsets into the title bytes
+    desc offsets     (count + 1) x u64 byte offsets into the description bytes
+    completed        count x u8
+    priorities       count x u32 (u8 before version 3), codes into the
+                     priority table
+    priority table   u32 entry count, then per entry a u32 byte length and
+                     the UTF-8 bytes
+    titles           UTF-8 bytes of every title, back to back
+    descriptions     UTF-8 bytes of every description, back to back
+    created texts    u32 entry count, then per entry a u64 row, a u32 byte
+                     length and the UTF-8 bytes of a created_at string that
+                     the row's timestamp does not reproduce (version 2 on)
+
+String lengths are the differences between consecutive offsets. Fixed-width
+columns load with a single copy into an array, and the offset tables let a
+reader find any task's fields without scanning the file, which is what makes
+the format usable straight from a memory map.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate, chain
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.models.task import Task, Priority
+from src.utils.exceptions import StorageException
+
+# File extension that selects the binary format
+BINARY_EXTENSION = ".tsb"
+
+MAGIC = b"TSKS"
+FORMAT_VERSION = 3
+
+# Header flags: the string section is pure ASCII, so byte offsets are also
+# character offsets and the whole section can be decoded at once
+FLAG_ASCII_TITLES = 0x1
+FLAG_ASCII_DESCRIPTIONS = 0x2
+
+HEADER = struct.Struct("<4sHHQ")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_I64 = struct.Struct("<q")
+
+# The format is little-endian; arrays use the machine's byte order
+_SWAP = sys.byteorder == "big"
+
+# Rows decoded at a time when streaming a snapshot
+_CHUNK_ROWS = 4096
+
+# Errors malformed input can raise while decoding
+_DECODE_ERRORS = (struct.error, IndexError, ValueError)
+
+
+def is_binary_snapshot(path: str) -> bool:
+    """Return whether a storage file uses the binary snapshot format."""
+    return path.endswith(BINARY_EXTENSION)
+
+
+def _packed(typecode: str, values: Iterable[int]) -> bytes:
+    """Pack integers into little-endian bytes."""
+    column = array(typecode, values)
+    if _SWAP:
+        column.byteswap()
+    return column.tobytes()
+
+
+def _unpacked(typecode: str, data: bytes) -> array:
+    """Unpack little-endian bytes into an array of integers."""
+    column = array(typecode)
+    column.frombytes(data)
+    if _SWAP:
+        column.byteswap()
+    return column
+
+
+def _encode_strings(values: List[str]) -> Tuple[bytes, List[int], bool]:
+    """
+    Encode a string column.
+
+    Returns:
+        The concatenated UTF-8 bytes, the count + 1 byte offsets, and whether
+        the column is pure ASCII
+    """
+    text = "".join(values)
+    if text.isascii():
+        return text.encode("ascii"), list(accumulate(map(len, values), initial=0)), True
+    encoded = [value.encode("utf-8") for value in values]
+    return b"".join(encoded), list(accumulate(map(len, encoded), initial=0)), False
+
+
+def _decode_strings(data: bytes, offsets: array, ascii_only: bool) -> List[str]:
+    """
+    Split part of a string section back into its values.
+
+    Args:
+        data: The section's bytes from offsets[0] to offsets[-1]
+        offsets: Section offsets of the values, plus the end of the last one
+        ascii_only: Whether the section is pure ASCII
+    """
+    base = offsets[0]
+    if ascii_only:
+        # Decode once and slice the str: offsets are character offsets too
+        text = data.decode("ascii")
+        if not base:
+            return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+        return [text[start - base:end - base] for start, end in zip(offsets, offsets[1:])]
+    return [data[start - base:end - base].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+
+def dump_snapshot(tasks: Iterable[Task], f: BinaryIO) -> None:
+    """
+    Write tasks as a binary snapshot.
+
+    Args:
+        tasks: Tasks to write
+        f: Binary file to write to
+    """
+    tasks = list(tasks)
+    if any(tasks[i].id > tasks[i + 1].id for i in range(len(tasks) - 1)):
+        tasks.sort(key=lambda task: task.id)
+
+    priority_values: List[str] = []
+    priority_codes = {}
+    codes = array("I")
+    for task in tasks:
+        code = priority_codes.get(task.priority)
+        if code is None:
+            code = priority_codes[task.priority] = len(priority_values)
+            priority_values.append(task.priority)
+        codes.append(code)
+
+    titles, title_offsets, ascii_titles = _encode_strings([task.title for task in tasks])
+    descriptions, description_offsets, ascii_descriptions = _encode_strings(
+        [task.description for task in tasks]
+    )
+    flags = (FLAG_ASCII_TITLES if ascii_titles else 0) | (FLAG_ASCII_DESCRIPTIONS if ascii_descriptions else 0)
+
+    priority_table = bytearray(_U32.pack(len(priority_values)))
+    for value in priority_values:
+        encoded = str(value).encode("utf-8")
+        priority_table += _U32.pack(len(encoded)) + encoded
+
+    created_texts = [(row, task.created_text) for row, task in enumerate(tasks) if task.created_text is not None]
+    created_table = bytearray(_U32.pack(len(created_texts)))
+    for row, text in created_texts:
+        encoded = text.encode("utf-8")
+        created_table += _U64.pack(row) + _U32.pack(len(encoded)) + encoded
+
+    count = len(tasks)
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, count))
+    f.write(_packed("q", (task.id for task in tasks)))
+    f.write(_packed("q", (task.created_ts for task in tasks)))
+    f.write(_packed("Q", title_offsets))
+    f.write(_packed("Q", description_offsets))
+    f.write(bytes(bool(task.completed) for task in tasks))
+    f.write(_packed("I", codes))
+    f.write(priority_table)
+    f.write(titles)
+    f.write(descriptions)
+    f.write(created_table)
+
+
+class SnapshotLayout:
+    """
+    Section positions of a binary snapshot, read from its header.
+
+    Attributes:
+        count: Number of tasks
+        flags: Header flags
+        ids, created, title_offsets, description_offsets, completed,
+        priorities: Byte offset of each fixed-width section
+        priority_width: Bytes per priority code
+        priority_values: Decoded priority table
+        titles, title_end, descriptions, description_end: Byte range of
+        each string section
+        created_texts: Decoded created_at strings, by row
+    """
+
+    def __init__(self, buffer: bytes):
+        """
+        Read the header and priority table of a snapshot.
+
+        Args:
+            buffer: The snapshot, as bytes or a memory map
+
+        Raises:
+            StorageException: If the buffer is not a snapshot this version can read
+        """
+        if len(buffer) < HEADER.size:
+            raise StorageException("Binary snapshot is truncated")
+        magic, version, self.flags, self.count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise StorageException("File is not a binary task snapshot")
+        if version > FORMAT_VERSION:
+            raise StorageException(
+                f"Binary snapshot version {version} is newer than the supported version {FORMAT_VERSION}"
+            )
+
+        count = self.count
+        self.ids = HEADER.size
+        self.created = self.ids + 8 * count
+        self.title_offsets = self.created + 8 * count
+        self.description_offsets = self.title_offsets + 8 * (count + 1)
+        self.completed = self.description_offsets + 8 * (count + 1)
+        self.priorities = self.completed + count
+        self.priority_width = 4 if version >= 3 else 1
+        position = self.priorities + self.priority_width * count
+        if position + _U32.size > len(buffer):
+            raise StorageException("Binary snapshot is truncated")
+
+        (entries,) = _U32.unpack_from(buffer, position)
+        position += _U32.size
+        self.priority_values: List[str] = []
+        for _ in range(entries):
+            (size,) = _U32.unpack_from(buffer, position)
+            position += _U32.size
+            self.priority_values.append(Priority.coerce(buffer[position:position + size].decode("utf-8")))
+            position += size
+        self.titles = position
+
+        self.title_end = self.titles + self._last_offset(buffer, self.title_offsets)
+        self.descriptions = self.title_end
+        self.description_end = self.descriptions + self._last_offset(buffer, self.description_offsets)
+        if self.description_end > len(buffer):
+            raise StorageException("Binary snapshot is truncated")
+
+        self.created_texts: Dict[int, str] = {}
+        if version >= 2:
+            position = self.description_end
+            (entries,) = _U32.unpack_from(buffer, position)
+            position += _U32.size
+            for _ in range(entries):
+                (row,) = _U64.unpack_from(buffer, position)
+                (size,) = _U32.unpack_from(buffer, position + _U64.size)
+                position += _U64.size + _U32.size
+                if position + size > len(buffer):
+                    raise StorageException("Binary snapshot is truncated")
+                self.created_texts[row] = buffer[position:position + size].decode("utf-8")
+                position += size
+
+    def _last_offset(self, buffer: bytes, table: int) -> int:
+        """Return the final entry of an offset table: the section's size."""
+        return struct.unpack_from("<Q", buffer, table + 8 * self.count)[0]
+
+
+class MappedSnapshot:
+    """
+    Read access to a binary snapshot without decoding all of it.
+
+    Only the header and priority table are read up front. A task is found by
+    binary search over the id column and decoded on its own, and iteration
+    decodes a chunk of rows at a time, so Task objects exist only for the
+    rows a caller actually reaches. Over a memory map, the pages touched by
+    a lookup are all that is read from disk.
+    """
+
+    def __init__(self, buffer: bytes):
+        """
+        Read the layout of a snapshot.
+
+        Args:
+            buffer: The snapshot, as bytes or a memory map
+
+        Raises:
+            StorageException: If the buffer is not a valid snapshot
+        """
+        try:
+            self.layout = SnapshotLayout(buffer)
+        except _DECODE_ERRORS as e:
+            raise StorageException(f"Binary snapshot is corrupted: {e}")
+        self.buffer = buffer
+
+    def __len__(self) -> int:
+        return self.layout.count
+
+    def _texts(self, title_offsets: array, description_offsets: array) -> Tuple[List[str], List[str]]:
+        """Decode the titles and descriptions between two slices of the offset tables."""
+        buffer, layout = self.buffer, self.layout
+        if (layout.titles + title_offsets[-1] > layout.title_end
+                or layout.descriptions + description_offsets[-1] > layout.description_end):
+            raise ValueError("string offset out of range")
+        titles = _decode_strings(
+            buffer[layout.titles + title_offsets[0]:layout.titles + title_offsets[-1]],
+            title_offsets,
+            bool(layout.flags & FLAG_ASCII_TITLES)
+        )
+        descriptions = _decode_strings(
+            buffer[layout.descriptions + description_offsets[0]:layout.descriptions + description_offsets[-1]],
+            description_offsets,
+            bool(layout.flags & FLAG_ASCII_DESCRIPTIONS)
+        )
+        return titles, descriptions
+
+    def _offsets(self, start: int, stop: int) -> Tuple[array, array]:
+        """Read the title and description offsets of rows start to stop, plus the end of the last."""
+        buffer, layout = self.buffer, self.layout
+        return (
+            _unpacked("Q", buffer[layout.title_offsets + 8 * start:layout.title_offsets + 8 * (stop + 1)]),
+            _unpacked("Q", buffer[layout.description_offsets + 8 * start:layout.description_offsets + 8 * (stop + 1)])
+        )
+
+    def _columns(
+        self, start: int, stop: int
+    ) -> Tuple[array, List[str], List[str], List[str], List[bool], array, List[Optional[str]]]:
+        """Decode rows start to stop as columns in Task.restore argument order."""
+        buffer, layout = self.buffer, self.layout
+        ids = _unpacked("q", buffer[layout.ids + 8 * start:layout.ids + 8 * stop])
+        created = _unpacked("q", buffer[layout.created + 8 * start:layout.created + 8 * stop])
+        completed = [flag != 0 for flag in buffer[layout.completed + start:layout.completed + stop]]
+        width = layout.priority_width
+        codes = buffer[layout.priorities + width * start:layout.priorities + width * stop]
+        priorities = list(map(layout.priority_values.__getitem__, _unpacked("I", codes) if width == 4 else codes))
+        titles, descriptions = self._texts(*self._offsets(start, stop))
+        created_texts = layout.created_texts
+        if created_texts:
+            texts = [created_texts.get(row) for row in range(start, stop)]
+        else:
+            texts = [None] * (stop - start)
+        return ids, titles, descriptions, priorities, completed, created, texts
+
+    def tasks(self, start: int = 0, stop: Optional[int] = None) -> List[Task]:
+        """
+        Materialize a range of rows.
+
+        Args:
+            start: First row
+            stop: Row after the last one; the end of the snapshot if None
+
+        Returns:
+            Tasks in id order
+
+        Raises:
+            StorageException: If the rows cannot be decoded
+        """
+        stop = self.layout.count if stop is None else min(stop, self.layout.count)
+        if start >= stop:
+            return []
+        try:
+            return list(map(Task.restore, *self._columns(start, stop)))
+        except _DECODE_ERRORS as e:
+            raise StorageException(f"Binary snapshot is corrupted: {e}")
+
+    def row_of(self, task_id: int) -> Optional[int]:
+        """
+        Find the row holding a task.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            Row index of the task, or None if the snapshot does not hold it
+        """
+        buffer, ids = self.buffer, self.layout.ids
+        lo, hi = 0, self.layout.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _I64.unpack_from(buffer, ids + 8 * mid)[0] < task_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.layout.count or _I64.unpack_from(buffer, ids + 8 * lo)[0] != task_id:
+            return None
+        return lo
+
+    def highest_id(self) -> int:
+        """Return the last id in the id column, or 0 for an empty snapshot."""
+        if not self.layout.count:
+            return 0
+        return _I64.unpack_from(self.buffer, self.layout.ids + 8 * (self.layout.count - 1))[0]
+
+    def get(self, task_id: int) -> Optional[Task]:
+        """
+        Materialize the task with the given ID.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            The task, or None if the snapshot does not hold it
+        """
+        row = self.row_of(task_id)
+        return None if row is None else self.tasks(row, row + 1)[0]
+
+    def __iter__(self) -> Iterator[Task]:
+        for start in range(0, self.layout.count, _CHUNK_ROWS):
+            yield from self.tasks(start, start + _CHUNK_ROWS)
+
+    def matching(self, match: Callable[[str, str], bool]) -> Iterator[Task]:
+        """
+        Stream the tasks whose text satisfies a predicate.
+
+        Only the matching rows are materialized as Task objects.
+
+        Args:
+            match: Called with each task's title and description
+
+        Yields:
+            Matching tasks in id order
+
+        Raises:
+            StorageException: If the rows cannot be decoded
+        """
+        for start in range(0, self.layout.count, _CHUNK_ROWS):
+            try:
+                columns = self._columns(start, min(start + _CHUNK_ROWS, self.layout.count))
+            except _DECODE_ERRORS as e:
+                raise StorageException(f"Binary snapshot is corrupted: {e}")
+            ids, titles, descriptions, priorities, completed, created, texts = columns
+            for row, (title, description) in enumerate(zip(titles, descriptions)):
+                if match(title, description):
+                    yield Task.restore(
+                        ids[row], title, description, priorities[row], completed[row], created[row], texts[row]
+                    )
+
+    def matching_rows(self, match: Callable[[str, str], bool], start: int = 0, stop: Optional[int] = None) -> List[int]:
+        """
+        Find the rows whose text satisfies a predicate, decoding only the text.
+
+        Args:
+            match: Called with each task's title and description
+            start: First row to scan
+            stop: Row after the last one to scan; the end of the snapshot if None
+
+        Returns:
+            Matching rows, ascending
+
+        Raises:
+            StorageException: If the rows cannot be decoded
+        """
+        stop = self.layout.count if stop is None else min(stop, self.layout.count)
+        rows = []
+        for chunk in range(start, stop, _CHUNK_ROWS):
+            try:
+                titles, descriptions = self._texts(*self._offsets(chunk, min(chunk + _CHUNK_ROWS, stop)))
+            except _DECODE_ERRORS as e:
+                raise StorageException(f"Binary snapshot is corrupted: {e}")
+            rows.extend(
+                chunk + row for row, (title, description) in enumerate(zip(titles, descriptions))
+                if match(title, description)
+            )
+        return rows
+
+    def tasks_at(self, rows: Iterable[int]) -> List[Task]:
+        """
+        Materialize the tasks of ascending rows.
+
+        Rows falling in the same chunk are decoded together, from the first
+        of them to the last, so a dense set of rows costs about as much as
+        a scan and a sparse one about one decode per row.
+
+        Args:
+            rows: Row indexes, ascending
+
+        Returns:
+            Tasks in row order, which is id order
+
+        Raises:
+            StorageException: If the rows cannot be decoded
+        """
+        tasks: List[Task] = []
+        run: List[int] = []
+        for row in chain(rows, [None]):
+            if run and (row is None or row // _CHUNK_ROWS != run[0] // _CHUNK_ROWS):
+                first = run[0]
+                decoded = self.tasks(first, run[-1] + 1)
+                tasks.extend(decoded[row - first] for row in run)
+                run = []
+            if row is not None:
+                run.append(row)
+        return tasks
+
+
+def load_snapshot(buffer: bytes) -> List[Task]:
+    """
+    Decode every task in a binary snapshot.
+
+    Args:
+        buffer: The snapshot, as bytes or a memory map
+
+    Returns:
+        Tasks in id order
+
+    Raises:
+        StorageException: If the buffer is not a valid snapshot
+    """
+    return MappedSnapshot(buffer).tasks()
+
+
+@contextmanager
+def open_snapshot(f: BinaryIO) -> Iterator[MappedSnapshot]:
+    """
+    Map an open binary snapshot file read-only for the duration of the block.
+
+    Args:
+        f: Snapshot file opened in binary mode
+
+    Yields:
+        A MappedSnapshot over the file
+
+    Raises:
+        StorageException: If the file is not a valid snapshot
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        # An empty file cannot be mapped
+        raise StorageException("Binary snapshot is empty")
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield MappedSnapshot(mapped)
@@ -0,0 +1,319 @@
+"""
+Long-running task service reachable over a Unix domain socket.
+
+``task-manager serve`` keeps one TaskService loaded and answers requests on a
+socket next to the store, so other commands skip loading the tasks. The
+protocol is line-delimited JSON, one request and one response per line:
+
+    -> {"method": "complete_task", "params": {"task_id": 3}}
+    <- {"result": {"id": 3, "title": "...", ...}}
+    <- {"error": {"type": "TaskNotFoundException", "message": "..."}}
+
+A connection may carry any number of requests. Tasks travel as their
+to_dict() form.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.models.task import Task
+from src.services.base_task_service import BaseTaskService
+from src.utils import metrics
+from src.utils.exceptions import (
+    TaskManagerException, TaskNotFoundException, InvalidTaskDataException, StorageException,
+    InvalidQueryException
+)
+
+# Methods a client may call, by the kind of value they return
+_TASK = "task"
+_TASKS = "tasks"
+_VALUE = "value"
+METHODS = {
+    "add_task": _TASK,
+    "update_task": _TASK,
+    "complete_task": _TASK,
+    "delete_task": _TASK,
+    "get_task_by_id": _TASK,
+    "get_all_tasks": _TASKS,
+    "iter_tasks": _TASKS,
+    "query": _TASKS,
+    "search_tasks": _TASKS,
+    "search_query": _TASKS,
+    "count_tasks": _VALUE,
+    # Answered by the daemon itself: its metrics in the Prometheus text format
+    "metrics": _VALUE,
+}
+
+# Exceptions re-raised on the client side, by name
+_ERRORS = {
+    cls.__name__: cls
+    for cls in (
+        TaskManagerException, TaskNotFoundException, InvalidTaskDataException,
+        StorageException, InvalidQueryException, ValueError, TypeError
+    )
+}
+
+
+def socket_path_for(storage_file: str) -> str:
+    """
+    Return the daemon socket path for a store.
+
+    Args:
+        storage_file: Path to the task storage file
+
+    Returns:
+        The socket path, ``<storage_file>.sock``
+    """
+    return f"{storage_file}.sock"
+
+
+def _encode_result(kind: str, result: Any) -> Any:
+    """Turn a service method's return value into JSON-compatible data."""
+    if kind == _TASK:
+        return result.to_dict()
+    if kind == _TASKS:
+        return [task.to_dict() for task in result]
+    return result
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answer the requests of one connection until the client closes it."""
+
+    # Seconds a connection may stay idle before its thread gives up on it
+    timeout = 30
+
+    def handle(self) -> None:
+        try:
+            for line in self.rfile:
+                response = self.server.dispatch(line)
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except OSError:
+            # The client went away or idled past the timeout
+            pass
+
+
+class TaskServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Socket server answering requests from a single task service.
+
+    Each connection is served on its own thread, so an idle or slow client
+    does not hold up the others, but requests run against the service one
+    at a time. Before each request the service picks up changes other
+    processes wrote to the store.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service: BaseTaskService, socket_path: str):
+        """
+        Bind the server to its socket.
+
+        Args:
+            service: TaskService or SqliteTaskService to serve
+            socket_path: Path of the Unix domain socket
+
+        Raises:
+            StorageException: If another daemon is already serving the socket
+        """
+        running = connect(socket_path)
+        if running is not None:
+            running.close()
+            raise StorageException(f"A task manager daemon is already running on '{socket_path}'")
+        if os.path.exists(socket_path):
+            # Left behind by a daemon that did not shut down cleanly
+            os.remove(socket_path)
+        self.service = service
+        self._service_lock = threading.Lock()
+        self.socket_path = socket_path
+        super().__init__(socket_path, _RequestHandler)
+
+    def dispatch(self, line: bytes) -> Dict[str, Any]:
+        """
+        Run one request against the service.
+
+        Args:
+            line: The request, a JSON object with "method" and "params"
+
+        Returns:
+            The response, with either "result" or "error"
+        """
+        try:
+            request = json.loads(line)
+            method = request["method"]
+            if method not in METHODS:
+                raise ValueError(f"Unknown method '{method}'")
+            if method == "metrics":
+                result = metrics.REGISTRY.exposition()
+            else:
+                with self._service_lock:
+                    self.service.refresh()
+                    result = getattr(self.service, method)(**request.get("params", {}))
+            return {"result": _encode_result(METHODS[method], result)}
+        except (TaskManagerException, ValueError, TypeError, KeyError) as e:
+            name = type(e).__name__ if type(e).__name__ in _ERRORS else ValueError.__name__
+            return {"error": {"type": name, "message": str(e)}}
+        except Exception as e:
+            # Keep serving; the client reports the failure
+            return {"error": {"type": TaskManagerException.__name__, "message": str(e)}}
+
+    def server_close(self) -> None:
+        """Close the socket and remove its file."""
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class DaemonClient:
+    """
+    Client for a running daemon, usable in place of a TaskService.
+
+    Covers the service methods the CLI uses; each call is one round trip
+    over a connection kept open until close().
+    """
+
+    def __init__(self, sock: socket.socket):
+        """
+        Initialize the client.
+
+        Args:
+            sock: Socket connected to the daemon
+        """
+        self._socket = sock
+        self._file = sock.makefile("rwb")
+
+    def call(self, method: str, **params: Any) -> Any:
+        """
+        Call a service method on the daemon.
+
+        Args:
+            method: Name of the method, one of METHODS
+            **params: Keyword arguments of the method
+
+        Returns:
+            The method's return value, with tasks rebuilt as Task objects
+
+        Raises:
+            TaskManagerException: Or the subclass the daemon raised
+            StorageException: If the connection to the daemon is lost
+        """
+        try:
+            self._file.write(json.dumps({"method": method, "params": params}).encode("utf-8") + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        except OSError as e:
+            raise StorageException(f"Lost connection to the task manager daemon: {e}")
+        if not line:
+            raise StorageException("The task manager daemon closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            error = response["error"]
+            raise _ERRORS.get(error["type"], TaskManagerException)(error["message"])
+        result = response["result"]
+        kind = METHODS[method]
+        if kind == _TASK:
+            return Task.from_dict(result)
+        if kind == _TASKS:
+            return [Task.from_dict(task_dict) for task_dict in result]
+        return result
+
+    def add_task(self, title: str, description: str = "", priority: str = "medium") -> Task:
+        """Call TaskService.add_task on the daemon."""
+        return self.call("add_task", title=title, description=description, priority=priority)
+
+    def update_task(self, task_id: int, **kwargs) -> Task:
+        """Call TaskService.update_task on the daemon."""
+        return self.call("update_task", task_id=task_id, **kwargs)
+
+    def complete_task(self, task_id: int) -> Task:
+        """Call TaskService.complete_task on the daemon."""
+        return self.call("complete_task", task_id=task_id)
+
+    def delete_task(self, task_id: int) -> Task:
+        """Call TaskService.delete_task on the daemon."""
+        return self.call("delete_task", task_id=task_id)
+
+    def search_tasks(self, keyword: str) -> List[Task]:
+        """Call TaskService.search_tasks on the daemon."""
+        return self.call("search_tasks", keyword=keyword)
+
+    def search_query(self, query: str) -> List[Task]:
+        """Call TaskService.search_query on the daemon."""
+        return self.call("search_query", query=query)
+
+    def get_task_by_id(self, task_id: int) -> Task:
+        """Call TaskService.get_task_by_id on the daemon."""
+        return self.call("get_task_by_id", task_id=task_id)
+
+    def get_all_tasks(
+        self,
+        show_completed: bool = True,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "id",
+        descending: bool = False
+    ) -> List[Task]:
+        """Call TaskService.get_all_tasks on the daemon."""
+        return self.call(
+            "get_all_tasks", show_completed=show_completed, priority=priority,
+            offset=offset, limit=limit, sort_by=sort_by, descending=descending
+        )
+
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "id",
+        descending: bool = False
+    ) -> List[Task]:
+        """Call TaskService.query on the daemon."""
+        return self.call(
+            "query", completed=completed, priority=priority,
+            offset=offset, limit=limit, sort_by=sort_by, descending=descending
+        )
+
+    def count_tasks(self, show_completed: bool = True, priority: Optional[str] = None) -> int:
+        """Call TaskService.count_tasks on the daemon."""
+        return self.call("count_tasks", show_completed=show_completed, priority=priority)
+
+    def iter_tasks(self, show_completed: bool = True) -> Iterator[Task]:
+        """Call TaskService.iter_tasks on the daemon; the tasks arrive in one response."""
+        return iter(self.call("iter_tasks", show_completed=show_completed))
+
+    def metrics(self) -> str:
+        """Return the daemon's metrics in the Prometheus text format."""
+        return self.call("metrics")
+
+    def close(self) -> None:
+        """Close the connection to the daemon."""
+        self._file.close()
+        self._socket.close()
+
+
+def connect(socket_path: str) -> Optional[DaemonClient]:
+    """
+    Connect to the daemon serving a socket, if one is running.
+
+    Args:
+        socket_path: Path of the daemon's Unix domain socket
+
+    Returns:
+        A client, or None if no daemon is listening on the socket
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        # A socket file without a listener: the daemon is gone
+        sock.close()
+        return None
+    return DaemonClient(sock)
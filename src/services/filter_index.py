@@ -0,0 +1,127 @@
+"""
+Secondary indexes for filtering tasks by status and priority.
+"""
+
+from typing import AbstractSet, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.models.task import Task
+
+
+class FilterIndex:
+    """
+    Incremental set-based indexes on task status and priority.
+
+    Each status and each lowercased priority maps to the set of task ids that
+    have it. A query intersects the sets it needs, starting from the smallest,
+    so its cost follows the size of the sets involved rather than the number
+    of tasks in the store.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()):
+        """
+        Initialize the index.
+
+        Args:
+            tasks: Tasks to index up front
+        """
+        self._keys: Dict[int, Tuple[bool, str]] = {}
+        self._by_completed: Dict[bool, Set[int]] = {False: set(), True: set()}
+        self._by_priority: Dict[str, Set[int]] = {}
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task: Task) -> None:
+        """
+        Index a task's status and priority.
+
+        Args:
+            task: The task to index
+        """
+        keys = (bool(task.completed), task.priority.lower())
+        self._keys[task.id] = keys
+        self._by_completed[keys[0]].add(task.id)
+        ids = self._by_priority.get(keys[1])
+        if ids is None:
+            ids = self._by_priority[keys[1]] = set()
+        ids.add(task.id)
+
+    def remove(self, task_id: int) -> None:
+        """
+        Drop a task from the index.
+
+        Args:
+            task_id: ID of the task to drop
+        """
+        completed, priority = self._keys.pop(task_id)
+        self._by_completed[completed].discard(task_id)
+        ids = self._by_priority[priority]
+        ids.discard(task_id)
+        if not ids:
+            del self._by_priority[priority]
+
+    def update(self, task: Task) -> None:
+        """
+        Re-index a task whose status or priority may have changed.
+
+        Args:
+            task: The task to re-index
+        """
+        if self._keys.get(task.id) != (bool(task.completed), task.priority.lower()):
+            self.remove(task.id)
+            self.add(task)
+
+    def matching(self, completed: Optional[bool], priority: Optional[str]) -> AbstractSet[int]:
+        """
+        Return the set of ids matching the filters; at least one must be set.
+
+        A single filter returns the index's own set, which must not be modified.
+
+        Args:
+            completed: Only match tasks with this status; any status if None
+            priority: Only match tasks with this priority, ignoring case; any
+                priority if None
+
+        Returns:
+            Matching task ids, unordered
+        """
+        sets = []
+        if completed is not None:
+            sets.append(self._by_completed[bool(completed)])
+        if priority is not None:
+            sets.append(self._by_priority.get(priority.lower(), frozenset()))
+        if len(sets) == 1:
+            return sets[0]
+        smaller, larger = sorted(sets, key=len)
+        return smaller & larger
+
+    def query(self, completed: Optional[bool] = None, priority: Optional[str] = None) -> List[int]:
+        """
+        Find the tasks matching every given filter.
+
+        Args:
+            completed: Only match tasks with this status; any status if None
+            priority: Only match tasks with this priority, ignoring case; any
+                priority if None
+
+        Returns:
+            Matching task ids in ascending order
+        """
+        if completed is None and priority is None:
+            return sorted(self._keys)
+        return sorted(self.matching(completed, priority))
+
+    def count(self, completed: Optional[bool] = None, priority: Optional[str] = None) -> int:
+        """
+        Count the tasks matching every given filter.
+
+        Args:
+            completed: Only count tasks with this status; any status if None
+            priority: Only count tasks with this priority, ignoring case; any
+                priority if None
+
+        Returns:
+            Number of matching tasks
+        """
+        if completed is None and priority is None:
+            return len(self._keys)
+        return len(self.matching(completed, priority))
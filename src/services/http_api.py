@@ -0,0 +1,356 @@
+"""
+HTTP/JSON API over a task service.
+
+``task-manager api`` keeps one service loaded and answers HTTP requests, so
+other programs can work with the tasks without Streamlit and without
+reading the store themselves:
+
+    GET    /tasks                  list; ?completed=, ?priority=, ?sort=,
+                                   ?order=asc|desc, ?offset=, ?limit=
+    POST   /tasks                  create from {"title", "description", "priority"}
+    GET    /tasks/<id>             get
+    PATCH  /tasks/<id>             update any of title, description, priority, completed
+    DELETE /tasks/<id>             delete
+    POST   /tasks/<id>/complete    mark as complete
+    GET    /search?q=<keyword>     search titles and descriptions
+    GET    /search?query=<query>   search with the query language of search_query
+    GET    /metrics                metrics in the Prometheus text format
+
+Tasks travel as their to_dict() form; errors as
+``{"error": {"type": ..., "message": ...}}``. Connections are kept alive
+between requests (HTTP/1.1). GET responses carry an ETag, and a matching
+If-None-Match is answered with 304 Not Modified. Bodies of 1 KiB and more
+are gzip-compressed for clients that accept it.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.models.task import Priority
+from src.services.base_task_service import BaseTaskService
+from src.utils import metrics
+from src.utils.exceptions import (
+    TaskManagerException, TaskNotFoundException, InvalidTaskDataException, InvalidQueryException
+)
+
+# Page size of a listing without ?limit=, and the largest page served
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Smaller bodies are sent as they are; compressing them saves next to nothing
+GZIP_MIN_BYTES = 1024
+
+# Fields a PATCH may change, with their JSON type
+_UPDATE_FIELDS = {"title": str, "description": str, "priority": str, "completed": bool}
+
+_PRIORITIES = tuple(priority.value for priority in Priority)
+
+
+class _HTTPError(Exception):
+    """A request that cannot be served, with the status to answer it with."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _status_of(error: Exception) -> int:
+    """Return the HTTP status reporting a service error."""
+    if isinstance(error, TaskNotFoundException):
+        return 404
+    if isinstance(error, (InvalidTaskDataException, InvalidQueryException, ValueError, TypeError)):
+        return 400
+    return 500
+
+
+def _param(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    """Return the last value of a query parameter, or None if it is missing."""
+    values = params.get(name)
+    return values[-1] if values else None
+
+
+def _int_param(params: Dict[str, List[str]], name: str, default: int, minimum: int, maximum: int) -> int:
+    """Return an integer query parameter within bounds."""
+    value = _param(params, name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise _HTTPError(400, f"Parameter '{name}' must be an integer")
+    if not minimum <= number <= maximum:
+        raise _HTTPError(400, f"Parameter '{name}' must be between {minimum} and {maximum}")
+    return number
+
+
+def _bool_param(params: Dict[str, List[str]], name: str) -> Optional[bool]:
+    """Return a true/false query parameter, or None if it is missing."""
+    value = _param(params, name)
+    if value is None:
+        return None
+    if value.lower() not in ("true", "false"):
+        raise _HTTPError(400, f"Parameter '{name}' must be true or false")
+    return value.lower() == "true"
+
+
+def _task_fields(body: Any, allowed: Dict[str, type]) -> Dict[str, Any]:
+    """
+    Validate the task fields of a request body.
+
+    Args:
+        body: The decoded JSON body
+        allowed: Field names the request may set, with their types
+
+    Returns:
+        The fields, with the priority lowercased
+
+    Raises:
+        InvalidTaskDataException: If the body is not an object of valid fields
+    """
+    if not isinstance(body, dict):
+        raise InvalidTaskDataException("The request body must be a JSON object")
+    for name, value in body.items():
+        if name not in allowed:
+            raise InvalidTaskDataException(f"Unknown task field '{name}'")
+        if not isinstance(value, allowed[name]):
+            raise InvalidTaskDataException(f"Task field '{name}' must be a {allowed[name].__name__}")
+    fields = dict(body)
+    if "title" in fields and not fields["title"].strip():
+        raise InvalidTaskDataException("Task title cannot be empty")
+    if "priority" in fields:
+        fields["priority"] = fields["priority"].lower()
+        if fields["priority"] not in _PRIORITIES:
+            raise InvalidTaskDataException(f"Task priority must be one of {', '.join(_PRIORITIES)}")
+    return fields
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Return whether an Accept-Encoding header allows gzip."""
+    for coding in accept_encoding.split(","):
+        name, _, parameter = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        key, _, quality = parameter.partition("=")
+        try:
+            return key.strip() != "q" or float(quality) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return whether an If-None-Match header matches an ETag, comparing weakly."""
+    tag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == tag:
+            return True
+    return False
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Answer the requests of one connection until the client closes it."""
+
+    # Keep connections open between requests
+    protocol_version = "HTTP/1.1"
+    # Seconds a kept-alive connection may stay idle
+    timeout = 30
+    server_version = "TaskManager"
+    # Headers and body are written separately; without this the body waits
+    # for the client's delayed ACK on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PUT(self) -> None:
+        # Not supported on any resource; answered with 405 and a JSON error
+        self._handle("PUT")
+
+    def do_PATCH(self) -> None:
+        self._handle("PATCH")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def _handle(self, method: str) -> None:
+        """Run one request and send its response."""
+        url = urlsplit(self.path)
+        headers: Dict[str, str] = {}
+        try:
+            # Read the body even if the request fails, so the next request
+            # on the connection starts where it should
+            body = self._read_body()
+            status, result, headers = self.server.dispatch(method, url.path, parse_qs(url.query), body)
+        except _HTTPError as e:
+            status, result = e.status, {"error": {"type": "HTTPError", "message": str(e)}}
+        except (TaskManagerException, ValueError, TypeError) as e:
+            status, result = _status_of(e), {"error": {"type": type(e).__name__, "message": str(e)}}
+        except Exception as e:
+            # Keep serving; the client reports the failure
+            status, result = 500, {"error": {"type": TaskManagerException.__name__, "message": str(e)}}
+        self._send(method, status, result, headers)
+
+    def _read_body(self) -> Any:
+        """Read and decode the JSON body of the request, or None without one."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self.close_connection = True
+            raise _HTTPError(400, "Invalid Content-Length")
+        if length <= 0:
+            return None
+        data = self.rfile.read(length)
+        try:
+            return json.loads(data)
+        except ValueError:
+            raise _HTTPError(400, "The request body is not valid JSON")
+
+    def _send(self, method: str, status: int, result: Any, headers: Dict[str, str]) -> None:
+        """Send a JSON or plain text response, answering conditional and compressed requests."""
+        if isinstance(result, str):
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+            data = result.encode("utf-8")
+        else:
+            content_type = "application/json; charset=utf-8"
+            data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        if method == "GET":
+            headers["Vary"] = "Accept-Encoding"
+            if status == 200:
+                # Weak: the same tag is sent for the plain and gzip bodies
+                headers["ETag"] = f'W/"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+                if _etag_matches(self.headers.get("If-None-Match", ""), headers["ETag"]):
+                    status, data = 304, b""
+        if len(data) >= GZIP_MIN_BYTES and _accepts_gzip(self.headers.get("Accept-Encoding", "")):
+            data = gzip.compress(data, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+
+        self.send_response(status)
+        if status != 304:
+            headers["Content-Type"] = content_type
+            headers["Content-Length"] = str(len(data))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keep request logging off the console."""
+        pass
+
+
+class TaskAPIServer(ThreadingHTTPServer):
+    """
+    HTTP server answering API requests from a single task service.
+
+    Each connection is served on its own thread, so a kept-alive client
+    does not hold up the others, but requests run against the service one at
+    a time. Before each request the service picks up changes other processes
+    wrote to the store.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service: BaseTaskService, address: Tuple[str, int]):
+        """
+        Bind the server to its address.
+
+        Args:
+            service: TaskService or SqliteTaskService to serve
+            address: (host, port) to listen on; port 0 picks a free port
+        """
+        self.service = service
+        self._service_lock = threading.Lock()
+        super().__init__(address, _RequestHandler)
+
+    def dispatch(
+        self, method: str, path: str, params: Dict[str, List[str]], body: Any
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """
+        Run one request against the service.
+
+        Args:
+            method: HTTP method
+            path: Path of the request URL
+            params: Decoded query parameters
+            body: Decoded JSON body, or None
+
+        Returns:
+            The status, the JSON-compatible result and any extra headers
+
+        Raises:
+            TaskManagerException: Or ValueError, for requests the service rejects
+        """
+        parts = [part for part in path.split("/") if part]
+        with self._service_lock:
+            self.service.refresh()
+            if parts == ["tasks"]:
+                if method == "GET":
+                    return 200, self._list(params), {}
+                if method == "POST":
+                    fields = _task_fields(body, {"title": str, "description": str, "priority": str})
+                    if "title" not in fields:
+                        raise InvalidTaskDataException("Task title is required")
+                    task = self.service.add_task(**fields)
+                    return 201, task.to_dict(), {"Location": f"/tasks/{task.id}"}
+                raise _HTTPError(405, f"Method {method} is not allowed on {path}")
+            if parts == ["metrics"]:
+                if method != "GET":
+                    raise _HTTPError(405, f"Method {method} is not allowed on {path}")
+                return 200, metrics.REGISTRY.exposition(), {}
+            if parts == ["search"]:
+                if method != "GET":
+                    raise _HTTPError(405, f"Method {method} is not allowed on {path}")
+                query = _param(params, "query")
+                keyword = _param(params, "q")
+                if query is not None:
+                    results = self.service.search_query(query)
+                elif keyword is not None:
+                    results = self.service.search_tasks(keyword)
+                else:
+                    raise _HTTPError(400, "Parameter 'q' or 'query' is required")
+                return 200, {"tasks": [task.to_dict() for task in results]}, {}
+            if len(parts) in (2, 3) and parts[0] == "tasks" and parts[1].isdigit():
+                task_id = int(parts[1])
+                if len(parts) == 3:
+                    if parts[2] != "complete":
+                        raise _HTTPError(404, f"No such resource: {path}")
+                    if method != "POST":
+                        raise _HTTPError(405, f"Method {method} is not allowed on {path}")
+                    return 200, self.service.complete_task(task_id).to_dict(), {}
+                if method == "GET":
+                    return 200, self.service.get_task_by_id(task_id).to_dict(), {}
+                if method == "PATCH":
+                    return 200, self.service.update_task(task_id, **_task_fields(body, _UPDATE_FIELDS)).to_dict(), {}
+                if method == "DELETE":
+                    return 200, self.service.delete_task(task_id).to_dict(), {}
+                raise _HTTPError(405, f"Method {method} is not allowed on {path}")
+            raise _HTTPError(404, f"No such resource: {path}")
+
+    def _list(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Answer GET /tasks: one page of the tasks matching the filters."""
+        completed = _bool_param(params, "completed")
+        priority = _param(params, "priority")
+        offset = _int_param(params, "offset", 0, 0, 2 ** 63 - 1)
+        limit = _int_param(params, "limit", DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        order = _param(params, "order") or "asc"
+        if order not in ("asc", "desc"):
+            raise _HTTPError(400, "Parameter 'order' must be asc or desc")
+        tasks = self.service.query(
+            completed=completed, priority=priority, offset=offset, limit=limit,
+            sort_by=_param(params, "sort") or "id", descending=order == "desc"
+        )
+        # Counting answers from the indexes; completed tasks are all minus open ones
+        total = self.service.count_tasks(show_completed=completed is not False, priority=priority)
+        if completed:
+            total -= self.service.count_tasks(show_completed=False, priority=priority)
+        return {"tasks": [task.to_dict() for task in tasks], "total": total, "offset": offset, "limit": limit}
@@ -0,0 +1,247 @@
+"""
+Inverted index for keyword search over tasks.
+"""
+
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.models.task import Task
+
+# Word tokens; keyword pieces are matched against these
+_TOKEN_RE = re.compile(r"\w+")
+
+# Length of the n-grams indexing the token vocabulary
+GRAM_SIZE = 3
+
+
+def _tokens(text: str) -> Set[str]:
+    """Return the distinct word tokens of an already lowercased text."""
+    return set(_TOKEN_RE.findall(text))
+
+
+def _grams(token: str) -> Set[str]:
+    """Return the GRAM_SIZE-grams of a token."""
+    return {token[i:i + GRAM_SIZE] for i in range(len(token) - GRAM_SIZE + 1)}
+
+
+def _field_score(text: str, keyword: str, weight: int) -> int:
+    """
+    Score one field for a keyword: any match, a match at a word start and a
+    whole-word match each add ``weight``.
+    """
+    pos = text.find(keyword)
+    if pos < 0:
+        return 0
+    score = weight
+    if pos == 0 or not text[pos - 1].isalnum():
+        score += weight
+        end = pos + len(keyword)
+        if end == len(text) or not text[end].isalnum():
+            score += weight
+    return score
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Compute the Levenshtein distance between two strings, up to a limit.
+
+    Args:
+        a: First string
+        b: Second string
+        limit: Largest distance of interest
+
+    Returns:
+        The distance, or limit + 1 if it is larger than limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+def match_score(title: str, description: str, keyword: str) -> int:
+    """
+    Score a task's lowercased title and description for a lowercased keyword.
+
+    Returns:
+        The relevance of the task; 0 if neither field contains the keyword
+    """
+    return _field_score(title, keyword, 2) + _field_score(description, keyword, 1)
+
+
+class SearchIndex:
+    """
+    Incremental inverted index over task titles and descriptions.
+
+    Tasks are indexed by word token, and the token vocabulary is itself
+    indexed by n-gram. A substring query takes its longest word piece, looks
+    up the vocabulary tokens containing that piece, and confirms the tasks
+    posted under those tokens against the full keyword. The work per query is
+    bounded by the vocabulary and the candidate set, not the corpus size.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()):
+        """
+        Initialize the index.
+
+        Args:
+            tasks: Tasks to index up front
+        """
+        self._fields: Dict[int, Tuple[str, str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocabulary: Dict[str, Set[str]] = {}
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task: Task) -> None:
+        """
+        Index a task's title and description.
+
+        Args:
+            task: The task to index
+        """
+        fields = (task.title.lower(), task.description.lower())
+        self._fields[task.id] = fields
+        for token in _tokens(fields[0]) | _tokens(fields[1]):
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                for gram in _grams(token):
+                    self._vocabulary.setdefault(gram, set()).add(token)
+            posting.add(task.id)
+
+    def remove(self, task_id: int) -> None:
+        """
+        Remove a task from the index.
+
+        Args:
+            task_id: ID of the task to remove
+        """
+        fields = self._fields.pop(task_id, None)
+        if fields is None:
+            return
+        for token in _tokens(fields[0]) | _tokens(fields[1]):
+            posting = self._postings[token]
+            posting.discard(task_id)
+            if not posting:
+                del self._postings[token]
+                for gram in _grams(token):
+                    tokens = self._vocabulary[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._vocabulary[gram]
+
+    def update(self, task: Task) -> None:
+        """
+        Re-index a task after its title or description changed.
+
+        Args:
+            task: The changed task
+        """
+        self.remove(task.id)
+        self.add(task)
+
+    def _tokens_containing(self, piece: str) -> Iterable[str]:
+        """Return the vocabulary tokens that contain ``piece``."""
+        if len(piece) < GRAM_SIZE:
+            return [token for token in self._postings if piece in token]
+        grams = sorted((self._vocabulary.get(gram, set()) for gram in _grams(piece)), key=len)
+        return [token for token in grams[0] if piece in token]
+
+    def _candidates(self, keyword: str) -> Iterable[int]:
+        """Return the ids of the tasks that may contain a lowercased keyword."""
+        pieces = _TOKEN_RE.findall(keyword)
+        if not pieces:
+            # Only separators in the keyword; nothing to look up
+            return self._fields.keys()
+        candidates = set()
+        for token in self._tokens_containing(max(pieces, key=len)):
+            candidates |= self._postings[token]
+        return candidates
+
+    def texts(self, task_id: int) -> Tuple[str, str]:
+        """Return the lowercased title and description of an indexed task."""
+        return self._fields[task_id]
+
+    def matching(self, keyword: str) -> Set[int]:
+        """
+        Find tasks whose title or description contains the keyword, unranked.
+
+        Args:
+            keyword: Case-insensitive substring to look for
+
+        Returns:
+            Matching task ids
+        """
+        keyword = keyword.lower()
+        fields = self._fields
+        return {
+            task_id for task_id in self._candidates(keyword)
+            if keyword in fields[task_id][0] or keyword in fields[task_id][1]
+        }
+
+    def similar_tokens(self, word: str, distance: int) -> Set[str]:
+        """
+        Find the indexed word tokens within an edit distance of a word.
+
+        Each edit changes at most GRAM_SIZE of a token's n-grams, so a long
+        enough word only needs comparing with the tokens sharing enough
+        n-grams with it. Shorter words are compared with every token of a
+        close enough length.
+
+        Args:
+            word: Lowercased word
+            distance: Largest edit distance
+
+        Returns:
+            Matching tokens
+        """
+        shared = len(word) - GRAM_SIZE + 1 - distance * GRAM_SIZE
+        if shared > 0:
+            counts: Dict[str, int] = {}
+            for gram in _grams(word):
+                for token in self._vocabulary.get(gram, ()):
+                    counts[token] = counts.get(token, 0) + 1
+            candidates = [token for token, count in counts.items() if count >= shared]
+        else:
+            candidates = self._postings
+        return {
+            token for token in candidates
+            if abs(len(token) - len(word)) <= distance and edit_distance(token, word, distance) <= distance
+        }
+
+    def with_tokens(self, tokens: Iterable[str]) -> Set[int]:
+        """Return the ids of the tasks containing any of the given word tokens."""
+        ids: Set[int] = set()
+        for token in tokens:
+            ids |= self._postings.get(token, set())
+        return ids
+
+    def search(self, keyword: str) -> List[int]:
+        """
+        Find tasks whose title or description contains the keyword.
+
+        Args:
+            keyword: Case-insensitive substring to look for
+
+        Returns:
+            Matching task ids, most relevant first; ties keep id order
+        """
+        keyword = keyword.lower()
+        candidates = self._candidates(keyword)
+
+        scored = []
+        for task_id in candidates:
+            title, description = self._fields[task_id]
+            score = match_score(title, description, keyword)
+            if score or not keyword:
+                scored.append((-score, task_id))
+        scored.sort()
+        return [task_id for _, task_id in scored]
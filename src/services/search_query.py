@@ -0,0 +1,770 @@
+"""
+Query language for task search.
+
+A query combines terms with boolean operators:
+
+    report               title or description contains "report"
+    "weekly report"      contains the phrase
+    /rep(ort|ly)s?/      matches the regular expression
+    reprot~  reprot~1    has a word within edit distance 2 (or 1) of "reprot"
+    title:report         any of the above, in the title only
+    desc:notes           ... or in the description only (also description:)
+    priority:high        has the priority
+    status:active        is not completed; status:completed is
+    created:>2025-01-01  was created after that day; also >=, <, <=, and a
+                         bare date or time for that day or second
+
+Adjacent terms must all match, ``a OR b`` matches either, and ``NOT a`` or
+``-a`` excludes. NOT binds tighter than AND, which binds tighter than OR, and
+parentheses group. Operators are uppercase; text ignores case.
+
+compile_query() parses a query once into a plan: a tree of nodes, each a
+condition on one task. On a loaded service the plan answers every node from
+an index: the inverted search index for words, phrases and fuzzy terms, the
+filter index for priority and status, and the sort index for creation
+times. Regular expressions run over each field of every task joined into a
+single string, so the regex engine scans a whole column in one call. A
+conjunction starts from its cheapest condition and, once its matches are
+few, tests the remaining conditions on those tasks alone. Over a stream of
+tasks the plan tests each task, and its text conditions can filter the
+stream before tasks are materialized.
+"""
+
+import functools
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import AbstractSet, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from src.models.task import Task, parse_timestamp
+from src.services.filter_index import FilterIndex
+from src.services.search_index import SearchIndex, edit_distance, match_score
+from src.services.sort_index import SortIndex
+from src.utils.exceptions import InvalidQueryException, InvalidTaskDataException
+
+# A task's lowercased (title, description), indexed by the field constants
+Texts = Tuple[str, str]
+TITLE = 0
+DESCRIPTION = 1
+BOTH = (TITLE, DESCRIPTION)
+
+# Relevance weight of a match in each field, as in match_score
+_WEIGHTS = (2, 1)
+
+# Field prefixes and the text fields they scope terms to
+_TEXT_FIELDS = {"title": (TITLE,), "desc": (DESCRIPTION,), "description": (DESCRIPTION,)}
+_FIELDS = frozenset(_TEXT_FIELDS) | {"priority", "status", "created"}
+
+_STATUSES = {
+    "active": False, "pending": False, "open": False,
+    "completed": True, "done": True, "closed": True,
+}
+
+# Largest edit distance of a fuzzy term
+MAX_EDIT_DISTANCE = 2
+
+# Word tokens, as the search index splits them
+_WORD_RE = re.compile(r"\w+")
+_FIELD_RE = re.compile(r"([A-Za-z]+):")
+_COMPARISON_RE = re.compile(r"[<>]=?|=")
+_FUZZY_RE = re.compile(r"(.+)~(\d?)")
+_ESCAPE_RE = re.compile(r"\\.")
+
+# Joins the values of a text column. Task text may contain it too: column
+# offsets come from each value's length, and column-safe patterns never
+# match it, so a match neither spans two tasks nor depends on where one ends
+_SEPARATOR = "\x00"
+
+# Anchors and lookarounds would see past a task's text in a joined column,
+# and anything that can match the separator could run on through every
+# task after it. Patterns using them, or anything that looks like them, are
+# tested per task. The first expression looks at escapes; the second at the
+# rest of the pattern, with its escapes removed
+_COLUMN_UNSAFE_ESCAPE_RE = re.compile(r"\\[AZWSDxuUN0-7]")
+_COLUMN_UNSAFE_RE = re.compile(r"[.^$\x00]|\(\?<?[=!]")
+
+# A conjunction tests its remaining conditions task by task once its
+# matches are at most one in this many tasks
+_FILTER_RATIO = 16
+
+# Fuzzy verdicts kept per term, by word
+_FUZZY_CACHE_SIZE = 65536
+
+# Seconds in a day, the span of a bare date in created:
+_DAY = 86400
+
+
+class TextColumns:
+    """
+    Lowercased titles and descriptions of a set of tasks, each field joined
+    into one string.
+
+    A regular expression scans a column in one call; match positions map
+    back to tasks through the offset where each task's text starts.
+    """
+
+    def __init__(self, tasks: Iterable[Task]):
+        """
+        Build the columns.
+
+        Args:
+            tasks: Tasks to include
+        """
+        self.ids: List[int] = []
+        titles: List[str] = []
+        descriptions: List[str] = []
+        for task in tasks:
+            self.ids.append(task.id)
+            titles.append(task.title.lower())
+            descriptions.append(task.description.lower())
+        self._columns = (self._join(titles), self._join(descriptions))
+
+    @staticmethod
+    def _join(values: List[str]) -> Tuple[str, List[int]]:
+        """Join a column; return it with the start offset of every value, plus its end + 1."""
+        return _SEPARATOR.join(values), list(accumulate((len(value) + 1 for value in values), initial=0))
+
+    def search(self, field: int, pattern: Pattern) -> AbstractSet[int]:
+        """
+        Find the tasks whose text in a field matches a pattern.
+
+        The pattern must be column-safe (see column_safe): as it cannot
+        match the separator, every match lies within one task's text, and
+        the scan costs one pass over the column. Each search resumes at the
+        next task's text, so the result is what searching each task's text
+        in turn would find.
+
+        Args:
+            field: TITLE or DESCRIPTION
+            pattern: Compiled column-safe regular expression
+
+        Returns:
+            Matching task ids
+        """
+        if not self.ids:
+            return set()
+        text, starts = self._columns[field]
+        ids = self.ids
+        found = set()
+        position = 0
+        while position <= len(text):
+            match = pattern.search(text, position)
+            if match is None:
+                break
+            row = bisect_right(starts, match.start()) - 1
+            found.add(ids[row])
+            position = starts[row + 1]
+        return found
+
+
+def column_safe(pattern: str) -> bool:
+    """
+    Return whether TextColumns.search can run a regular expression.
+
+    Rejects anchors, lookarounds, and everything that can match the
+    separator: ".", negated classes, \\W, \\S, \\D and character escapes.
+    Some patterns that would be safe are rejected too; they are tested
+    task by task instead.
+
+    Args:
+        pattern: Source of the regular expression
+    """
+    if _COLUMN_UNSAFE_ESCAPE_RE.search(pattern):
+        return False
+    return not _COLUMN_UNSAFE_RE.search(_ESCAPE_RE.sub("", pattern))
+
+
+class QueryContext:
+    """
+    The tasks of a loaded service, and its indexes, built when a plan first
+    needs them.
+    """
+
+    def __init__(
+        self,
+        tasks_by_id: Dict[int, Task],
+        search_index: Callable[[], SearchIndex],
+        filter_index: Callable[[], FilterIndex],
+        sort_index: Callable[[], SortIndex],
+        columns: Callable[[], TextColumns]
+    ):
+        """
+        Initialize the context.
+
+        Args:
+            tasks_by_id: Every task, by id
+            search_index: Returns the service's search index
+            filter_index: Returns the service's filter index
+            sort_index: Returns the service's sort index
+            columns: Returns the service's text columns
+        """
+        self.tasks_by_id = tasks_by_id
+        self.search_index = search_index
+        self.filter_index = filter_index
+        self.sort_index = sort_index
+        self.columns = columns
+
+    def texts(self, task_id: int) -> Texts:
+        """Return the lowercased title and description of a task."""
+        task = self.tasks_by_id[task_id]
+        return task.title.lower(), task.description.lower()
+
+
+class _Node:
+    """A condition on one task."""
+
+    # Relative cost of answering ids(): 0 for a set lookup, more for scans
+    cost = 0
+    # Whether the node's matches are ranked by relevance
+    scored = False
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        """Return whether a task, with its lowercased texts, satisfies the condition."""
+        raise NotImplementedError
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        """Return the ids of the context's tasks that satisfy the condition; never modify the result."""
+        raise NotImplementedError
+
+    def score(self, texts: Texts) -> int:
+        """Return the relevance of a matching task's lowercased texts."""
+        return 0
+
+    def text_filter(self) -> Optional[Callable[[Texts], bool]]:
+        """Return a test on lowercased texts that every match passes, or None if there is none."""
+        return None
+
+
+class _All(_Node):
+    """The empty query: every task."""
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        return True
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        return context.tasks_by_id.keys()
+
+
+class _TextNode(_Node):
+    """A condition on the text of some fields."""
+
+    scored = True
+
+    def __init__(self, fields: Tuple[int, ...]):
+        self.fields = fields
+
+    def matches_field(self, text: str) -> bool:
+        """Return whether one lowercased field satisfies the condition."""
+        raise NotImplementedError
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        return any(self.matches_field(texts[field]) for field in self.fields)
+
+    def score(self, texts: Texts) -> int:
+        return sum(_WEIGHTS[field] for field in self.fields if self.matches_field(texts[field]))
+
+    def text_filter(self) -> Optional[Callable[[Texts], bool]]:
+        return lambda texts: self.matches(None, texts)
+
+
+class _Contains(_TextNode):
+    """A word or phrase contained in the text."""
+
+    cost = 1
+
+    def __init__(self, keyword: str, fields: Tuple[int, ...]):
+        super().__init__(fields)
+        self.keyword = keyword
+
+    def matches_field(self, text: str) -> bool:
+        return self.keyword in text
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        index = context.search_index()
+        ids = index.matching(self.keyword)
+        if self.fields == BOTH:
+            return ids
+        (field,) = self.fields
+        return {task_id for task_id in ids if self.keyword in index.texts(task_id)[field]}
+
+    def text_filter(self) -> Optional[Callable[[Texts], bool]]:
+        # Spelled out: scans call this once per task
+        keyword = self.keyword
+        if self.fields == BOTH:
+            return lambda texts: keyword in texts[TITLE] or keyword in texts[DESCRIPTION]
+        (field,) = self.fields
+        return lambda texts: keyword in texts[field]
+
+    def score(self, texts: Texts) -> int:
+        if self.fields == BOTH:
+            return match_score(texts[TITLE], texts[DESCRIPTION], self.keyword)
+        if self.fields == (TITLE,):
+            return match_score(texts[TITLE], "", self.keyword)
+        return match_score("", texts[DESCRIPTION], self.keyword)
+
+
+class _Regex(_TextNode):
+    """A regular expression found in the text."""
+
+    cost = 3
+
+    def __init__(self, pattern: Pattern, fields: Tuple[int, ...]):
+        super().__init__(fields)
+        self.pattern = pattern
+        self.column_safe = column_safe(pattern.pattern)
+
+    def matches_field(self, text: str) -> bool:
+        return self.pattern.search(text) is not None
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        if not self.column_safe:
+            return {
+                task_id for task_id in context.tasks_by_id
+                if self.matches(None, context.texts(task_id))
+            }
+        columns = context.columns()
+        ids = set()
+        for field in self.fields:
+            ids |= columns.search(field, self.pattern)
+        return ids
+
+
+class _Fuzzy(_TextNode):
+    """A word within an edit distance of some word of the text."""
+
+    cost = 2
+
+    def __init__(self, word: str, distance: int, fields: Tuple[int, ...]):
+        super().__init__(fields)
+        self.word = word
+        self.distance = distance
+        self._verdicts: Dict[str, bool] = {}
+
+    def _close(self, token: str) -> bool:
+        """Return whether a token is within the edit distance, remembering the answer."""
+        verdict = self._verdicts.get(token)
+        if verdict is None:
+            verdict = edit_distance(token, self.word, self.distance) <= self.distance
+            if len(self._verdicts) >= _FUZZY_CACHE_SIZE:
+                self._verdicts.clear()
+            self._verdicts[token] = verdict
+        return verdict
+
+    def matches_field(self, text: str) -> bool:
+        return any(self._close(token) for token in _WORD_RE.findall(text))
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        index = context.search_index()
+        tokens = index.similar_tokens(self.word, self.distance)
+        ids = index.with_tokens(tokens)
+        if self.fields == BOTH:
+            return ids
+        (field,) = self.fields
+        return {
+            task_id for task_id in ids
+            if not tokens.isdisjoint(_WORD_RE.findall(index.texts(task_id)[field]))
+        }
+
+
+class _Priority(_Node):
+    """A priority, ignoring case."""
+
+    def __init__(self, priority: str):
+        self.priority = priority
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        return task.priority.lower() == self.priority
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        return context.filter_index().matching(None, self.priority)
+
+
+class _Status(_Node):
+    """Completed or not."""
+
+    def __init__(self, completed: bool):
+        self.completed = completed
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        return bool(task.completed) == self.completed
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        return context.filter_index().matching(self.completed, None)
+
+
+class _Created(_Node):
+    """A creation time in a half-open range of timestamps."""
+
+    def __init__(self, start: Optional[int], stop: Optional[int]):
+        self.start = start
+        self.stop = stop
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        return ((self.start is None or task.created_ts >= self.start)
+                and (self.stop is None or task.created_ts < self.stop))
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        return set(context.sort_index().created_between(self.start, self.stop))
+
+
+class _Not(_Node):
+    """The opposite of a condition."""
+
+    def __init__(self, child: _Node):
+        self.child = child
+        self.cost = child.cost + 1
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        return not self.child.matches(task, texts)
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        return context.tasks_by_id.keys() - self.child.ids(context)
+
+
+class _And(_Node):
+    """Every one of several conditions."""
+
+    def __init__(self, children: List[_Node]):
+        # Cheapest first: their results bound the work of the rest
+        self.children = sorted(children, key=lambda child: child.cost)
+        self.cost = self.children[0].cost
+        self.scored = any(child.scored for child in children)
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        return all(child.matches(task, texts) for child in self.children)
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        tasks = context.tasks_by_id
+        result: Optional[AbstractSet[int]] = None
+        for child in self.children:
+            if result is not None and len(result) * _FILTER_RATIO <= len(tasks):
+                result = {task_id for task_id in result if child.matches(tasks[task_id], context.texts(task_id))}
+            elif result is None:
+                result = child.ids(context)
+            else:
+                result = result & child.ids(context)
+            if not result:
+                return set()
+        return result
+
+    def score(self, texts: Texts) -> int:
+        return sum(child.score(texts) for child in self.children)
+
+    def text_filter(self) -> Optional[Callable[[Texts], bool]]:
+        filters = [test for test in (child.text_filter() for child in self.children) if test is not None]
+        if not filters:
+            return None
+        return lambda texts: all(test(texts) for test in filters)
+
+
+class _Or(_Node):
+    """Any of several conditions."""
+
+    def __init__(self, children: List[_Node]):
+        self.children = children
+        self.cost = max(child.cost for child in children)
+        self.scored = any(child.scored for child in children)
+
+    def matches(self, task: Task, texts: Texts) -> bool:
+        return any(child.matches(task, texts) for child in self.children)
+
+    def ids(self, context: QueryContext) -> AbstractSet[int]:
+        result = set()
+        for child in self.children:
+            result |= child.ids(context)
+        return result
+
+    def score(self, texts: Texts) -> int:
+        return sum(child.score(texts) for child in self.children)
+
+    def text_filter(self) -> Optional[Callable[[Texts], bool]]:
+        filters = [child.text_filter() for child in self.children]
+        if any(test is None for test in filters):
+            return None
+        return lambda texts: any(test(texts) for test in filters)
+
+
+def _read_delimited(query: str, position: int, delimiter: str) -> Tuple[str, int]:
+    """
+    Read a value up to an unescaped closing delimiter.
+
+    In a phrase every backslash escapes the next character; in a regular
+    expression only an escaped slash loses its backslash.
+
+    Returns:
+        The value and the position after the closing delimiter
+    """
+    chars = []
+    position += 1
+    while position < len(query):
+        char = query[position]
+        if char == delimiter:
+            return "".join(chars), position + 1
+        if char == "\\" and position + 1 < len(query):
+            position += 1
+            char = query[position]
+            if delimiter == "/" and char != "/":
+                chars.append("\\")
+        chars.append(char)
+        position += 1
+    kind = "quote" if delimiter == '"' else "regular expression"
+    raise InvalidQueryException(f"Unterminated {kind} in query '{query}'")
+
+
+def _created(comparison: str, value: str) -> _Created:
+    """Build the range of a created: term."""
+    try:
+        timestamp = parse_timestamp(value)
+    except InvalidTaskDataException:
+        raise InvalidQueryException(f"Invalid date '{value}' in created:; use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS")
+    # A bare date spans its whole day; a time, its second
+    span = _DAY if len(value) <= 10 else 1
+    if comparison == ">":
+        return _Created(timestamp + span, None)
+    if comparison == ">=":
+        return _Created(timestamp, None)
+    if comparison == "<":
+        return _Created(None, timestamp)
+    if comparison == "<=":
+        return _Created(None, timestamp + span)
+    return _Created(timestamp, timestamp + span)
+
+
+def _term(field: Optional[str], kind: str, value: str, comparison: str) -> _Node:
+    """
+    Build the node of one term.
+
+    Args:
+        field: Field prefix, lowercased, or None
+        kind: "word", "phrase" or "regex"
+        value: The term's text, with quotes or slashes removed
+        comparison: Comparison operator of a created: term, or ""
+
+    Raises:
+        InvalidQueryException: If the term is not valid for its field
+    """
+    if field == "created":
+        return _created(comparison, value)
+    if field in ("priority", "status"):
+        if kind == "regex":
+            raise InvalidQueryException(f"{field}: takes a value, not a regular expression")
+        if field == "priority":
+            return _Priority(value.lower())
+        if value.lower() not in _STATUSES:
+            raise InvalidQueryException(f"Unknown status '{value}'; use one of {', '.join(_STATUSES)}")
+        return _Status(_STATUSES[value.lower()])
+
+    fields = _TEXT_FIELDS.get(field, BOTH)
+    if kind == "regex":
+        # Text is matched lowercased, so only a pattern spelling out capitals
+        # needs the slower case-insensitive mode
+        literal = _ESCAPE_RE.sub("", value)
+        flags = re.IGNORECASE if literal != literal.lower() else 0
+        try:
+            return _Regex(re.compile(value, flags), fields)
+        except re.error as e:
+            raise InvalidQueryException(f"Invalid regular expression /{value}/: {e}")
+    fuzzy = _FUZZY_RE.fullmatch(value) if kind == "word" else None
+    if fuzzy:
+        word, distance = fuzzy.group(1).lower(), int(fuzzy.group(2) or MAX_EDIT_DISTANCE)
+        if not _WORD_RE.fullmatch(word):
+            raise InvalidQueryException(f"Fuzzy term '{value}' must be a single word")
+        if distance > MAX_EDIT_DISTANCE:
+            raise InvalidQueryException(f"Fuzzy terms allow an edit distance of at most {MAX_EDIT_DISTANCE}")
+        return _Fuzzy(word, distance, fields)
+    if not value:
+        raise InvalidQueryException("Empty search term")
+    return _Contains(value.lower(), fields)
+
+
+def _tokens(query: str) -> Iterator[Tuple[str, Optional[_Node]]]:
+    """
+    Split a query into tokens.
+
+    Yields:
+        ("(", None), (")", None), ("AND", None), ("OR", None), ("NOT", None)
+        or ("term", node)
+
+    Raises:
+        InvalidQueryException: If a term is malformed
+    """
+    position = 0
+    while True:
+        while position < len(query) and query[position].isspace():
+            position += 1
+        if position == len(query):
+            return
+        char = query[position]
+        if char in "()":
+            yield char, None
+            position += 1
+            continue
+        if char == "-" and position + 1 < len(query) and query[position + 1] not in " \t\r\n()":
+            yield "NOT", None
+            position += 1
+            continue
+
+        field = None
+        prefix = _FIELD_RE.match(query, position)
+        if prefix and prefix.group(1).lower() in _FIELDS:
+            field = prefix.group(1).lower()
+            position = prefix.end()
+        comparison = ""
+        if field == "created":
+            operator = _COMPARISON_RE.match(query, position)
+            if operator:
+                comparison = operator.group()
+                position = operator.end()
+
+        if position < len(query) and query[position] == '"':
+            kind = "phrase"
+            value, position = _read_delimited(query, position, '"')
+        elif position < len(query) and query[position] == "/":
+            kind = "regex"
+            value, position = _read_delimited(query, position, "/")
+        else:
+            kind = "word"
+            start = position
+            while position < len(query) and not query[position].isspace() and query[position] not in "()":
+                position += 1
+            value = query[start:position]
+            if field is None and value in ("AND", "OR", "NOT"):
+                yield value, None
+                continue
+        yield "term", _term(field, kind, value, comparison)
+
+
+class _Parser:
+    """Recursive descent parser from tokens to a node tree."""
+
+    def __init__(self, query: str):
+        self.query = query
+        self.tokens = list(_tokens(query))
+        self.position = 0
+
+    def _peek(self) -> Optional[str]:
+        """Return the kind of the next token, or None at the end."""
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def _next(self) -> Tuple[str, Optional[_Node]]:
+        """Consume the next token."""
+        if self.position == len(self.tokens):
+            raise InvalidQueryException(f"Query '{self.query}' ends unexpectedly")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> _Node:
+        """Parse the whole query."""
+        if not self.tokens:
+            return _All()
+        node = self._or()
+        if self.position < len(self.tokens):
+            raise InvalidQueryException(f"Unexpected '{self._peek()}' in query '{self.query}'")
+        return node
+
+    def _or(self) -> _Node:
+        children = [self._and()]
+        while self._peek() == "OR":
+            self._next()
+            children.append(self._and())
+        return children[0] if len(children) == 1 else _Or(children)
+
+    def _and(self) -> _Node:
+        children = [self._not()]
+        while self._peek() not in (None, "OR", ")"):
+            if self._peek() == "AND":
+                self._next()
+            children.append(self._not())
+        return children[0] if len(children) == 1 else _And(children)
+
+    def _not(self) -> _Node:
+        if self._peek() == "NOT":
+            self._next()
+            return _Not(self._not())
+        return self._atom()
+
+    def _atom(self) -> _Node:
+        kind, node = self._next()
+        if kind == "(":
+            node = self._or()
+            if self._peek() != ")":
+                raise InvalidQueryException(f"Missing ')' in query '{self.query}'")
+            self._next()
+            return node
+        if kind == "term":
+            return node
+        raise InvalidQueryException(f"Unexpected '{kind}' in query '{self.query}'")
+
+
+class QueryPlan:
+    """A compiled query, reusable for any number of searches."""
+
+    def __init__(self, root: _Node):
+        """
+        Initialize the plan.
+
+        Args:
+            root: Root of the query's node tree
+        """
+        self.root = root
+        text_filter = root.text_filter()
+        # Test on a task's title and description that every match passes,
+        # for scans that can skip materializing the tasks that fail it
+        self.prefilter: Optional[Callable[[str, str], bool]] = None
+        if text_filter is not None:
+            self.prefilter = lambda title, description: text_filter((title.lower(), description.lower()))
+
+    def _ranked(self, tasks: Iterable[Task]) -> List[Task]:
+        """Order matching tasks most relevant first, ties in id order."""
+        if not self.root.scored:
+            return sorted(tasks, key=lambda task: task.id)
+        score = self.root.score
+        scored = [(-score((task.title.lower(), task.description.lower())), task.id, task) for task in tasks]
+        scored.sort(key=lambda entry: entry[:2])
+        return [task for _, _, task in scored]
+
+    def search(self, context: QueryContext) -> List[Task]:
+        """
+        Run the plan against a loaded service's indexes.
+
+        Args:
+            context: The service's tasks and indexes
+
+        Returns:
+            Matching tasks, most relevant first; ties in id order
+        """
+        tasks = context.tasks_by_id
+        return self._ranked(tasks[task_id] for task_id in self.root.ids(context))
+
+    def filter(self, tasks: Iterable[Task]) -> List[Task]:
+        """
+        Run the plan over a stream of tasks, testing each one.
+
+        Args:
+            tasks: Tasks to test
+
+        Returns:
+            Matching tasks, most relevant first; ties in id order
+        """
+        matches = self.root.matches
+        return self._ranked(
+            task for task in tasks if matches(task, (task.title.lower(), task.description.lower()))
+        )
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(query: str) -> QueryPlan:
+    """
+    Parse a query into a plan; repeated queries reuse their plan.
+
+    Args:
+        query: Query in the language described in this module
+
+    Returns:
+        The query's plan
+
+    Raises:
+        InvalidQueryException: If the query is malformed
+    """
+    return QueryPlan(_Parser(query).parse())
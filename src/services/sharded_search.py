@@ -0,0 +1,108 @@
+"""
+Keyword scans of binary snapshots sharded across worker processes.
+
+The snapshot's rows are split into one contiguous shard per worker. Workers
+are forked after the snapshot is memory-mapped, so they inherit the mapping
+and read their shard from the same page cache as the parent: nothing is
+copied to them. Each sends back only the rows of its hits, and the parent
+materializes those rows. Shards are in row order, which is id order, so the
+hits come back in id order, exactly as a serial scan finds them.
+
+Forking copies only the calling thread, so a lock another thread holds at
+that moment stays locked in the child for good. Scans are therefore only
+sharded while the process runs a single thread, as the CLI does; in
+threaded hosts such as the web app or the API server they run serially.
+"""
+
+import os
+import threading
+from array import array
+from typing import Callable, List, Optional, Tuple
+
+from src.models.task import Task
+from src.services.binary_snapshot import MappedSnapshot
+
+# Rows a shard needs before the scan outweighs starting a worker for it
+MIN_SHARD_ROWS = 100000
+
+# Snapshot and predicate of a worker process, set by _start_worker; never
+# set in the parent
+_worker_scan: Optional[Tuple[MappedSnapshot, Callable[[str, str], bool]]] = None
+
+
+def configured_workers() -> int:
+    """
+    Return the worker count set by the TASK_MANAGER_SEARCH_WORKERS environment variable.
+
+    "0" means one worker per CPU core. Unset or invalid values mean 1: a
+    serial scan.
+    """
+    try:
+        workers = int(os.environ.get("TASK_MANAGER_SEARCH_WORKERS", "1"))
+    except ValueError:
+        return 1
+    if workers == 0:
+        return os.cpu_count() or 1
+    return max(workers, 1)
+
+
+def _fork_context():
+    """Return the fork start method's context, or None where the platform lacks it."""
+    # Imported here so serial scans never load multiprocessing
+    import multiprocessing
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def _start_worker(snapshot: MappedSnapshot, match: Callable[[str, str], bool]) -> None:
+    """Pool initializer: keep the scan the forked worker inherited as its arguments."""
+    global _worker_scan
+    _worker_scan = (snapshot, match)
+
+
+def _scan_shard(bounds: Tuple[int, int]) -> bytes:
+    """Scan rows start to stop of the worker's snapshot; return the hit rows as packed integers."""
+    snapshot, match = _worker_scan
+    return array("q", snapshot.matching_rows(match, *bounds)).tobytes()
+
+
+def matching_tasks(snapshot: MappedSnapshot, match: Callable[[str, str], bool], workers: int) -> List[Task]:
+    """
+    Find the tasks of a snapshot whose text satisfies a predicate.
+
+    The scan is split across up to ``workers`` forked processes, each given
+    at least MIN_SHARD_ROWS rows. Small snapshots, a single worker,
+    platforms without fork, and processes running more than one thread get
+    a serial scan in this process.
+
+    Args:
+        snapshot: Snapshot to scan, memory-mapped so workers share its pages
+        match: Called with each task's title and description; inherited by
+            the workers, so it need not be picklable
+        workers: Most processes to scan with
+
+    Returns:
+        Matching tasks in id order
+
+    Raises:
+        StorageException: If the snapshot cannot be decoded
+    """
+    shards = min(workers, len(snapshot) // MIN_SHARD_ROWS)
+    if shards < 2 or threading.active_count() > 1:
+        return snapshot.tasks_at(snapshot.matching_rows(match))
+    context = _fork_context()
+    if context is None:
+        return snapshot.tasks_at(snapshot.matching_rows(match))
+
+    count = len(snapshot)
+    bounds = [(count * i // shards, count * (i + 1) // shards) for i in range(shards)]
+    # Forked workers inherit the initializer's arguments, so nothing is pickled
+    with context.Pool(shards, initializer=_start_worker, initargs=(snapshot, match)) as pool:
+        results = pool.map(_scan_shard, bounds)
+
+    rows = array("q")
+    for packed in results:
+        rows.frombytes(packed)
+    return snapshot.tasks_at(rows)
@@ -0,0 +1,149 @@
+"""
+Sorted indexes for listing tasks by creation time and priority.
+"""
+
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import AbstractSet, Dict, Iterable, List, Optional, Tuple
+
+from src.models.task import Task, Priority
+
+# Fields tasks can be listed by; "id" needs no index
+SORT_FIELDS = ("id", "created_at", "priority")
+
+# Rank used by the priority order: most urgent first, unknown priorities last
+_PRIORITY_RANK = {Priority.HIGH: 0, Priority.MEDIUM: 1, Priority.LOW: 2}
+_UNKNOWN_PRIORITY_RANK = len(_PRIORITY_RANK)
+
+
+def _sort_keys(task: Task) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Return a task's (created_at, priority) sort keys, with the id as tie-breaker."""
+    rank = _PRIORITY_RANK.get(task.priority)
+    if rank is None:
+        # Known levels spelled in another case rank as the level
+        rank = _PRIORITY_RANK.get(task.priority.lower(), _UNKNOWN_PRIORITY_RANK)
+    return (task.created_ts, task.id), (rank, task.id)
+
+
+class SortIndex:
+    """
+    Task ids kept in sorted order by creation time and by priority.
+
+    Each order is a list of (key, id) pairs maintained with bisect, so the
+    first k tasks in either order are an O(k) slice instead of a sort of the
+    whole store. Creation times are the tasks' integer timestamps, so no
+    timestamp strings are parsed to compare them.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()):
+        """
+        Initialize the index.
+
+        Args:
+            tasks: Tasks to index up front
+        """
+        self._keys: Dict[int, Tuple[Tuple[int, int], Tuple[int, int]]] = {
+            task.id: _sort_keys(task) for task in tasks
+        }
+        self._orders: Dict[str, List[Tuple[int, int]]] = {
+            "created_at": sorted(keys[0] for keys in self._keys.values()),
+            "priority": sorted(keys[1] for keys in self._keys.values()),
+        }
+
+    def add(self, task: Task) -> None:
+        """
+        Insert a task into both orders.
+
+        Args:
+            task: The task to index
+        """
+        keys = self._keys[task.id] = _sort_keys(task)
+        insort(self._orders["created_at"], keys[0])
+        insort(self._orders["priority"], keys[1])
+
+    def remove(self, task_id: int) -> None:
+        """
+        Drop a task from both orders.
+
+        Args:
+            task_id: ID of the task to drop
+        """
+        keys = self._keys.pop(task_id)
+        for order, key in zip((self._orders["created_at"], self._orders["priority"]), keys):
+            del order[bisect_left(order, key)]
+
+    def update(self, task: Task) -> None:
+        """
+        Reposition a task whose creation time or priority may have changed.
+
+        Args:
+            task: The task to re-index
+        """
+        if self._keys.get(task.id) != _sort_keys(task):
+            self.remove(task.id)
+            self.add(task)
+
+    def created_between(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[int]:
+        """
+        Return the ids of the tasks created in a time range, oldest first.
+
+        Args:
+            start: Earliest creation timestamp included; unbounded if None
+            stop: Creation timestamp after the range; unbounded if None
+
+        Returns:
+            Task ids
+        """
+        order = self._orders["created_at"]
+        # Keys are (timestamp, id) pairs, which sort after (timestamp,)
+        low = 0 if start is None else bisect_left(order, (start,))
+        high = len(order) if stop is None else bisect_left(order, (stop,))
+        return [task_id for _, task_id in order[low:high]]
+
+    def select(
+        self,
+        field: str,
+        descending: bool = False,
+        among: Optional[AbstractSet[int]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[int]:
+        """
+        Return a slice of task ids in the order of a field.
+
+        Without a filter the slice is read straight off the maintained order.
+        With one, the order is walked until the slice is full when matches
+        are common enough for that to be short; otherwise only the matching
+        ids are sorted. Ties are broken by id, so equal keys list in the order
+        tasks were added (or the reverse, when descending).
+
+        Args:
+            field: "created_at" (oldest first) or "priority" (high to low)
+            descending: Reverse the order
+            among: Only include these task ids; all tasks if None
+            offset: Number of ids to skip
+            limit: Maximum number of ids to return; all remaining if None
+
+        Returns:
+            Task ids
+        """
+        order = self._orders[field]
+        stop = None if limit is None else offset + limit
+        if among is None:
+            if descending:
+                end = len(order) - offset
+                start = 0 if stop is None else max(len(order) - stop, 0)
+                keys = order[start:max(end, 0)][::-1]
+            else:
+                keys = order[offset:stop]
+            return [task_id for _, task_id in keys]
+
+        # A walk visits about stop * total / matches entries; a sort costs
+        # about matches * log(matches)
+        matches = len(among)
+        if stop is not None and stop * len(order) <= matches * matches * max(matches.bit_length(), 1):
+            walk = (task_id for _, task_id in (reversed(order) if descending else order) if task_id in among)
+            return list(islice(walk, offset, stop))
+        position = 0 if field == "created_at" else 1
+        keys = self._keys
+        return sorted(among, key=lambda task_id: keys[task_id][position], reverse=descending)[offset:stop]
@@ -0,0 +1,425 @@
+"""
+SQLite-backed task service for large task stores.
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.models.task import Task, current_timestamp
+from src.services.base_task_service import BaseTaskService
+from src.services.search_query import compile_query
+from src.services.storage import JsonStorage
+from src.services.sort_index import SORT_FIELDS
+from src.utils import metrics
+from src.utils.exceptions import TaskNotFoundException, StorageException
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT 'medium',
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed);
+DROP INDEX IF EXISTS idx_tasks_priority;
+CREATE INDEX IF NOT EXISTS idx_tasks_priority_lower ON tasks (lower(priority));
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+"""
+
+_COLUMNS = "id, title, description, priority, completed, created_at"
+
+# ORDER BY terms for each sort field; created_at strings sort chronologically
+_ORDER_BY = {
+    "id": ("id",),
+    "created_at": ("created_at", "id"),
+    "priority": ("CASE lower(priority) WHEN 'high' THEN 0 WHEN 'medium' THEN 1 WHEN 'low' THEN 2 ELSE 3 END", "id"),
+}
+
+
+def _row_to_task(row: tuple) -> Task:
+    """Build a Task from a row selected with _COLUMNS."""
+    task_id, title, description, priority, completed, created_at = row
+    return Task(task_id, title, description, priority, bool(completed), created_at)
+
+
+class SqliteTaskService(BaseTaskService):
+    """
+    Task service that keeps tasks in an SQLite database instead of in memory.
+
+    Lookups and filters run as indexed queries, so memory use does not grow
+    with the size of the store. The ``id`` column is the table's rowid, which
+    SQLite indexes implicitly.
+    """
+
+    # Whether a batch() transaction is open
+    _in_batch = False
+
+    def __init__(self, db_file: str = "tasks.db", check_same_thread: bool = True):
+        """
+        Initialize the service with an SQLite database file.
+
+        Args:
+            db_file: Path to the SQLite database; created if it does not exist
+            check_same_thread: Passed to sqlite3.connect(); False lets other
+                threads use the service, provided they never do so at once
+        """
+        self.storage_file = db_file
+        self.connection = sqlite3.connect(db_file, check_same_thread=check_same_thread)
+        # SQLite's lower() only folds ASCII; match str.lower used by TaskService
+        self.connection.create_function("py_lower", 1, str.lower, deterministic=True)
+        self.connection.executescript(_SCHEMA)
+
+    def _query(
+        self,
+        where: str = "",
+        params: tuple = (),
+        offset: int = 0,
+        limit: Optional[int] = None,
+        order_by: str = "id"
+    ) -> List[Task]:
+        """Run a SELECT over the tasks table and materialize the rows."""
+        sql = f"SELECT {_COLUMNS} FROM tasks {where} ORDER BY {order_by}"
+        if offset or limit is not None:
+            # A negative LIMIT means no limit in SQLite
+            sql += " LIMIT ? OFFSET ?"
+            params += (-1 if limit is None else limit, offset)
+        return [_row_to_task(row) for row in self.connection.execute(sql, params)]
+
+    @staticmethod
+    def _filter_clause(completed: Optional[bool], priority: Optional[str]) -> Tuple[str, tuple]:
+        """Build the WHERE clause and parameters for the status and priority filters."""
+        clauses, params = [], []
+        if completed is not None:
+            clauses.append("completed = ?")
+            params.append(int(completed))
+        if priority is not None:
+            # SQLite's lower() folds only ASCII, which is all the indexed
+            # expression can use; other priorities are folded by py_lower
+            folded = priority.lower()
+            clauses.append("lower(priority) = ?" if folded.isascii() else "py_lower(priority) = ?")
+            params.append(folded)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Run a block in one transaction, committed when it exits and rolled
+        back if it raises.
+
+        The transaction takes the database's write lock as it begins, so
+        what the block reads, such as the highest id, cannot change under
+        it through another connection or process.
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            yield
+
+    @contextmanager
+    def _mutation(self) -> Iterator[None]:
+        """Run one mutation in its own transaction, or in the open batch's."""
+        if self._in_batch:
+            yield
+            return
+        with self._transaction():
+            yield
+
+    @contextmanager
+    def batch(self) -> Iterator["SqliteTaskService"]:
+        """
+        Group several mutations into one transaction.
+
+        The transaction is committed when the block exits and rolled back if
+        it raises. Nested batches join the outermost one.
+
+        Yields:
+            This service
+        """
+        if self._in_batch:
+            yield self
+            return
+        self._in_batch = True
+        try:
+            with self._transaction():
+                yield self
+        finally:
+            self._in_batch = False
+
+    def refresh(self) -> None:
+        """Nothing to refresh; every query reads the database directly."""
+        pass
+
+    def compact(self) -> None:
+        """Nothing to compact; every mutation is committed on its own."""
+        pass
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def add_task(self, title: str, description: str = "", priority: str = "medium") -> Task:
+        """
+        Add a new task.
+
+        Args:
+            title: Task title
+            description: Task description
+            priority: Task priority (low, medium, high)
+
+        Returns:
+            The newly created Task
+        """
+        with self._mutation():
+            (task_id,) = self.connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM tasks").fetchone()
+            task = Task(task_id, title, description, priority)
+            self.connection.execute(
+                f"INSERT INTO tasks ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                (task.id, task.title, task.description, task.priority, int(task.completed), task.created_at)
+            )
+        return task
+
+    def bulk_add(self, entries: Iterable[Dict[str, Any]]) -> List[Task]:
+        """
+        Add many tasks in one transaction.
+
+        Args:
+            entries: Dicts with a title and optionally description and priority
+
+        Returns:
+            The newly created Tasks, in order
+
+        Raises:
+            InvalidTaskDataException: If an entry has no title; no task is added
+        """
+        with self.batch():
+            (next_id,) = self.connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM tasks").fetchone()
+            now = current_timestamp()
+            added = [self._task_from_entry(next_id + i, entry, now) for i, entry in enumerate(entries)]
+            self.connection.executemany(
+                f"INSERT INTO tasks ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                ((t.id, t.title, t.description, t.priority, int(t.completed), t.created_at) for t in added)
+            )
+        return added
+
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "id",
+        descending: bool = False
+    ) -> List[Task]:
+        """
+        Find tasks by status and priority using the table's indexes.
+
+        Args:
+            completed: Only return tasks with this status; any status if None
+            priority: Only return tasks with this priority, ignoring case; any
+                priority if None
+            offset: Number of matching tasks to skip
+            limit: Maximum number of tasks to return; all remaining if None
+            sort_by: "id", "created_at" (oldest first) or "priority" (high to low)
+            descending: Reverse the order
+
+        Returns:
+            List of Task objects
+
+        Raises:
+            ValueError: If sort_by is not one of SORT_FIELDS
+        """
+        if sort_by not in _ORDER_BY:
+            raise ValueError(f"Cannot sort tasks by '{sort_by}'; expected one of {', '.join(SORT_FIELDS)}")
+        direction = " DESC" if descending else ""
+        order_by = ", ".join(term + direction for term in _ORDER_BY[sort_by])
+        where, params = self._filter_clause(completed, priority)
+        return self._query(where, params, offset, limit, order_by)
+
+    def count_tasks(self, show_completed: bool = True, priority: Optional[str] = None) -> int:
+        """
+        Count the tasks get_all_tasks would return without offset and limit.
+
+        Args:
+            show_completed: Whether to include completed tasks
+            priority: Only count tasks with this priority (low, medium, high)
+
+        Returns:
+            Number of matching tasks
+        """
+        where, params = self._filter_clause(None if show_completed else False, priority)
+        (count,) = self.connection.execute(f"SELECT COUNT(*) FROM tasks {where}", params).fetchone()
+        return count
+
+    def iter_tasks(self, show_completed: bool = True) -> Iterator[Task]:
+        """
+        Iterate over tasks straight from a database cursor.
+
+        Args:
+            show_completed: Whether to include completed tasks
+
+        Yields:
+            Task objects in id order
+        """
+        where = "" if show_completed else "WHERE completed = 0"
+        for row in self.connection.execute(f"SELECT {_COLUMNS} FROM tasks {where} ORDER BY id"):
+            yield _row_to_task(row)
+
+    def get_task_by_id(self, task_id: int) -> Task:
+        """
+        Get a task by its ID.
+
+        Args:
+            task_id: ID of the task to retrieve
+
+        Returns:
+            The requested Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        row = self.connection.execute(f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        return _row_to_task(row)
+
+    def update_task(self, task_id: int, **kwargs) -> Task:
+        """
+        Update a task with the given ID.
+
+        Args:
+            task_id: ID of the task to update
+            **kwargs: Task attributes to update
+
+        Returns:
+            The updated Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        with self._mutation():
+            task = self.get_task_by_id(task_id)
+            for field in ("title", "description", "priority", "completed"):
+                if field in kwargs:
+                    setattr(task, field, kwargs[field])
+            self.connection.execute(
+                "UPDATE tasks SET title = ?, description = ?, priority = ?, completed = ? WHERE id = ?",
+                (task.title, task.description, task.priority, int(task.completed), task.id)
+            )
+        return task
+
+    def delete_task(self, task_id: int) -> Task:
+        """
+        Delete a task.
+
+        Args:
+            task_id: ID of the task to delete
+
+        Returns:
+            The deleted Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        with self._mutation():
+            task = self.get_task_by_id(task_id)
+            self.connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        return task
+
+    def search_tasks(self, keyword: str) -> List[Task]:
+        """
+        Search for tasks containing the keyword.
+
+        Args:
+            keyword: Keyword to search for in task titles and descriptions
+
+        Returns:
+            List of matching Task objects
+        """
+        keyword = keyword.lower()
+        return self._query(
+            "WHERE instr(py_lower(title), ?) > 0 OR instr(py_lower(description), ?) > 0",
+            (keyword, keyword)
+        )
+
+    def search_query(self, query: str) -> List[Task]:
+        """
+        Search for tasks with the query language of the search_query module.
+
+        Rows stream from the database and are tested one by one.
+
+        Args:
+            query: The query
+
+        Returns:
+            List of matching Task objects, most relevant first
+
+        Raises:
+            InvalidQueryException: If the query is malformed
+        """
+        return compile_query(query).filter(self.iter_tasks())
+
+
+def migrate_json_to_sqlite(json_file: str, db_file: str) -> int:
+    """
+    Copy every task from a JSON task file into an empty SQLite database.
+
+    Args:
+        json_file: Path to the existing JSON task file
+        db_file: Path to the SQLite database to populate
+
+    Returns:
+        Number of tasks migrated
+
+    Raises:
+        StorageException: If the database already contains tasks
+    """
+    tasks = JsonStorage(json_file).load()
+    service = SqliteTaskService(db_file)
+    try:
+        with service.connection:
+            (existing,) = service.connection.execute("SELECT COUNT(*) FROM tasks").fetchone()
+            if existing:
+                raise StorageException(f"Database '{db_file}' already contains {existing} tasks")
+            service.connection.executemany(
+                f"INSERT INTO tasks ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                ((t.id, t.title, t.description, t.priority, int(t.completed), t.created_at) for t in tasks)
+            )
+    finally:
+        service.close()
+    return len(tasks)
+
+
+# Timed like TaskService; methods of BaseTaskService are timed through it.
+# batch() and iter_tasks() are left out, as their work happens after they
+# return, and there is no task count gauge, as no tasks are held in memory
+metrics.instrument(
+    SqliteTaskService,
+    (
+        "add_task", "bulk_add", "query", "count_tasks", "get_task_by_id", "update_task",
+        "delete_task", "search_tasks", "search_query", "refresh", "compact", "close",
+    )
+)
+
+
+def open_sqlite_store(json_file: str, check_same_thread: bool = True) -> SqliteTaskService:
+    """
+    Open the SQLite database that sits next to a JSON task file.
+
+    The database is ``<json_file without extension>.db``. On first use, any
+    tasks in the JSON file are migrated into it.
+
+    Args:
+        json_file: Path to the JSON task file
+        check_same_thread: See SqliteTaskService
+
+    Returns:
+        A SqliteTaskService for the database
+    """
+    db_file = os.path.splitext(json_file)[0] + ".db"
+    if not os.path.exists(db_file) and os.path.exists(json_file):
+        migrate_json_to_sqlite(json_file, db_file)
+    return SqliteTaskService(db_file, check_same_thread=check_same_thread)
@@ -0,0 +1,896 @@
+"""
+Storage backends for persisting tasks.
+"""
+
+import gc
+import logging
+import os
+import json
+import threading
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; writers are then not serialized across processes
+    fcntl = None
+
+from src.models.task import Task
+from src.services.binary_snapshot import BINARY_EXTENSION, dump_snapshot, is_binary_snapshot, open_snapshot
+from src.services.sharded_search import matching_tasks
+from src.utils import metrics
+from src.utils.exceptions import InvalidTaskDataException, StorageException
+from src.utils.json_stream import iter_json_array
+
+logger = logging.getLogger(__name__)
+
+# Mutation types recorded by storage backends
+OP_ADD = "add"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+# Log entry grouping several mutations that are applied all or nothing
+OP_BATCH = "batch"
+
+# Durability modes
+SYNC_ALWAYS = "always"  # fsync every write before returning
+SYNC_GROUP = "group"    # fsync once per group of writes (log backend only)
+SYNC_NONE = "none"      # leave flushing to the operating system
+
+DURABILITY_MODES = (SYNC_ALWAYS, SYNC_GROUP, SYNC_NONE)
+
+
+def _fsync_directory(directory: str) -> None:
+    """Make a rename or file creation in ``directory`` durable."""
+    if not hasattr(os, "O_DIRECTORY"):
+        # Directories cannot be opened for syncing on this platform
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _file_stamp(stat: os.stat_result) -> Tuple[int, int, int]:
+    """Identify one version of a file; atomic replacement changes the inode."""
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _encode_entry(op: str, task: Task) -> Dict[str, Any]:
+    """Build the log entry for one mutation."""
+    if op == OP_DELETE:
+        return {"op": op, "id": task.id}
+    return {"op": op, "task": task.to_dict()}
+
+
+def _decode_entry(entry: Dict[str, Any]) -> Tuple[str, Any]:
+    """Turn a log entry back into an (op, Task) or (OP_DELETE, task_id) pair."""
+    if entry["op"] == OP_DELETE:
+        return OP_DELETE, entry["id"]
+    return entry["op"], Task.from_dict(entry["task"])
+
+
+# Lays out one flat object the way json.dump(..., indent=2) does inside an
+# array, while still going through the C encoder, which indent disables
+_RECORD_ENCODER = json.JSONEncoder(separators=(",\n    ", ": "))
+
+
+def _dump_records(records: List[Dict[str, Any]], f: TextIO) -> None:
+    """
+    Write a list of flat, non-empty objects as an indented JSON array.
+
+    The output is identical to json.dump(records, f, indent=2).
+
+    Args:
+        records: Objects whose values are all scalars
+        f: Text file to write to
+    """
+    if not records:
+        f.write("[]")
+        return
+    encode = _RECORD_ENCODER.encode
+    f.write("[\n  {\n    ")
+    f.write("\n  },\n  {\n    ".join([encode(record)[1:-1] for record in records]))
+    f.write("\n  }\n]")
+
+
+def write_atomic(path: str, write: Callable[[IO], None], fsync: bool = True, binary: bool = False) -> None:
+    """
+    Replace a file so readers only ever see the old or the new content.
+
+    The content is written to a temporary file in the same directory, which
+    is then renamed over the target. A crash mid-write leaves the target intact.
+
+    Args:
+        path: File to replace
+        write: Called with the temporary file to write the new content
+        fsync: Whether to flush the new file and the rename to disk
+        binary: Open the temporary file in binary rather than text mode
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    # Random like uuid4().hex, without the cost of importing uuid
+    temp_path = f"{path}.{os.urandom(16).hex()}.tmp"
+    try:
+        with open(temp_path, "xb" if binary else "x") as f:
+            write(f)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        if metrics.enabled():
+            metrics.count_bytes_written(os.path.getsize(path), "snapshot")
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if fsync:
+        _fsync_directory(directory)
+
+
+def write_json_atomic(path: str, data: Optional[List[Dict[str, Any]]], fsync: bool = True) -> None:
+    """
+    Atomically replace a JSON file; see write_atomic.
+
+    Args:
+        path: File to replace
+        data: List of flat JSON objects, or None for an empty file
+        fsync: Whether to flush the new file and the rename to disk
+    """
+    write_atomic(path, lambda f: None if data is None else _dump_records(data, f), fsync)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Suspend cyclic garbage collection while building objects that are all kept.
+
+    Loading creates one object per task field, and every collection pass
+    would rescan all of them without finding anything to free.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class JsonStorage:
+    """
+    Storage backend that keeps every task in a single snapshot file.
+
+    The snapshot is JSON, or the compact binary format of binary_snapshot
+    when the file name ends in BINARY_EXTENSION.
+
+    Several processes may share one file. Readers never lock: saves replace
+    the file atomically, so a reader sees either the old or the new version.
+    Writers hold an advisory lock on ``<storage_file>.lock`` while they
+    commit, and read_changes tells a writer whether the file moved on since
+    it was last read, so the service can catch up before applying its change.
+    """
+
+    # Every save is a full rewrite, so there is nothing to group
+    SUPPORTED_DURABILITY = (SYNC_ALWAYS, SYNC_NONE)
+
+    def __init__(self, storage_file: str, durability: str = SYNC_ALWAYS):
+        """
+        Initialize the JSON storage backend.
+
+        Args:
+            storage_file: Path to the JSON file for storing tasks
+            durability: One of SUPPORTED_DURABILITY
+
+        Raises:
+            StorageException: If the durability mode is not supported
+        """
+        if durability not in self.SUPPORTED_DURABILITY:
+            raise StorageException(
+                f"Durability mode '{durability}' is not supported by {type(self).__name__}"
+            )
+        self.storage_file = storage_file
+        self.durability = durability
+        self.binary = is_binary_snapshot(storage_file)
+        self.lock_file = f"{storage_file}.lock"
+        # Version of the file last read or written; None until then
+        self._stamp: Optional[Tuple[int, ...]] = None
+        # Version of the file and the highest id it holds, once highest_id ran
+        self._highest_id: Optional[Tuple[Tuple[int, ...], int]] = None
+
+    def _current_stamp(self) -> Tuple[int, ...]:
+        """Return the version of the file on disk; () if it does not exist."""
+        try:
+            return _file_stamp(os.stat(self.storage_file))
+        except FileNotFoundError:
+            return ()
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the exclusive write lock shared by every process using the store."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def read_changes(self) -> Optional[List[Tuple[str, Any]]]:
+        """
+        Report changes written by other processes since the last read or write.
+
+        Returns:
+            An empty list if the store is unchanged, or None if it changed and
+            must be reloaded in full
+        """
+        if self._stamp is not None and self._current_stamp() == self._stamp:
+            return []
+        return None
+
+    def iter_tasks(self) -> Iterator[Task]:
+        """
+        Stream tasks from the storage file without loading it whole.
+
+        Tasks are parsed as the caller consumes them, so stopping early
+        skips the rest of the file.
+
+        Yields:
+            Task objects in storage order
+
+        Raises:
+            StorageException: If the file is not a valid task list
+        """
+        return self._iter_snapshot()
+
+    def _iter_snapshot(self) -> Iterator[Task]:
+        """Stream the tasks in the storage file; see iter_tasks."""
+        if not os.path.exists(self.storage_file):
+            self._stamp = ()
+            return
+        if self.binary:
+            with open(self.storage_file, "rb") as f:
+                self._stamp = _file_stamp(os.fstat(f.fileno()))
+                try:
+                    with open_snapshot(f) as snapshot:
+                        yield from snapshot
+                except StorageException as e:
+                    raise StorageException(f"Task file '{self.storage_file}' is corrupted: {e}")
+            return
+        with open(self.storage_file, "r") as f:
+            # Stamp the version actually opened, even if it is replaced meanwhile
+            self._stamp = _file_stamp(os.fstat(f.fileno()))
+            yield from self._parse_json(f)
+
+    def _parse_json(self, f: TextIO) -> Iterator[Task]:
+        """Stream the tasks of an open JSON storage file."""
+        try:
+            for task_dict in iter_json_array(f):
+                yield Task.from_dict(task_dict)
+        except (json.JSONDecodeError, InvalidTaskDataException) as e:
+            # Refuse to continue: starting empty would overwrite the file
+            raise StorageException(f"Task file '{self.storage_file}' is corrupted: {e}")
+
+    def load(self) -> List[Task]:
+        """
+        Load tasks from the storage file.
+
+        Returns:
+            List of Task objects
+
+        Raises:
+            StorageException: If the file is not a valid task list
+        """
+        with _gc_paused():
+            return list(self.iter_tasks())
+
+    def read_task(self, task_id: int) -> Optional[Task]:
+        """
+        Read one task without loading the rest of the store.
+
+        A binary snapshot is memory-mapped and the task found through its id
+        column, so the cost does not grow with the store. A JSON file is
+        streamed until the task turns up.
+
+        Args:
+            task_id: ID of the task to read
+
+        Returns:
+            The task, or None if the store does not hold it
+
+        Raises:
+            StorageException: If the file is not a valid task list
+        """
+        if not self.binary:
+            return next((task for task in self._iter_snapshot() if task.id == task_id), None)
+        if not os.path.exists(self.storage_file):
+            return None
+        with open(self.storage_file, "rb") as f:
+            try:
+                with open_snapshot(f) as snapshot:
+                    return snapshot.get(task_id)
+            except StorageException as e:
+                raise StorageException(f"Task file '{self.storage_file}' is corrupted: {e}")
+
+    def iter_matching(self, match: Callable[[str, str], bool], workers: int = 1) -> Iterator[Task]:
+        """
+        Stream the tasks whose text satisfies a predicate.
+
+        With a binary snapshot, only the matching tasks are materialized, and
+        the scan can be sharded across worker processes.
+
+        Args:
+            match: Called with each task's title and description
+            workers: Most processes to scan a binary snapshot with; see
+                sharded_search.matching_tasks
+
+        Yields:
+            Matching tasks, in no particular order
+
+        Raises:
+            StorageException: If the file is not a valid task list
+        """
+        if not self.binary:
+            for task in self._iter_snapshot():
+                if match(task.title, task.description):
+                    yield task
+            return
+        if not os.path.exists(self.storage_file):
+            return
+        with open(self.storage_file, "rb") as f:
+            try:
+                with open_snapshot(f) as snapshot:
+                    if workers > 1:
+                        yield from matching_tasks(snapshot, match, workers)
+                    else:
+                        yield from snapshot.matching(match)
+            except StorageException as e:
+                raise StorageException(f"Task file '{self.storage_file}' is corrupted: {e}")
+
+    def highest_id(self) -> int:
+        """
+        Return the highest task id in the store.
+
+        Stores edited by hand or merged need not hold their tasks in id
+        order, so a JSON file is streamed once and the maximum remembered
+        for that version of the file; a binary snapshot is sorted by id and
+        holds it at the end of its id column.
+
+        Returns:
+            The highest id, or 0 for an empty store
+
+        Raises:
+            StorageException: If the file is not a valid task list
+        """
+        if not os.path.exists(self.storage_file):
+            return 0
+        with open(self.storage_file, "rb" if self.binary else "r") as f:
+            stamp = _file_stamp(os.fstat(f.fileno()))
+            if self._highest_id is not None and self._highest_id[0] == stamp:
+                return self._highest_id[1]
+            if self.binary:
+                try:
+                    with open_snapshot(f) as snapshot:
+                        highest = snapshot.highest_id()
+                except StorageException as e:
+                    raise StorageException(f"Task file '{self.storage_file}' is corrupted: {e}")
+            else:
+                highest = max((task.id for task in self._parse_json(f)), default=0)
+        self._highest_id = (stamp, highest)
+        return highest
+
+    def can_append(self) -> bool:
+        """
+        Return whether a single mutation can be recorded without the other tasks.
+
+        The JSON backend rewrites the whole snapshot on every change, so it
+        never can.
+        """
+        return False
+
+    def save(self, tasks: Iterable[Task]) -> None:
+        """
+        Atomically replace the storage file with a snapshot of the tasks.
+
+        Args:
+            tasks: All tasks currently held by the service
+        """
+        fsync = self.durability != SYNC_NONE
+        if self.binary:
+            write_atomic(self.storage_file, lambda f: dump_snapshot(tasks, f), fsync, binary=True)
+        else:
+            write_json_atomic(self.storage_file, [task.to_dict() for task in tasks], fsync)
+        self._stamp = self._current_stamp()
+
+    def record(self, op: str, task: Task, tasks: Iterable[Task]) -> None:
+        """
+        Persist a single mutation.
+
+        The JSON backend has no cheaper representation of a change than the
+        full file, so every mutation rewrites the snapshot.
+
+        Args:
+            op: Mutation type (add, update, delete)
+            task: The task affected by the mutation
+            tasks: All tasks currently held by the service
+        """
+        self.save(tasks)
+
+    def needs_snapshot(self, count: int) -> bool:
+        """
+        Return whether record_batch() of count records writes a full snapshot.
+
+        Callers that can supply the tasks only at a cost pass them when it
+        does, and an empty iterable otherwise.
+        """
+        return count > 0
+
+    def record_batch(self, records: List[Tuple[str, Task]], tasks: Iterable[Task]) -> None:
+        """
+        Persist several mutations with a single snapshot write.
+
+        Args:
+            records: (op, task) pairs in the order they were applied
+            tasks: All tasks currently held by the service
+        """
+        if records:
+            self.save(tasks)
+
+    def sync(self) -> None:
+        """Flush outstanding writes to disk; saves are already synchronous."""
+        pass
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+        pass
+
+
+def _replay(records: List[Tuple[str, Any]]) -> Tuple[Dict[int, Optional[Task]], Set[int]]:
+    """
+    Fold mutation log records into the final state of each task they mention.
+
+    Args:
+        records: Decoded log records in log order
+
+    Returns:
+        The final state of every task the log mentions (None once deleted),
+        in the order a full replay would place the tasks that were deleted,
+        and the ids of every task deleted at some point
+    """
+    changes: Dict[int, Optional[Task]] = {}
+    deleted: Set[int] = set()
+    for op, payload in records:
+        if op == OP_DELETE:
+            changes.pop(payload, None)
+            changes[payload] = None
+            deleted.add(payload)
+        else:
+            if payload.id in changes and changes[payload.id] is None:
+                # Re-added after a delete; it now sorts last
+                del changes[payload.id]
+            changes[payload.id] = payload
+    return changes, deleted
+
+
+class LogStorage(JsonStorage):
+    """
+    Storage backend combining a JSON snapshot with an append-only mutation log.
+
+    Each mutation appends one JSON line to the log, so single-task changes cost
+    O(1) I/O. Once the log holds ``compact_threshold`` records it is folded
+    into a fresh snapshot and replaced by an empty log. Loading replays the
+    log on top of the snapshot; records carry the full task state, so
+    replaying a record that is already part of the snapshot is harmless.
+
+    Records reach the operating system as soon as they are written. With
+    SYNC_GROUP the fsync is shared by a group of records: it runs once
+    ``group_commit_ops`` records are pending or ``group_commit_ms`` after the
+    oldest pending record, whichever comes first. A power failure can then
+    lose at most that group.
+
+    Other processes' changes are picked up by reading only the log records
+    appended since this process last looked. Compaction swaps in a new log
+    file, which readers notice by its inode and answer with a full reload.
+    """
+
+    SUPPORTED_DURABILITY = DURABILITY_MODES
+
+    def __init__(
+        self,
+        storage_file: str,
+        log_file: Optional[str] = None,
+        compact_threshold: int = 1000,
+        durability: str = SYNC_ALWAYS,
+        group_commit_ops: int = 100,
+        group_commit_ms: int = 50
+    ):
+        """
+        Initialize the log storage backend.
+
+        Args:
+            storage_file: Path to the JSON snapshot file
+            log_file: Path to the mutation log (defaults to ``<storage_file>.log``)
+            compact_threshold: Number of log records that triggers compaction
+            durability: One of SYNC_ALWAYS, SYNC_GROUP or SYNC_NONE
+            group_commit_ops: Pending records that force a group commit
+            group_commit_ms: Longest time a record waits for its group commit
+
+        Raises:
+            StorageException: If the durability mode is unknown
+        """
+        super().__init__(storage_file, durability)
+        self.log_file = log_file or f"{storage_file}.log"
+        self.compact_threshold = compact_threshold
+        self.group_commit_ops = group_commit_ops
+        self.group_commit_ms = group_commit_ms
+        self.pending_records = 0
+        self._log = None
+        # Inode of the log last read and the byte offset consumed from it
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+        self._unsynced = 0
+        self._commit_timer: Optional[threading.Timer] = None
+        # Guards the log handle against the group commit timer thread
+        self._lock = threading.RLock()
+
+    def _log_stat(self) -> Optional[os.stat_result]:
+        """Stat the log file, or return None if it does not exist."""
+        try:
+            return os.stat(self.log_file)
+        except FileNotFoundError:
+            return None
+
+    def _read_records(self, start: int) -> List[Tuple[str, Any]]:
+        """
+        Read the complete log records from a byte offset onwards.
+
+        A trailing partial line is left unread: it is either a record another
+        process is still writing or a torn write, which record() truncates
+        while holding the write lock.
+
+        Args:
+            start: Byte offset of the first record to read
+
+        Returns:
+            (op, Task) pairs for adds and updates, (op, task_id) for deletes
+        """
+        records = []
+        try:
+            f = open(self.log_file, "rb")
+        except FileNotFoundError:
+            self._log_inode = None
+            self._log_offset = 0
+            return records
+        with f:
+            self._log_inode = os.fstat(f.fileno()).st_ino
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(
+                        "Error reading task log '%s'. Ignoring records after byte %d.", self.log_file, offset
+                    )
+                    break
+                if entry["op"] == OP_BATCH:
+                    records.extend(_decode_entry(item) for item in entry["records"])
+                else:
+                    records.append(_decode_entry(entry))
+                offset += len(line)
+        self._log_offset = offset
+        return records
+
+    def iter_tasks(self) -> Iterator[Task]:
+        """
+        Stream the snapshot with the mutation log applied.
+
+        Only the log is read up front; it is bounded by compact_threshold.
+        The log is read before the snapshot, so a compaction in between only
+        means some records are replayed onto a snapshot that already has them.
+
+        Yields:
+            Task objects in storage order
+
+        Raises:
+            StorageException: If the snapshot is not a valid task list
+        """
+        records = self._read_records(0)
+        self.pending_records = len(records)
+        changes, deleted = _replay(records)
+        for task in super().iter_tasks():
+            if task.id in deleted:
+                # Dropped here; if it was re-added it follows the snapshot
+                continue
+            if task.id in changes:
+                task = changes.pop(task.id)
+            yield task
+        for task in changes.values():
+            if task is not None:
+                yield task
+
+    def read_task(self, task_id: int) -> Optional[Task]:
+        """
+        Read one task, from the log if it mentions the task, else the snapshot.
+
+        Args:
+            task_id: ID of the task to read
+
+        Returns:
+            The task, or None if the store does not hold it
+
+        Raises:
+            StorageException: If the snapshot is not a valid task list
+        """
+        changes, _ = _replay(self._read_records(0))
+        if task_id in changes:
+            return changes[task_id]
+        return super().read_task(task_id)
+
+    def iter_matching(self, match: Callable[[str, str], bool], workers: int = 1) -> Iterator[Task]:
+        """
+        Stream the tasks whose text satisfies a predicate, log applied.
+
+        Args:
+            match: Called with each task's title and description
+            workers: Most processes to scan a binary snapshot with
+
+        Yields:
+            Matching tasks, in no particular order
+
+        Raises:
+            StorageException: If the snapshot is not a valid task list
+        """
+        changes, _ = _replay(self._read_records(0))
+        for task in super().iter_matching(match, workers):
+            if task.id not in changes:
+                yield task
+        for task in changes.values():
+            if task is not None and match(task.title, task.description):
+                yield task
+
+    def highest_id(self) -> int:
+        """
+        Return the highest id of a live task, reading as little as possible.
+
+        Returns:
+            The highest id, or 0 for an empty store
+
+        Raises:
+            StorageException: If the snapshot is not a valid task list
+        """
+        changes, _ = _replay(self._read_records(0))
+        highest = super().highest_id()
+        if highest in changes and changes[highest] is None:
+            # The snapshot's last task was deleted; the next one down is unknown
+            return max((task.id for task in self.iter_tasks()), default=0)
+        return max([highest] + [task_id for task_id, task in changes.items() if task is not None])
+
+    def can_append(self) -> bool:
+        """
+        Return whether a single mutation can be recorded without the other tasks.
+
+        It can unless the record would bring the log to the compaction
+        threshold, since compacting writes a snapshot of every task. Call
+        with the store locked.
+        """
+        self.pending_records = len(self._read_records(0))
+        return self.pending_records + 1 < self.compact_threshold
+
+    def read_changes(self) -> Optional[List[Tuple[str, Any]]]:
+        """
+        Report changes written by other processes since the last read or write.
+
+        Returns:
+            The log records appended since then, or None if the snapshot was
+            replaced and the store must be reloaded in full
+        """
+        if self._stamp is None or self._current_stamp() != self._stamp:
+            return None
+        log_stat = self._log_stat()
+        if log_stat is None:
+            return [] if self._log_inode is None else None
+        if self._log_inode is not None and log_stat.st_ino != self._log_inode:
+            return None
+        if log_stat.st_size <= self._log_offset:
+            return []
+        records = self._read_records(self._log_offset)
+        self.pending_records += len(records)
+        return records
+
+    def save(self, tasks: Iterable[Task]) -> None:
+        """
+        Write a full snapshot and start a new, empty mutation log.
+
+        The snapshot is synced before the log is replaced unless durability
+        is SYNC_NONE, so a crash in between never loses records.
+
+        Args:
+            tasks: All tasks currently held by the service
+        """
+        with self._lock:
+            super().save(tasks)
+            self._close_log()
+            write_json_atomic(self.log_file, None, fsync=self.durability != SYNC_NONE)
+            self._log_inode = os.stat(self.log_file).st_ino
+            self._log_offset = 0
+            self.pending_records = 0
+
+    def _open_log(self) -> None:
+        """Open the log for appending, dropping any torn record at its end."""
+        if self._log is not None and os.fstat(self._log.fileno()).st_ino != self._log_inode:
+            # Another process compacted the store since the handle was opened
+            self._close_log()
+        if self._log is None:
+            created = not os.path.exists(self.log_file)
+            self._log = open(self.log_file, "a")
+            self._log_inode = os.fstat(self._log.fileno()).st_ino
+            if created and self.durability != SYNC_NONE:
+                _fsync_directory(os.path.dirname(os.path.abspath(self.log_file)))
+        if os.fstat(self._log.fileno()).st_size > self._log_offset:
+            # Writers hold the lock, so unread bytes here are a torn write
+            self._log.truncate(self._log_offset)
+
+    def record(self, op: str, task: Task, tasks: Iterable[Task]) -> None:
+        """
+        Append a single mutation to the log, compacting when it grows too long.
+
+        Callers hold the write lock and have applied read_changes first.
+
+        Args:
+            op: Mutation type (add, update, delete)
+            task: The task affected by the mutation
+            tasks: All tasks currently held by the service
+        """
+        self.record_batch([(op, task)], tasks)
+
+    def needs_snapshot(self, count: int) -> bool:
+        """
+        Return whether record_batch() of count records writes a full snapshot.
+
+        Only a batch that brings the log to the compaction threshold does.
+        """
+        return count > 0 and self.pending_records + count >= self.compact_threshold
+
+    def record_batch(self, records: List[Tuple[str, Task]], tasks: Iterable[Task]) -> None:
+        """
+        Append several mutations to the log as one record with one sync.
+
+        A batch that brings the log to the compaction threshold is written as
+        a fresh snapshot instead.
+
+        Args:
+            records: (op, task) pairs in the order they were applied
+            tasks: All tasks currently held by the service
+        """
+        if not records:
+            return
+        with self._lock:
+            if self.needs_snapshot(len(records)):
+                self.save(tasks)
+                return
+
+            if len(records) == 1:
+                entry = _encode_entry(*records[0])
+            else:
+                # One line per batch: a torn write drops the whole batch
+                entry = {"op": OP_BATCH, "records": [_encode_entry(op, task) for op, task in records]}
+            data = json.dumps(entry) + "\n"
+
+            self._open_log()
+            self._log.write(data)
+            self._log.flush()
+            # json.dumps escapes non-ASCII, so characters and bytes agree
+            self._log_offset += len(data)
+            self.pending_records += len(records)
+            metrics.count_bytes_written(len(data), "log")
+
+            if self.durability == SYNC_ALWAYS:
+                os.fsync(self._log.fileno())
+            elif self.durability == SYNC_GROUP:
+                self._unsynced += len(records)
+                if self._unsynced >= self.group_commit_ops:
+                    self.sync()
+                elif self._commit_timer is None:
+                    self._commit_timer = threading.Timer(self.group_commit_ms / 1000, self.sync)
+                    self._commit_timer.daemon = True
+                    self._commit_timer.start()
+
+    def sync(self) -> None:
+        """Flush every pending log record to disk."""
+        with self._lock:
+            if self._commit_timer is not None:
+                self._commit_timer.cancel()
+                self._commit_timer = None
+            if self._log is not None and self._unsynced:
+                os.fsync(self._log.fileno())
+            self._unsynced = 0
+
+    def _close_log(self) -> None:
+        """Sync and close the log handle."""
+        self.sync()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def close(self) -> None:
+        """Sync and close the mutation log if it is open."""
+        with self._lock:
+            self._close_log()
+
+
+# Registered storage backends, selectable by name
+STORAGE_BACKENDS = {
+    "json": JsonStorage,
+    "log": LogStorage,
+}
+
+
+# Snapshot formats, selectable by name
+SNAPSHOT_JSON = "json"
+SNAPSHOT_BINARY = "binary"
+SNAPSHOT_FORMATS = (SNAPSHOT_JSON, SNAPSHOT_BINARY)
+
+
+def create_storage(
+    storage_file: str,
+    backend: Optional[str] = None,
+    durability: Optional[str] = None,
+    snapshot_format: Optional[str] = None
+) -> JsonStorage:
+    """
+    Create a storage backend for the given file.
+
+    A file name ending in BINARY_EXTENSION always uses the binary snapshot
+    format. Selecting the binary format for any other file stores the tasks
+    next to it, in ``<storage_file without extension>.tsb``; on first use,
+    the tasks already in the original file are migrated into it.
+
+    Args:
+        storage_file: Path to the task storage file
+        backend: Backend name; defaults to the TASK_MANAGER_STORAGE environment
+            variable, or "json" if that is not set
+        durability: Durability mode; defaults to the TASK_MANAGER_DURABILITY
+            environment variable, or "always" if that is not set
+        snapshot_format: "json" or "binary"; defaults to the
+            TASK_MANAGER_SNAPSHOT environment variable, or "json" if that is
+            not set
+
+    Returns:
+        A storage backend instance
+
+    Raises:
+        StorageException: If the backend name, durability mode or snapshot
+            format is unknown, or the backend is "sqlite"
+    """
+    backend = backend or os.environ.get("TASK_MANAGER_STORAGE", "json")
+    durability = durability or os.environ.get("TASK_MANAGER_DURABILITY", SYNC_ALWAYS)
+    snapshot_format = snapshot_format or os.environ.get("TASK_MANAGER_SNAPSHOT", SNAPSHOT_JSON)
+    if backend == "sqlite":
+        # Not a storage backend but a service of its own, which TaskService cannot use
+        raise StorageException(
+            "The sqlite backend has its own service; open it with "
+            "src.services.sqlite_task_service.open_sqlite_store() instead of TaskService"
+        )
+    if backend not in STORAGE_BACKENDS:
+        raise StorageException(f"Unknown storage backend '{backend}'")
+    if snapshot_format not in SNAPSHOT_FORMATS:
+        raise StorageException(f"Unknown snapshot format '{snapshot_format}'")
+    storage_class = STORAGE_BACKENDS[backend]
+    if snapshot_format == SNAPSHOT_BINARY and not is_binary_snapshot(storage_file):
+        binary_file = os.path.splitext(storage_file)[0] + BINARY_EXTENSION
+        if not os.path.exists(binary_file):
+            # The original store may be a snapshot, a mutation log or both
+            source = storage_class(storage_file, durability=durability)
+            try:
+                tasks = source.load()
+            finally:
+                source.close()
+            if tasks:
+                JsonStorage(binary_file, durability=durability).save(tasks)
+        storage_file = binary_file
+    return storage_class(storage_file, durability=durability)
@@ -2,26 +2,106 @@
 Task service for managing task operations.
 """
 
-import os
-import json
-from typing import List, Dict, Any, Optional
-
-from src.models.task import Task
+import operator
+from contextlib import contextmanager
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from src.models.task import Task, current_timestamp
+from src.services.base_task_service import BaseTaskService
+from src.services.filter_index import FilterIndex
+from src.services.search_index import SearchIndex, match_score
+from src.services.search_query import QueryContext, TextColumns, compile_query
+from src.services.sharded_search import configured_workers
+from src.services.sort_index import SortIndex, SORT_FIELDS
+from src.services.storage import JsonStorage, create_storage, OP_ADD, OP_UPDATE, OP_DELETE
+from src.utils import metrics
 from src.utils.exceptions import TaskNotFoundException
 
 
-class TaskService:
+class TaskService(BaseTaskService):
     """Service class for managing tasks."""
 
-    def __init__(self, storage_file: str = "tasks.json"):
+    # Attributes set by _load_index; reading one on a lazy service loads the tasks
+    _INDEX_ATTRIBUTES = frozenset({
+        "_tasks_by_id", "_task_list", "_next_id", "_ids_ascending", "_search_index", "_filter_index",
+        "_sort_index", "_text_columns"
+    })
+
+    # Mutations collected by an open batch(); None outside a batch
+    _batch_records: Optional[List[Tuple[str, Task]]] = None
+
+    def __init__(
+        self,
+        storage_file: str = "tasks.json",
+        storage: Optional[JsonStorage] = None,
+        lazy: bool = False,
+        search_workers: Optional[int] = None
+    ):
         """
         Initialize the TaskService with a storage file.
 
         Args:
             storage_file: Path to the JSON file for storing tasks
+            storage: Storage backend to use; created from storage_file if omitted
+            lazy: Defer loading the tasks until they are first needed
+            search_workers: Most processes a lazy service scans a binary
+                snapshot with when searching; defaults to the
+                TASK_MANAGER_SEARCH_WORKERS environment variable, or 1
         """
         self.storage_file = storage_file
-        self.tasks = self._load_tasks()
+        self.storage = storage or create_storage(storage_file)
+        self.search_workers = configured_workers() if search_workers is None else search_workers
+        if not lazy:
+            self._load_index(self._load_tasks())
+
+    def __getattr__(self, name: str) -> Any:
+        """Load the tasks the first time a lazy service touches its index."""
+        if name in self._INDEX_ATTRIBUTES:
+            self._load_index(self._load_tasks())
+            return getattr(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _is_loaded(self) -> bool:
+        """Return whether the tasks are in memory; false on a lazy service until first use."""
+        return "_tasks_by_id" in self.__dict__
+
+    def _load_if_lazy(self) -> None:
+        """Load the tasks of a lazy service that has not loaded them yet."""
+        if not self._is_loaded():
+            self._load_index(self._load_tasks())
+
+    def _load_index(self, tasks: List[Task]) -> None:
+        """
+        Rebuild the id index and id allocator from a list of tasks.
+
+        Args:
+            tasks: Tasks in insertion order
+        """
+        # The id index is the source of truth; dicts keep insertion order
+        self._tasks_by_id: Dict[int, Task] = {task.id: task for task in tasks}
+        self._task_list: Optional[List[Task]] = None
+        self._next_id = max(self._tasks_by_id, default=0) + 1
+        # Whether insertion order is id order; false for stores edited by hand or merged
+        ids = list(self._tasks_by_id)
+        self._ids_ascending = all(map(operator.lt, ids, islice(ids, 1, None)))
+        # Built on first use so commands that never search or filter skip the cost
+        self._search_index: Optional[SearchIndex] = None
+        self._filter_index: Optional[FilterIndex] = None
+        self._sort_index: Optional[SortIndex] = None
+        # Rebuilt after any change to the tasks, rather than kept up to date
+        self._text_columns: Optional[TextColumns] = None
+
+    @property
+    def tasks(self) -> List[Task]:
+        """
+        All tasks in insertion order.
+
+        The list is rebuilt lazily after a delete, so deletes stay O(1).
+        """
+        if self._task_list is None:
+            self._task_list = list(self._tasks_by_id.values())
+        return self._task_list
 
     def _load_tasks(self) -> List[Task]:
         """
@@ -30,21 +110,217 @@ class TaskService:
         Returns:
             List of Task objects
         """
-        tasks = []
-        if os.path.exists(self.storage_file):
-            try:
-                with open(self.storage_file, "r") as f:
-                    task_dicts = json.load(f)
-                    tasks = [Task.from_dict(task_dict) for task_dict in task_dicts]
-            except json.JSONDecodeError:
-                print(f"Error reading task file. Starting with empty task list.")
-        return tasks
+        return self.storage.load()
 
     def _save_tasks(self) -> None:
-        """Save tasks to the storage file."""
-        task_dicts = [task.to_dict() for task in self.tasks]
-        with open(self.storage_file, "w") as f:
-            json.dump(task_dicts, f, indent=2)
+        """Save a full snapshot of the tasks to the storage file."""
+        self.storage.save(self.tasks)
+
+    def _record(self, op: str, task: Task) -> None:
+        """
+        Persist a single mutation through the storage backend.
+
+        Inside a batch the mutation is held back until the batch commits.
+
+        Args:
+            op: Mutation type (add, update, delete)
+            task: The task affected by the mutation
+        """
+        if self._batch_records is not None:
+            self._batch_records.append((op, task))
+        else:
+            self.storage.record(op, task, self._tasks_by_id.values())
+
+    @contextmanager
+    def _mutation(self) -> Iterator[None]:
+        """
+        Hold the store's write lock for one mutation.
+
+        Changes other processes committed since this service last read the
+        store are applied first, so the mutation is made against current data:
+        edits to different fields of a task merge, and edits to a task that was
+        deleted elsewhere fail with TaskNotFoundException. Inside a batch the
+        lock is already held.
+        """
+        if self._batch_records is not None:
+            yield
+            return
+        with self.storage.lock():
+            # Mutations work on the loaded index, never on tasks read on their own
+            self._load_if_lazy()
+            self.refresh()
+            yield
+
+    def _append_unloaded(self, op: str, make_task: Callable[[], Task]) -> Optional[Task]:
+        """
+        Record one mutation on a lazy service without loading its tasks.
+
+        Backends that append mutations to a log (see JsonStorage.can_append)
+        take the record as is, so commands like ``add`` and ``complete`` never
+        parse the snapshot. The store is locked while the task is built.
+
+        Args:
+            op: Mutation type (add, update, delete)
+            make_task: Builds the task affected by the mutation from storage
+
+        Returns:
+            The task, or None if the mutation must go through the loaded index:
+            the tasks are already loaded, a batch is open, or the backend
+            cannot append this record
+        """
+        if self._is_loaded() or self._batch_records is not None:
+            return None
+        with self.storage.lock():
+            if not self.storage.can_append():
+                return None
+            task = make_task()
+            self.storage.record(op, task, ())
+        return task
+
+    @contextmanager
+    def batch(self) -> Iterator["TaskService"]:
+        """
+        Group several mutations into one atomic write.
+
+        Changes made inside the block are applied in memory as usual and
+        persisted together when the block exits, with one snapshot write or
+        one log record. If the block raises, none of its changes are kept and
+        the tasks are reloaded as they were before the batch. Nested batches
+        join the outermost one.
+
+        Yields:
+            This service
+
+        Example:
+            with service.batch():
+                for title in titles:
+                    service.add_task(title)
+        """
+        if self._batch_records is not None:
+            yield self
+            return
+        with self._mutation():
+            self._batch_records = []
+            try:
+                yield self
+                records, self._batch_records = self._batch_records, None
+                self.storage.record_batch(records, self._tasks_by_id.values())
+            except BaseException:
+                # Nothing reached storage, so it still holds the pre-batch state
+                self._batch_records = None
+                self.reload()
+                raise
+
+    def defer_writes(self) -> None:
+        """
+        Stop writing mutations to storage as they are made.
+
+        Mutations keep updating the tasks in memory, but their records queue
+        up until take_deferred_writes() hands them to the caller, who then
+        persists them with storage.record_batch(). The store is neither
+        locked nor refreshed before each mutation, so the caller must be its
+        only writer. Loads the tasks of a lazy service.
+        """
+        self._load_if_lazy()
+        if self._batch_records is None:
+            self._batch_records = []
+
+    def take_deferred_writes(self) -> List[Tuple[str, Task]]:
+        """
+        Hand over the records queued since defer_writes() or the last call.
+
+        Returns:
+            (op, task) pairs in the order the mutations were made
+        """
+        records, self._batch_records = self._batch_records, []
+        return records
+
+    def reload(self, tasks: Optional[List[Task]] = None) -> None:
+        """
+        Discard the tasks in memory and load them from storage again.
+
+        Args:
+            tasks: The tasks, if the caller already loaded them from storage,
+                for instance off an event loop
+        """
+        self._load_index(self._load_tasks() if tasks is None else tasks)
+
+    def refresh(self) -> None:
+        """Pick up changes other processes have written to the store."""
+        changes = self.storage.read_changes()
+        if changes is None:
+            self._load_index(self._load_tasks())
+        else:
+            for op, payload in changes:
+                self._apply_change(op, payload)
+
+    def _apply_change(self, op: str, payload: Any) -> None:
+        """
+        Apply a change read from storage to the in-memory index.
+
+        Args:
+            op: Mutation type (add, update, delete)
+            payload: The task for adds and updates, the task id for deletes
+        """
+        if op == OP_DELETE:
+            if payload in self._tasks_by_id:
+                self._index_remove(payload)
+            return
+        task = self._tasks_by_id.get(payload.id)
+        if task is None:
+            self._index_add(payload)
+            return
+        # Update in place so callers holding the Task see the new values
+        task.title = payload.title
+        task.description = payload.description
+        task.priority = payload.priority
+        task.completed = payload.completed
+        task.created_ts = payload.created_ts
+        task.created_text = payload.created_text
+        if self._search_index is not None:
+            self._search_index.update(task)
+        if self._filter_index is not None:
+            self._filter_index.update(task)
+        if self._sort_index is not None:
+            self._sort_index.update(task)
+        self._text_columns = None
+
+    def _index_add(self, task: Task) -> None:
+        """Add a task to the in-memory index."""
+        self._tasks_by_id[task.id] = task
+        if task.id < self._next_id - 1:
+            self._ids_ascending = False
+        self._next_id = max(self._next_id, task.id + 1)
+        if self._task_list is not None:
+            self._task_list.append(task)
+        if self._search_index is not None:
+            self._search_index.add(task)
+        if self._filter_index is not None:
+            self._filter_index.add(task)
+        if self._sort_index is not None:
+            self._sort_index.add(task)
+        self._text_columns = None
+
+    def _index_remove(self, task_id: int) -> None:
+        """Remove a task from the in-memory index."""
+        del self._tasks_by_id[task_id]
+        self._task_list = None
+        if self._search_index is not None:
+            self._search_index.remove(task_id)
+        if self._filter_index is not None:
+            self._filter_index.remove(task_id)
+        if self._sort_index is not None:
+            self._sort_index.remove(task_id)
+        self._text_columns = None
+
+    def compact(self) -> None:
+        """Fold any pending mutations into a fresh snapshot."""
+        with self._mutation():
+            self._save_tasks()
+
+    def close(self) -> None:
+        """Release resources held by the storage backend."""
+        self.storage.close()
 
     def add_task(self, title: str, description: str = "", priority: str = "medium") -> Task:
         """
@@ -58,30 +334,167 @@ class TaskService:
         Returns:
             The newly created Task
         """
-        task_id = max([task.id for task in self.tasks], default=0) + 1
-        task = Task(task_id, title, description, priority)
-        self.tasks.append(task)
-        self._save_tasks()
+        task = self._append_unloaded(
+            OP_ADD, lambda: Task(self.storage.highest_id() + 1, title, description, priority)
+        )
+        if task is not None:
+            return task
+        with self._mutation():
+            task = Task(self._next_id, title, description, priority)
+            self._index_add(task)
+            self._record(OP_ADD, task)
         return task
 
-    def get_all_tasks(self, show_completed: bool = True) -> List[Task]:
+    def bulk_add(self, entries: Iterable[Dict[str, Any]]) -> List[Task]:
         """
-        Get all tasks, optionally filtering out completed tasks.
+        Add many tasks in one batch.
 
         Args:
-            show_completed: Whether to include completed tasks
+            entries: Dicts with a title and optionally description and priority
+
+        Returns:
+            The newly created Tasks, in order
+
+        Raises:
+            InvalidTaskDataException: If an entry has no title; no task is added
+        """
+        with self.batch():
+            # Tasks added together share one creation time
+            now = current_timestamp()
+            added = []
+            for entry in entries:
+                task = self._task_from_entry(self._next_id, entry, now)
+                self._index_add(task)
+                self._record(OP_ADD, task)
+                added.append(task)
+        return added
+
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "id",
+        descending: bool = False
+    ) -> List[Task]:
+        """
+        Find tasks by status and priority using the secondary indexes.
+
+        The cost is proportional to the number of matching tasks, not the size
+        of the store, and the first k tasks of a sorted listing are read off
+        a maintained order rather than sorting every task.
+
+        Args:
+            completed: Only return tasks with this status; any status if None
+            priority: Only return tasks with this priority, ignoring case; any
+                priority if None
+            offset: Number of matching tasks to skip
+            limit: Maximum number of tasks to return; all remaining if None
+            sort_by: "id" (ascending ids), "created_at" (oldest first) or
+                "priority" (high to low)
+            descending: Reverse the order
 
         Returns:
             List of Task objects
+
+        Raises:
+            ValueError: If sort_by is not one of SORT_FIELDS
         """
-        if show_completed:
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort tasks by '{sort_by}'; expected one of {', '.join(SORT_FIELDS)}")
+        filtered = completed is not None or priority is not None
+        among = self._get_filter_index().matching(completed, priority) if filtered else None
+
+        if sort_by != "id":
+            task_ids = self._get_sort_index().select(sort_by, descending, among, offset, limit)
+            return [self._tasks_by_id[task_id] for task_id in task_ids]
+
+        if not filtered and self._ids_ascending and not descending and not offset and limit is None:
             return self.tasks
-        return [task for task in self.tasks if not task.completed]
+        if among is not None:
+            items = sorted(among)
+        elif self._ids_ascending:
+            # Insertion order was checked to be id order when the store loaded
+            items = self.tasks
+        else:
+            items = sorted(self.tasks, key=operator.attrgetter("id"))
+        if descending:
+            end = len(items) - offset
+            start = 0 if limit is None else max(end - limit, 0)
+            items = items[start:max(end, 0)][::-1]
+        else:
+            items = items[offset:None if limit is None else offset + limit]
+        return items if among is None else [self._tasks_by_id[task_id] for task_id in items]
+
+    def count_tasks(self, show_completed: bool = True, priority: Optional[str] = None) -> int:
+        """
+        Count the tasks get_all_tasks would return without offset and limit.
+
+        Args:
+            show_completed: Whether to include completed tasks
+            priority: Only count tasks with this priority (low, medium, high)
+
+        Returns:
+            Number of matching tasks
+        """
+        if show_completed and priority is None:
+            return len(self._tasks_by_id)
+        return self._get_filter_index().count(completed=None if show_completed else False, priority=priority)
+
+    def _get_sort_index(self) -> SortIndex:
+        """Return the creation time and priority orders, building them on first use."""
+        if self._sort_index is None:
+            self._sort_index = SortIndex(self._tasks_by_id.values())
+        return self._sort_index
+
+    def _get_search_index(self) -> SearchIndex:
+        """Return the search index, building it on first use."""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self._tasks_by_id.values())
+        return self._search_index
+
+    def _get_text_columns(self) -> TextColumns:
+        """Return the text columns, building them on first use after a change."""
+        if self._text_columns is None:
+            self._text_columns = TextColumns(self._tasks_by_id.values())
+        return self._text_columns
+
+    def _get_filter_index(self) -> FilterIndex:
+        """Return the status and priority index, building it on first use."""
+        if self._filter_index is None:
+            self._filter_index = FilterIndex(self._tasks_by_id.values())
+        return self._filter_index
+
+    def iter_tasks(self, show_completed: bool = True) -> Iterator[Task]:
+        """
+        Iterate over tasks without building a list.
+
+        A lazy service that has not loaded its tasks yet streams them straight
+        from storage, so callers that stop early never parse the whole file.
+
+        Args:
+            show_completed: Whether to include completed tasks
+
+        Yields:
+            Task objects in insertion order
+        """
+        if self._is_loaded():
+            source = iter(list(self._tasks_by_id.values()))
+        else:
+            source = self.storage.iter_tasks()
+        for task in source:
+            if show_completed or not task.completed:
+                yield task
 
     def get_task_by_id(self, task_id: int) -> Task:
         """
         Get a task by its ID.
 
+        A lazy service that has not loaded its tasks yet reads just this one
+        from storage; with a binary snapshot that is a lookup in the memory
+        mapped file, whatever the size of the store.
+
         Args:
             task_id: ID of the task to retrieve
 
@@ -91,10 +504,13 @@ class TaskService:
         Raises:
             TaskNotFoundException: If no task with the given ID exists
         """
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        if self._is_loaded():
+            task = self._tasks_by_id.get(task_id)
+        else:
+            task = self.storage.read_task(task_id)
+        if task is None:
+            raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        return task
 
     def update_task(self, task_id: int, **kwargs) -> Task:
         """
@@ -110,34 +526,35 @@ class TaskService:
         Raises:
             TaskNotFoundException: If no task with the given ID exists
         """
-        task = self.get_task_by_id(task_id)
-        
-        if "title" in kwargs:
-            task.title = kwargs["title"]
-        if "description" in kwargs:
-            task.description = kwargs["description"]
-        if "priority" in kwargs:
-            task.priority = kwargs["priority"]
-        if "completed" in kwargs:
-            task.completed = kwargs["completed"]
-            
-        self._save_tasks()
+        task = self._append_unloaded(OP_UPDATE, lambda: self._set_fields(self.get_task_by_id(task_id), kwargs))
+        if task is not None:
+            return task
+        with self._mutation():
+            task = self._set_fields(self.get_task_by_id(task_id), kwargs)
+            if "title" in kwargs or "description" in kwargs:
+                if self._search_index is not None:
+                    self._search_index.update(task)
+                self._text_columns = None
+            if self._filter_index is not None and ("priority" in kwargs or "completed" in kwargs):
+                self._filter_index.update(task)
+            if self._sort_index is not None and "priority" in kwargs:
+                self._sort_index.update(task)
+
+            self._record(OP_UPDATE, task)
         return task
 
-    def complete_task(self, task_id: int) -> Task:
-        """
-        Mark a task as complete.
-
-        Args:
-            task_id: ID of the task to mark as complete
-
-        Returns:
-            The updated Task
-
-        Raises:
-            TaskNotFoundException: If no task with the given ID exists
-        """
-        return self.update_task(task_id, completed=True)
+    @staticmethod
+    def _set_fields(task: Task, changes: Dict[str, Any]) -> Task:
+        """Apply update_task keyword arguments to a task and return it."""
+        if "title" in changes:
+            task.title = changes["title"]
+        if "description" in changes:
+            task.description = changes["description"]
+        if "priority" in changes:
+            task.priority = changes["priority"]
+        if "completed" in changes:
+            task.completed = changes["completed"]
+        return task
 
     def delete_task(self, task_id: int) -> Task:
         """
@@ -152,9 +569,13 @@ class TaskService:
         Raises:
             TaskNotFoundException: If no task with the given ID exists
         """
-        task = self.get_task_by_id(task_id)
-        self.tasks.remove(task)
-        self._save_tasks()
+        task = self._append_unloaded(OP_DELETE, lambda: self.get_task_by_id(task_id))
+        if task is not None:
+            return task
+        with self._mutation():
+            task = self.get_task_by_id(task_id)
+            self._index_remove(task_id)
+            self._record(OP_DELETE, task)
         return task
 
     def search_tasks(self, keyword: str) -> List[Task]:
@@ -165,10 +586,69 @@ class TaskService:
             keyword: Keyword to search for in task titles and descriptions
 
         Returns:
-            List of matching Task objects
+            List of matching Task objects, most relevant first
+        """
+        if not self._is_loaded():
+            # One-off search on a lazy service: scan storage instead of
+            # loading it, across search_workers processes if it allows, and
+            # materialize only the hits. A task scores above zero exactly
+            # when a field contains the keyword, which is cheaper to test
+            keyword = keyword.lower()
+            hits = self.storage.iter_matching(
+                lambda title, description: keyword in title.lower() or keyword in description.lower(),
+                self.search_workers
+            )
+            scored = [
+                (-match_score(task.title.lower(), task.description.lower(), keyword), task.id, task)
+                for task in hits
+            ]
+            scored.sort(key=lambda entry: entry[:2])
+            return [task for _, _, task in scored]
+        return [self._tasks_by_id[task_id] for task_id in self._get_search_index().search(keyword)]
+
+    def search_query(self, query: str) -> List[Task]:
+        """
+        Search for tasks with the query language of the search_query module.
+
+        The query compiles once into a plan. A loaded service answers it from
+        its indexes; a lazy one streams storage, and a binary snapshot
+        materializes only the tasks passing the query's text conditions.
+
+        Args:
+            query: Words, "phrases", /regex/ and fuzzy word~ terms, field
+                prefixes such as title: or priority:, and AND, OR and NOT
+
+        Returns:
+            List of matching Task objects, most relevant first
+
+        Raises:
+            InvalidQueryException: If the query is malformed
         """
-        keyword = keyword.lower()
-        return [
-            task for task in self.tasks
-            if keyword in task.title.lower() or keyword in task.description.lower()
-        ]
+        plan = compile_query(query)
+        if not self._is_loaded():
+            if plan.prefilter is not None:
+                return plan.filter(self.storage.iter_matching(plan.prefilter, self.search_workers))
+            return plan.filter(self.storage.iter_tasks())
+        return plan.search(QueryContext(
+            self._tasks_by_id, self._get_search_index, self._get_filter_index,
+            self._get_sort_index, self._get_text_columns
+        ))
+
+
+def _report_task_count(service: TaskService) -> None:
+    """Update the task count gauge after a timed TaskService call."""
+    if service._is_loaded():
+        metrics.REGISTRY.set(metrics.TASKS, len(service._tasks_by_id))
+
+
+# Timed while metrics are enabled. batch() and iter_tasks() are left out, as
+# their work happens after they return
+metrics.instrument(
+    TaskService,
+    (
+        "add_task", "bulk_add", "query", "count_tasks", "get_task_by_id", "update_task",
+        "delete_task", "search_tasks", "search_query", "refresh", "reload", "compact", "close",
+        "defer_writes", "take_deferred_writes", "_load_tasks", "_save_tasks",
+    ),
+    after=_report_task_count
+)
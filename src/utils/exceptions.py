@@ -16,3 +16,13 @@ class TaskNotFoundException(TaskManagerException):
 class InvalidTaskDataException(TaskManagerException):
     """Exception raised when task data is invalid."""
     pass
+
+
+class StorageException(TaskManagerException):
+    """Exception raised when tasks cannot be loaded from or saved to storage."""
+    pass
+
+
+class InvalidQueryException(TaskManagerException):
+    """Exception raised when a search query cannot be parsed."""
+    pass
@@ -0,0 +1,96 @@
+"""
+Incremental parsing of large JSON arrays.
+"""
+
+import json
+from typing import Any, Iterator, TextIO
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+def iter_json_array(f: TextIO, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks and each element is decoded as soon as it is
+    complete, so memory use is bounded by the largest element rather than the
+    file, and callers can stop early without reading the rest.
+
+    Args:
+        f: Text file positioned at the start of a JSON array
+        chunk_size: Number of characters read per chunk
+
+    Yields:
+        Decoded array elements in order; none for empty or blank input
+
+    Raises:
+        json.JSONDecodeError: If the input is not a well-formed JSON array
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        """Drop consumed input and read the next chunk; False at end of file."""
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        """Skip whitespace and return the next character, or '' at end of input."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    first = next_char()
+    if first == "":
+        # An empty or blank file, as left by `touch`, holds no elements
+        return
+    if first != "[":
+        raise json.JSONDecodeError("Expecting '['", buf, pos)
+    pos += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        while True:
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # The element may just be cut off at the chunk boundary
+                if fill():
+                    continue
+                raise
+            if type(element) in (int, float):
+                # A number cut off at the chunk boundary decodes as a shorter
+                # number; only accept it once a non-numeric character follows
+                tail = end
+                while tail < len(buf) and buf[tail] in _NUMBER_CHARS:
+                    tail += 1
+                if tail == len(buf) and fill():
+                    continue
+            break
+        pos = end
+        yield element
+
+        separator = next_char()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos - 1)
@@ -0,0 +1,288 @@
+"""
+Opt-in metrics: counters, gauges and latency histograms.
+
+Metrics are off unless the TASK_MANAGER_METRICS environment variable is set
+to 1 or enable() is called. Methods registered with instrument() are only
+wrapped with timing code while metrics are on, so instrumented classes run
+their plain methods, at no cost, when they are off.
+
+Everything recorded lives in REGISTRY and can be dumped in the Prometheus
+text exposition format with REGISTRY.exposition().
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Metric names
+OPERATION_DURATION = "task_manager_operation_duration_seconds"
+OPERATION_ERRORS = "task_manager_operation_errors_total"
+BYTES_WRITTEN = "task_manager_bytes_written_total"
+TASKS = "task_manager_tasks"
+
+_HELP = {
+    OPERATION_DURATION: "Time spent in task service operations",
+    OPERATION_ERRORS: "Task service operations that raised an exception",
+    BYTES_WRITTEN: "Bytes written to the task store",
+    TASKS: "Tasks held in memory by the task service",
+}
+
+# Upper bounds of the latency buckets in seconds: 1 microsecond to about
+# 67 seconds, doubling, so quantiles are accurate to within a factor of two
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** i for i in range(27))
+
+# Quantiles reported for every histogram
+QUANTILES = (0.5, 0.99)
+
+# Label sets are stored as sorted (name, value) tuples
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Counts of observations per bucket, with their sum."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        # One count per bucket, and a last one for values past every bucket
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile, interpolating linearly within its bucket.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            The estimate, or 0.0 without observations
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                if index == len(LATENCY_BUCKETS):
+                    return lower
+                return lower + (LATENCY_BUCKETS[index] - lower) * (rank - seen) / count
+            seen += count
+        return LATENCY_BUCKETS[-1]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    """Return the stored form of a label set."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    """Format a label set for the exposition format."""
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the exposition format."""
+    if value == int(value) and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters, gauges and histograms, by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add to a counter."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge."""
+        key = _labels(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record an observation, in seconds, in a histogram."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def value(self, name: str, **labels: Any) -> Optional[float]:
+        """Return the value of a counter or gauge, or None if it was never set."""
+        key = _labels(labels)
+        with self._lock:
+            for metrics in (self._counters, self._gauges):
+                if key in metrics.get(name, {}):
+                    return metrics[name][key]
+        return None
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        """Return a histogram, or None if nothing was observed in it."""
+        with self._lock:
+            return self._histograms.get(name, {}).get(_labels(labels))
+
+    def reset(self) -> None:
+        """Forget everything recorded."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def exposition(self) -> str:
+        """
+        Dump every metric in the Prometheus text exposition format.
+
+        Histograms come with cumulative buckets, sum and count, and their
+        quantiles as a ``<name>_quantile`` gauge labelled by quantile.
+
+        Returns:
+            The exposition text, ending with a newline unless it is empty
+        """
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in _HELP:
+                lines.append(f"# HELP {name} {_HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for kind, metrics in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(metrics):
+                    header(name, kind)
+                    for labels, value in sorted(metrics[name].items()):
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name in sorted(self._histograms):
+                series = sorted(self._histograms[name].items())
+                header(name, "histogram")
+                for labels, histogram in series:
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, (('le', repr(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+                lines.append(f"# TYPE {name}_quantile gauge")
+                for labels, histogram in series:
+                    for q in QUANTILES:
+                        sample = _format_labels(labels, (("quantile", str(q)),))
+                        lines.append(f"{name}_quantile{sample} {_format_value(histogram.quantile(q))}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+REGISTRY = MetricsRegistry()
+
+_enabled = os.environ.get("TASK_MANAGER_METRICS") == "1"
+
+# Classes registered with instrument(): (class, original methods, after hook)
+_instrumented = []
+
+
+def enabled() -> bool:
+    """Return whether metrics are being recorded."""
+    return _enabled
+
+
+def _timed(operation: str, method: Callable, after: Optional[Callable[[Any], None]]) -> Callable:
+    """Wrap a method to record its duration, and its failures, under an operation name."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        except Exception:
+            REGISTRY.inc(OPERATION_ERRORS, operation=operation)
+            raise
+        finally:
+            REGISTRY.observe(OPERATION_DURATION, time.perf_counter() - start, operation=operation)
+            if after is not None:
+                after(self)
+    return wrapper
+
+
+def _wrap(cls: type, originals: Dict[str, Callable], after: Optional[Callable[[Any], None]]) -> None:
+    """Install the timing wrappers of an instrumented class."""
+    for name, method in originals.items():
+        setattr(cls, name, _timed(name.lstrip("_"), method, after))
+
+
+def instrument(cls: type, methods: Iterable[str], after: Optional[Callable[[Any], None]] = None) -> None:
+    """
+    Time methods of a class while metrics are enabled.
+
+    Each call is recorded in the OPERATION_DURATION histogram under the
+    method's name, without leading underscores, and calls that raise are
+    counted in OPERATION_ERRORS.
+
+    Args:
+        cls: Class whose methods to time
+        methods: Names of methods defined on the class itself
+        after: Called with the instance after every timed call, to update
+            gauges
+    """
+    originals = {name: cls.__dict__[name] for name in methods}
+    _instrumented.append((cls, originals, after))
+    if _enabled:
+        _wrap(cls, originals, after)
+
+
+def enable() -> None:
+    """Start recording metrics and timing instrumented methods."""
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        for cls, originals, after in _instrumented:
+            _wrap(cls, originals, after)
+
+
+def disable() -> None:
+    """Stop recording metrics and restore the plain instrumented methods."""
+    global _enabled
+    if _enabled:
+        _enabled = False
+        for cls, originals, _ in _instrumented:
+            for name, method in originals.items():
+                setattr(cls, name, method)
+
+
+def count_bytes_written(size: int, kind: str) -> None:
+    """
+    Count bytes written to the store, if metrics are enabled.
+
+    Args:
+        size: Number of bytes
+        kind: What was written, "snapshot" or "log"
+    """
+    if _enabled:
+        REGISTRY.inc(BYTES_WRITTEN, size, kind=kind)
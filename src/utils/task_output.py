@@ -0,0 +1,195 @@
+"""
+Buffered output of task listings for the command-line interface.
+
+Rows are formatted a chunk at a time and each chunk goes out in a single
+write, so long listings cost one call per chunk rather than per row, and
+memory stays bounded by the chunk size however many tasks are streamed.
+"""
+
+import io
+import itertools
+import json
+import re
+from typing import Iterable, Iterator, List, TextIO
+
+from src.localization.translations import Catalog
+from src.models.task import Task
+
+# Output formats: a localized table for people, and machine formats with
+# the raw field values for other tools
+OUTPUT_FORMATS = ("table", "tsv", "jsonl", "csv")
+
+# Fields of the machine formats, in column order
+FIELDS = ("id", "title", "description", "priority", "completed", "created_at")
+
+# Rows formatted per write
+CHUNK_ROWS = 4096
+
+# Width of the table's rules
+_RULE = "=" * 60
+
+# Escapes keeping one task per line in TSV
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_TSV_SPECIAL = re.compile(r"[\\\t\n\r]")
+
+
+def _tsv_field(text: str) -> str:
+    """Escape a TSV field, skipping the translation for the common field with nothing to escape."""
+    return text.translate(_TSV_ESCAPES) if _TSV_SPECIAL.search(text) else text
+
+
+def _chunks(tasks: Iterable[Task]) -> Iterator[List[Task]]:
+    """Split a stream of tasks into lists of at most CHUNK_ROWS tasks."""
+    iterator = iter(tasks)
+    while True:
+        chunk = list(itertools.islice(iterator, CHUNK_ROWS))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_table(tasks: Iterable[Task], out: TextIO, catalog: Catalog, created_at: bool = True) -> int:
+    """
+    Write tasks as an aligned table with localized headers and labels.
+
+    Args:
+        tasks: Tasks to write, consumed a chunk at a time
+        out: Stream to write to
+        catalog: Translations of the headers and labels
+        created_at: Whether to include the creation time column
+
+    Returns:
+        Number of tasks written
+    """
+    text = catalog.text
+    priority_label = catalog.priority_label
+    status_labels = catalog.status_labels
+    header = f"{text('id'):^5}|{text('title'):^20}|{text('priority'):^10}|{text('status'):^10}"
+    if created_at:
+        header += f"|{text('created_at'):^20}"
+    out.write(f"{_RULE}\n{header}\n{_RULE}\n")
+
+    count = 0
+    for chunk in _chunks(tasks):
+        if created_at:
+            rows = [
+                f"{task.id:^5}|{task.title[:18]:^20}|{priority_label(task.priority):^10}|"
+                f"{status_labels[task.completed]:^10}|{task.created_at:^20}\n"
+                for task in chunk
+            ]
+        else:
+            rows = [
+                f"{task.id:^5}|{task.title[:18]:^20}|{priority_label(task.priority):^10}|"
+                f"{status_labels[task.completed]:^10}\n"
+                for task in chunk
+            ]
+        out.write("".join(rows))
+        count += len(chunk)
+    out.write(f"{_RULE}\n\n")
+    return count
+
+
+def write_tsv(tasks: Iterable[Task], out: TextIO) -> int:
+    """
+    Write tasks as tab-separated values with a header line.
+
+    Backslashes, tabs and line breaks inside fields are escaped as \\\\, \\t,
+    \\n and \\r, so every task is one line.
+
+    Args:
+        tasks: Tasks to write, consumed a chunk at a time
+        out: Stream to write to
+
+    Returns:
+        Number of tasks written
+    """
+    out.write("\t".join(FIELDS) + "\n")
+    count = 0
+    for chunk in _chunks(tasks):
+        out.write("".join([
+            f"{task.id}\t{_tsv_field(task.title)}\t{_tsv_field(task.description)}\t"
+            f"{task.priority}\t{'true' if task.completed else 'false'}\t{task.created_at}\n"
+            for task in chunk
+        ]))
+        count += len(chunk)
+    return count
+
+
+def write_jsonl(tasks: Iterable[Task], out: TextIO) -> int:
+    """
+    Write tasks as JSON Lines, one to_dict() object per line.
+
+    Args:
+        tasks: Tasks to write, consumed a chunk at a time
+        out: Stream to write to
+
+    Returns:
+        Number of tasks written
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    count = 0
+    for chunk in _chunks(tasks):
+        out.write("".join([encode(task.to_dict()) + "\n" for task in chunk]))
+        count += len(chunk)
+    return count
+
+
+def write_csv(tasks: Iterable[Task], out: TextIO) -> int:
+    """
+    Write tasks as RFC 4180 comma-separated values with a header line.
+
+    Args:
+        tasks: Tasks to write, consumed a chunk at a time
+        out: Stream to write to
+
+    Returns:
+        Number of tasks written
+    """
+    # Imported here so the other formats never load the csv module
+    import csv
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(FIELDS)
+    count = 0
+    for chunk in _chunks(tasks):
+        writer.writerows([
+            (task.id, task.title, task.description, str(task.priority),
+             "true" if task.completed else "false", task.created_at)
+            for task in chunk
+        ])
+        out.write(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+        count += len(chunk)
+    out.write(buffer.getvalue())
+    return count
+
+
+def write_tasks(tasks: Iterable[Task], out: TextIO, output_format: str, catalog: Catalog, created_at: bool = True) -> int:
+    """
+    Write tasks in one of the OUTPUT_FORMATS.
+
+    Args:
+        tasks: Tasks to write, consumed a chunk at a time
+        out: Stream to write to
+        output_format: One of OUTPUT_FORMATS
+        catalog: Translations of the table's headers and labels
+        created_at: Whether the table includes the creation time column;
+            machine formats always include every field
+
+    Returns:
+        Number of tasks written
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if output_format == "table":
+        return write_table(tasks, out, catalog, created_at)
+    if output_format == "tsv":
+        return write_tsv(tasks, out)
+    if output_format == "jsonl":
+        return write_jsonl(tasks, out)
+    if output_format == "csv":
+        return write_csv(tasks, out)
+    raise ValueError(f"Unknown output format '{output_format}'; expected one of {', '.join(OUTPUT_FORMATS)}")
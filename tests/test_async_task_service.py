@@ -0,0 +1,171 @@
+"""
+Tests for the asyncio task service.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.async_task_service import AsyncTaskService
+from src.services.storage import create_storage
+from src.services.task_service import TaskService
+from src.utils.exceptions import StorageException, TaskNotFoundException
+
+
+class TestAsyncTaskService(unittest.TestCase):
+    """Test cases for the AsyncTaskService class."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_mutations_are_stored(self):
+        """Test that every async mutation reaches the store, on both backends."""
+        for backend in ("json", "log"):
+            with self.subTest(backend=backend):
+                storage_file = os.path.join(self.temp_dir.name, f"{backend}.json")
+
+                async def scenario():
+                    service = await AsyncTaskService.open(storage_file, storage=create_storage(storage_file, backend))
+                    first = await service.add_task("Write report", "Quarterly numbers", "high")
+                    await service.add_task("Call back")
+                    await service.complete_task(first.id)
+                    await service.update_task(2, priority="low")
+                    await service.add_task("Obsolete")
+                    await service.delete_task(3)
+                    with self.assertRaises(TaskNotFoundException):
+                        await service.delete_task(3)
+                    self.assertEqual([task.id for task in await service.search_tasks("REPORT")], [1])
+                    await service.close()
+                    return [task.to_dict() for task in await service.get_all_tasks()]
+
+                expected = asyncio.run(scenario())
+                reopened = TaskService(storage_file, storage=create_storage(storage_file, backend))
+                self.assertEqual([task.to_dict() for task in reopened.get_all_tasks()], expected)
+                self.assertTrue(reopened.get_task_by_id(1).completed)
+                reopened.close()
+
+    def test_concurrent_mutations_share_writes(self):
+        """Test that mutations made during a write go out together in the next one."""
+        async def scenario():
+            service = AsyncTaskService(TaskService(self.storage_file))
+            with patch.object(service.service.storage, "record_batch", wraps=service.service.storage.record_batch) as record_batch:
+                tasks = await asyncio.gather(*(service.add_task(f"Task {i}") for i in range(50)))
+            # The first add starts a write on its own, the rest queue behind it
+            self.assertLessEqual(record_batch.call_count, 2)
+            self.assertEqual(sum(len(call.args[0]) for call in record_batch.call_args_list), 50)
+            await service.close()
+            return tasks
+
+        tasks = asyncio.run(scenario())
+        self.assertEqual([task.id for task in tasks], list(range(1, 51)))
+        self.assertEqual(len(TaskService(self.storage_file).get_all_tasks()), 50)
+
+    def test_reads_do_not_wait_for_writes(self):
+        """Test that reads are answered while a write is still in progress."""
+        release = threading.Event()
+
+        async def scenario():
+            service = AsyncTaskService(TaskService(self.storage_file))
+            original = service.service.storage.record_batch
+
+            def slow_record_batch(records, tasks):
+                release.wait(5)
+                original(records, tasks)
+
+            with patch.object(service.service.storage, "record_batch", side_effect=slow_record_batch):
+                add = asyncio.ensure_future(service.add_task("Slow to store"))
+                await asyncio.sleep(0.01)
+                self.assertFalse(add.done())
+                self.assertEqual((await service.get_task_by_id(1)).title, "Slow to store")
+                self.assertEqual(len(await service.get_all_tasks()), 1)
+                release.set()
+                await add
+            await service.close()
+
+        asyncio.run(scenario())
+        self.assertEqual(TaskService(self.storage_file).get_task_by_id(1).title, "Slow to store")
+
+    def test_failed_write_rolls_back(self):
+        """Test that a failed write fails its mutations and restores the stored tasks."""
+        async def scenario():
+            service = AsyncTaskService(TaskService(self.storage_file))
+            await service.add_task("Kept")
+            with patch.object(service.service.storage, "record_batch", side_effect=StorageException("Disk full")):
+                results = await asyncio.gather(
+                    service.add_task("Lost"), service.complete_task(1), return_exceptions=True
+                )
+            self.assertTrue(all(isinstance(result, StorageException) for result in results))
+            self.assertEqual([(task.title, task.completed) for task in await service.get_all_tasks()], [("Kept", False)])
+
+            # Writing works again once the store recovers
+            await service.add_task("Added later")
+            await service.close()
+
+        asyncio.run(scenario())
+        self.assertEqual([task.title for task in TaskService(self.storage_file).get_all_tasks()], ["Kept", "Added later"])
+
+
+    def test_writes_hand_off_copies_and_snapshot_only_when_needed(self):
+        """Test that writes get copies of the tasks, and the full list only for a snapshot."""
+        for backend, snapshot in (("json", True), ("log", False)):
+            with self.subTest(backend=backend):
+                storage_file = os.path.join(self.temp_dir.name, f"{backend}.json")
+                calls = []
+
+                async def scenario():
+                    service = AsyncTaskService(TaskService(storage_file, storage=create_storage(storage_file, backend)))
+                    await service.add_task("First")
+                    original = service.service.storage.record_batch
+
+                    def record_batch(records, tasks):
+                        calls.append((records, list(tasks)))
+                        original(records, tasks)
+
+                    with patch.object(service.service.storage, "record_batch", side_effect=record_batch):
+                        task = await service.add_task("Second")
+                    await service.close()
+                    return task
+
+                task = asyncio.run(scenario())
+                (records, tasks), = calls
+                self.assertEqual([(op, written.to_dict()) for op, written in records], [("add", task.to_dict())])
+                self.assertIsNot(records[0][1], task)
+                self.assertEqual(len(tasks), 2 if snapshot else 0)
+
+    def test_failed_write_reloads_off_the_loop(self):
+        """Test that the reload after a failed write runs in an executor thread."""
+        load_threads = []
+
+        async def scenario():
+            service = AsyncTaskService(TaskService(self.storage_file))
+            original = service.service.storage.load
+
+            def load():
+                load_threads.append(threading.current_thread())
+                return original()
+
+            with patch.object(service.service.storage, "record_batch", side_effect=StorageException("Disk full")), \
+                    patch.object(service.service.storage, "load", side_effect=load):
+                with self.assertRaises(StorageException):
+                    await service.add_task("Lost")
+            self.assertEqual(await service.get_all_tasks(), [])
+            await service.close()
+
+        asyncio.run(scenario())
+        self.assertEqual(len(load_threads), 1)
+        self.assertIsNot(load_threads[0], threading.main_thread())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Tests for the binary snapshot format.
+"""
+
+import io
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.task import Task
+from src.services.binary_snapshot import (
+    HEADER, MAGIC, FORMAT_VERSION, MappedSnapshot, dump_snapshot, load_snapshot
+)
+from src.services.storage import JsonStorage, LogStorage, create_storage
+from src.services.task_service import TaskService
+from src.utils.exceptions import StorageException, TaskNotFoundException
+
+
+def _snapshot(tasks):
+    """Return the snapshot bytes of a list of tasks."""
+    buffer = io.BytesIO()
+    dump_snapshot(tasks, buffer)
+    return buffer.getvalue()
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """Test cases for dump_snapshot and load_snapshot."""
+
+    def test_round_trip_matches_to_dict(self):
+        """Test that every field survives a round trip, in id order."""
+        tasks = [
+            Task(3, "Ünïcode ✓", "Détails\nsur deux lignes", "high", True, "2024-02-29T23:59:59"),
+            Task(1, "Plain", "", "low", False, "2023-01-01T00:00:00"),
+            Task(2, "", "ascii only", "urgent", False, 1700000000),
+            Task(10, "Big id", "x" * 1000, "MEDIUM", True),
+            Task(4, "Odd date", "", "High", False, "11/04/2025"),
+        ]
+        restored = load_snapshot(_snapshot(tasks))
+        expected = sorted(tasks, key=lambda task: task.id)
+        self.assertEqual([task.to_dict() for task in restored], [task.to_dict() for task in expected])
+        self.assertEqual(load_snapshot(_snapshot([])), [])
+
+    def test_older_versions_load(self):
+        """Test that snapshots with u8 priority codes, and without created_at strings, still load."""
+        task = Task(1, "Title", "Description", "low", True, "2025-04-11 10:29:17")
+        data = _snapshot([task])
+        # The one task's priority code, narrowed from u32 to u8
+        codes = HEADER.size + 8 * 6 + 1
+        narrow = data[HEADER.size:codes + 1] + data[codes + 4:]
+        version_2 = HEADER.pack(MAGIC, 2, *HEADER.unpack_from(data)[2:]) + narrow
+        version_1 = HEADER.pack(MAGIC, 1, *HEADER.unpack_from(data)[2:]) + narrow[:-4]
+        for buffer in (version_2, version_1):
+            self.assertEqual([t.to_dict() for t in load_snapshot(buffer)], [task.to_dict()])
+
+    def test_many_distinct_priorities(self):
+        """Test that more priorities than fit in a byte round-trip."""
+        tasks = [Task(i, f"Task {i}", "", f"level {i}") for i in range(1, 302)]
+        restored = load_snapshot(_snapshot(tasks))
+        self.assertEqual([task.priority for task in restored], [f"level {i}" for i in range(1, 302)])
+
+    def test_invalid_snapshots_are_rejected(self):
+        """Test that bad magic, newer versions and truncation raise StorageException."""
+        data = _snapshot([Task(1, "Title", "Description")])
+        newer = HEADER.pack(MAGIC, FORMAT_VERSION + 1, 0, 1) + data[HEADER.size:]
+        bad_code = bytearray(data)
+        bad_code[HEADER.size + 8 * 6 + 1] = 7
+        for buffer in (b"", b"[]" + data, newer, data[:-1], data[:HEADER.size + 10], bytes(bad_code)):
+            with self.assertRaises(StorageException):
+                load_snapshot(buffer)
+
+    def test_header_is_little_endian(self):
+        """Test the header layout that other readers rely on."""
+        data = _snapshot([Task(1, "a"), Task(2, "b")])
+        self.assertEqual(data[:4], b"TSKS")
+        self.assertEqual(struct.unpack_from("<HHQ", data, 4), (FORMAT_VERSION, 0x3, 2))
+
+    def test_mapped_lookup_and_iteration(self):
+        """Test id lookups, chunked iteration and predicate scans."""
+        tasks = [Task(i * 2, f"Task {i}", "ünïcode" if i % 3 == 0 else "plain") for i in range(1, 11)]
+        snapshot = MappedSnapshot(_snapshot(tasks))
+        self.assertEqual(len(snapshot), 10)
+        self.assertEqual(snapshot.get(8).to_dict(), tasks[3].to_dict())
+        self.assertEqual(snapshot.row_of(20), 9)
+        for missing in (0, 7, 21):
+            self.assertIsNone(snapshot.get(missing))
+
+        with patch("src.services.binary_snapshot._CHUNK_ROWS", 3):
+            self.assertEqual([task.to_dict() for task in snapshot], [task.to_dict() for task in tasks])
+            with patch.object(Task, "restore", wraps=Task.restore) as restore:
+                hits = list(snapshot.matching(lambda title, description: "ü" in description))
+            self.assertEqual([task.id for task in hits], [6, 12, 18])
+            self.assertEqual(restore.call_count, 3)
+
+
+class TestBinaryStorage(unittest.TestCase):
+    """Test cases for storing tasks in binary snapshots."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.json_file = os.path.join(self.temp_dir.name, "tasks.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_extension_selects_binary_format(self):
+        """Test that a .tsb store is written in the binary format and reloads."""
+        storage_file = os.path.join(self.temp_dir.name, "tasks.tsb")
+        service = TaskService(storage_file)
+        service.add_task("First", "Détails", "high")
+        service.complete_task(service.add_task("Second").id)
+        with open(storage_file, "rb") as f:
+            self.assertEqual(f.read(4), MAGIC)
+        self.assertEqual(
+            [task.to_dict() for task in TaskService(storage_file).get_all_tasks()],
+            [task.to_dict() for task in service.get_all_tasks()]
+        )
+
+    def test_lazy_service_reads_without_loading(self):
+        """Test that lookups and searches on a lazy service leave the store unloaded."""
+        for backend in ("json", "log"):
+            with self.subTest(backend=backend):
+                storage_file = os.path.join(self.temp_dir.name, f"{backend}.tsb")
+                service = TaskService(storage_file, storage=create_storage(storage_file, backend))
+                service.bulk_add({"title": f"Task {i}", "description": "Note" if i % 2 else ""} for i in range(20))
+                service.update_task(4, title="Renamed note")
+                service.delete_task(5)
+                service.storage.close()
+
+                lazy = TaskService(storage_file, storage=create_storage(storage_file, backend), lazy=True)
+                self.assertEqual(lazy.get_task_by_id(4).title, "Renamed note")
+                self.assertEqual(lazy.get_task_by_id(7).to_dict(), service.get_task_by_id(7).to_dict())
+                with self.assertRaises(TaskNotFoundException):
+                    lazy.get_task_by_id(5)
+                self.assertEqual(
+                    [task.to_dict() for task in lazy.search_tasks("NOTE")],
+                    [task.to_dict() for task in service.search_tasks("NOTE")]
+                )
+                self.assertNotIn("_tasks_by_id", vars(lazy))
+
+                lazy.complete_task(7)
+                self.assertTrue(lazy.get_task_by_id(7).completed)
+                lazy.storage.close()
+
+    def test_config_migrates_json_store(self):
+        """Test that selecting the binary format migrates an existing store once."""
+        for backend, storage_class in (("json", JsonStorage), ("log", LogStorage)):
+            with self.subTest(backend=backend):
+                json_file = os.path.join(self.temp_dir.name, f"{backend}.json")
+                service = TaskService(json_file, storage=create_storage(json_file, backend))
+                service.add_task("Migrated")
+                service.storage.close()
+
+                with patch.dict(os.environ, {"TASK_MANAGER_SNAPSHOT": "binary"}):
+                    storage = create_storage(json_file, backend)
+                self.assertIsInstance(storage, storage_class)
+                self.assertTrue(storage.storage_file.endswith(".tsb"))
+                binary = TaskService(json_file, storage=storage)
+                binary.add_task("Added")
+                storage.close()
+
+                reopened = create_storage(json_file, backend, snapshot_format="binary")
+                self.assertEqual([task.title for task in reopened.load()], ["Migrated", "Added"])
+                reopened.close()
+
+        with self.assertRaises(StorageException):
+            create_storage(self.json_file, snapshot_format="pickle")
+
+
+if __name__ == "__main__":
+    unittest.main()
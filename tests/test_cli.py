@@ -2,6 +2,8 @@
 Tests for the CLI functionality.
 """
 
+import json
+import subprocess
 import unittest
 import sys
 import os
@@ -34,7 +36,7 @@ class TestCLI(unittest.TestCase):
         self.assertIn("view", output)
 
     @patch('sys.argv', ['cli.py', 'add', 'Test Task'])
-    @patch('src.cli.TaskService')
+    @patch('src.services.task_service.TaskService')
     @patch('sys.stdout', new_callable=StringIO)
     def test_add_command(self, mock_stdout, mock_task_service):
         """Test that the add command works correctly."""
@@ -55,7 +57,7 @@ class TestCLI(unittest.TestCase):
         self.assertIn("1", output)
 
     @patch('sys.argv', ['cli.py', 'list'])
-    @patch('src.cli.TaskService')
+    @patch('src.services.task_service.TaskService')
     @patch('sys.stdout', new_callable=StringIO)
     def test_list_command(self, mock_stdout, mock_task_service):
         """Test that the list command works correctly."""
@@ -75,21 +77,107 @@ class TestCLI(unittest.TestCase):
         mock_task2.created_at = "2023-01-02 12:00:00"
 
         mock_task_service_instance = mock_task_service.return_value
-        mock_task_service_instance.get_all_tasks.return_value = [mock_task1, mock_task2]
+        mock_task_service_instance.iter_tasks.return_value = iter([mock_task1, mock_task2])
 
         # Run command
         main()
 
         # Verify
-        mock_task_service_instance.get_all_tasks.assert_called_once_with(show_completed=False)
+        mock_task_service_instance.iter_tasks.assert_called_once_with(show_completed=False)
         output = mock_stdout.getvalue()
         self.assertIn("Task 1", output)
         self.assertIn("Task 2", output)
         self.assertIn("high", output.lower())
         self.assertIn("medium", output.lower())
 
+    @patch('sys.argv', ['cli.py', 'list', '-a', '--limit', '1'])
+    @patch('src.services.task_service.TaskService')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_list_command_limit(self, mock_stdout, mock_task_service):
+        """Test that the list command stops after the requested number of tasks."""
+        def stream():
+            for task_id in range(1, 4):
+                mock_task = MagicMock(spec=Task)
+                mock_task.id = task_id
+                mock_task.title = f"Task {task_id}"
+                mock_task.priority = "low"
+                mock_task.completed = False
+                mock_task.created_at = "2023-01-01 12:00:00"
+                yielded.append(task_id)
+                yield mock_task
+
+        yielded = []
+        mock_task_service.return_value.iter_tasks.return_value = stream()
+
+        # Run command
+        main()
+
+        # Verify
+        mock_task_service.return_value.iter_tasks.assert_called_once_with(show_completed=True)
+        output = mock_stdout.getvalue()
+        self.assertIn("Task 1", output)
+        self.assertNotIn("Task 2", output)
+        self.assertEqual(yielded, [1])
+
+    @patch('sys.argv', ['cli.py', 'list', '-n', '-1'])
+    @patch('src.services.task_service.TaskService')
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_list_command_rejects_negative_limit(self, mock_stderr, mock_task_service):
+        """Test that a negative limit is a usage error, not a failed listing."""
+        with self.assertRaises(SystemExit):
+            main()
+        self.assertIn("non-negative integer", mock_stderr.getvalue())
+        mock_task_service.assert_not_called()
+
+    def test_import_leaves_task_engine_unloaded(self):
+        """Test that importing the CLI does not import the task services or output writers."""
+        code = (
+            "import sys; import src.cli; "
+            "print(sorted(m for m in sys.modules if m.startswith('src.services') or m == 'src.utils.task_output'))"
+        )
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    @patch('sys.argv', ['cli.py', 'list', '--sort', 'created_at', '-r', '-n', '20'])
+    @patch('src.services.task_service.TaskService')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_list_command_sorted(self, mock_stdout, mock_task_service):
+        """Test that sorted listings are served by the indexed query."""
+        mock_task = MagicMock(spec=Task)
+        mock_task.id = 7
+        mock_task.title = "Newest"
+        mock_task.priority = "low"
+        mock_task.completed = False
+        mock_task.created_at = "2023-01-03 12:00:00"
+        mock_task_service.return_value.get_all_tasks.return_value = [mock_task]
+
+        # Run command
+        main()
+
+        # Verify
+        mock_task_service.return_value.get_all_tasks.assert_called_once_with(
+            show_completed=False, limit=20, sort_by="created_at", descending=True
+        )
+        mock_task_service.return_value.iter_tasks.assert_not_called()
+        self.assertIn("Newest", mock_stdout.getvalue())
+
+    @patch('sys.argv', ['cli.py', 'search', 'report', '--format', 'jsonl'])
+    @patch('src.services.task_service.TaskService')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_search_command_jsonl(self, mock_stdout, mock_task_service):
+        """Test that machine formats print only the records."""
+        task = Task(3, "Write report", "Quarterly", "high")
+        mock_task_service.return_value.search_query.return_value = [task]
+
+        # Run command
+        main()
+
+        # Verify
+        self.assertEqual(mock_stdout.getvalue().splitlines(), [json.dumps(task.to_dict())])
+
     @patch('sys.argv', ['cli.py', 'complete', '1'])
-    @patch('src.cli.TaskService')
+    @patch('src.services.task_service.TaskService')
     @patch('sys.stdout', new_callable=StringIO)
     def test_complete_command(self, mock_stdout, mock_task_service):
         """Test that the complete command works correctly."""
@@ -108,7 +196,7 @@ class TestCLI(unittest.TestCase):
         self.assertIn("1", output)
 
     @patch('sys.argv', ['cli.py', 'delete', '1'])
-    @patch('src.cli.TaskService')
+    @patch('src.services.task_service.TaskService')
     @patch('sys.stdout', new_callable=StringIO)
     def test_delete_command(self, mock_stdout, mock_task_service):
         """Test that the delete command works correctly."""
@@ -128,7 +216,7 @@ class TestCLI(unittest.TestCase):
         self.assertIn("Test Task", output)
 
     @patch('sys.argv', ['cli.py', 'search', 'test'])
-    @patch('src.cli.TaskService')
+    @patch('src.services.task_service.TaskService')
     @patch('sys.stdout', new_callable=StringIO)
     def test_search_command(self, mock_stdout, mock_task_service):
         """Test that the search command works correctly."""
@@ -139,19 +227,19 @@ class TestCLI(unittest.TestCase):
         mock_task.priority = "medium"
         mock_task.completed = False
         mock_task_service_instance = mock_task_service.return_value
-        mock_task_service_instance.search_tasks.return_value = [mock_task]
+        mock_task_service_instance.search_query.return_value = [mock_task]
 
         # Run command
         main()
 
         # Verify
-        mock_task_service_instance.search_tasks.assert_called_once_with("test")
+        mock_task_service_instance.search_query.assert_called_once_with("test")
         output = mock_stdout.getvalue()
         self.assertIn("Test Task", output)
         self.assertIn("1", output)
 
     @patch('sys.argv', ['cli.py', 'view', '1'])
-    @patch('src.cli.TaskService')
+    @patch('src.services.task_service.TaskService')
     @patch('sys.stdout', new_callable=StringIO)
     def test_view_command(self, mock_stdout, mock_task_service):
         """Test that the view command works correctly."""
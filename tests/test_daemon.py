@@ -0,0 +1,102 @@
+"""
+Tests for the task manager daemon and its client.
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.daemon import TaskServer, connect, socket_path_for
+from src.services.task_service import TaskService
+from src.utils.exceptions import TaskNotFoundException, StorageException
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets are not available")
+class TestDaemon(unittest.TestCase):
+    """Test cases for TaskServer and DaemonClient."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.json")
+        self.socket_path = socket_path_for(self.storage_file)
+        self.server = TaskServer(TaskService(self.storage_file), self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05})
+        self.thread.start()
+        self.client = connect(self.socket_path)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def test_client_mirrors_task_service(self):
+        """Test that calls through the daemon behave like calls on the service."""
+        task = self.client.add_task("Write report", "Quarterly numbers", "high")
+        self.client.add_task("Call back", "Ünïcode")
+        self.assertEqual(task.id, 1)
+        self.assertTrue(self.client.complete_task(1).completed)
+        self.assertEqual(self.client.update_task(2, priority="low").priority, "low")
+        self.assertEqual([t.id for t in self.client.get_all_tasks(show_completed=False)], [2])
+        self.assertEqual([t.id for t in self.client.iter_tasks()], [1, 2])
+        self.assertEqual([t.id for t in self.client.search_tasks("ünï")], [2])
+        self.assertEqual([t.id for t in self.client.search_query("priority:low OR /^write/")], [1, 2])
+        self.assertEqual(self.client.count_tasks(priority="high"), 1)
+        self.assertIsInstance(self.client.metrics(), str)
+
+        # Changes are saved by the daemon's service
+        stored = TaskService(self.storage_file).get_task_by_id(1)
+        self.assertEqual(stored.to_dict(), self.client.get_task_by_id(1).to_dict())
+
+    def test_errors_reach_the_client(self):
+        """Test that service errors are re-raised with their type."""
+        with self.assertRaises(TaskNotFoundException):
+            self.client.get_task_by_id(42)
+        with self.assertRaises(ValueError):
+            self.client.call("compact")
+        with self.assertRaises(ValueError):
+            self.client.get_all_tasks(sort_by="colour")
+        # The connection survives errors
+        self.assertEqual(self.client.add_task("Still here").id, 1)
+
+    def test_picks_up_changes_from_other_processes(self):
+        """Test that the daemon sees tasks written to the store directly."""
+        self.client.add_task("Through the daemon")
+        TaskService(self.storage_file).add_task("Written directly")
+        self.assertEqual([t.title for t in self.client.get_all_tasks()], ["Through the daemon", "Written directly"])
+
+    def test_idle_client_does_not_block_others(self):
+        """Test that a connection left open and idle does not hold up other clients."""
+        self.client.get_all_tasks()
+        other = connect(self.socket_path)
+        other._socket.settimeout(5)
+        try:
+            self.assertEqual(other.add_task("Not kept waiting").id, 1)
+        finally:
+            other.close()
+        self.assertEqual([t.title for t in self.client.get_all_tasks()], ["Not kept waiting"])
+
+    def test_one_daemon_per_socket(self):
+        """Test that a second daemon is refused and a stale socket is replaced."""
+        with self.assertRaises(StorageException):
+            TaskServer(TaskService(self.storage_file), self.socket_path)
+
+        stale_path = os.path.join(self.temp_dir.name, "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(stale_path)
+        stale.close()
+        self.assertIsNone(connect(stale_path))
+        server = TaskServer(TaskService(self.storage_file), stale_path)
+        server.server_close()
+        self.assertFalse(os.path.exists(stale_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Tests for the status and priority filter index.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.task import Task
+from src.services.filter_index import FilterIndex
+
+
+class TestFilterIndex(unittest.TestCase):
+    """Test cases for FilterIndex."""
+
+    def test_matches_scan_through_mutations(self):
+        """Test that queries agree with a full scan while tasks change."""
+        rng = random.Random(11)
+        priorities = ["low", "medium", "high", "Urgent"]
+        tasks = {
+            i: Task(i, f"Task {i}", priority=rng.choice(priorities), completed=rng.random() < 0.3)
+            for i in range(1, 200)
+        }
+        index = FilterIndex(tasks.values())
+
+        for task_id in rng.sample(sorted(tasks), 40):
+            task = tasks[task_id]
+            if rng.random() < 0.5:
+                del tasks[task_id]
+                index.remove(task_id)
+            else:
+                task.priority = rng.choice(priorities)
+                task.completed = not task.completed
+                index.update(task)
+
+        for completed in (None, True, False):
+            for priority in (None, "low", "HIGH", "urgent", "none"):
+                expected = [
+                    t.id for t in sorted(tasks.values(), key=lambda t: t.id)
+                    if (completed is None or t.completed == completed)
+                    and (priority is None or t.priority.lower() == priority.lower())
+                ]
+                self.assertEqual(index.query(completed, priority), expected, (completed, priority))
+                self.assertEqual(index.count(completed, priority), len(expected))
+
+    def test_query_does_not_expose_index_sets(self):
+        """Test that callers cannot corrupt the index through query results."""
+        index = FilterIndex([Task(1, "a", priority="low"), Task(2, "b", priority="low")])
+        index.query(priority="low").clear()
+        self.assertEqual(index.query(priority="low"), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
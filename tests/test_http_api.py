@@ -0,0 +1,133 @@
+"""
+Tests for the HTTP/JSON task API.
+"""
+
+import gzip
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.http_api import TaskAPIServer
+from src.services.task_service import TaskService
+
+
+class TestHTTPAPI(unittest.TestCase):
+    """Test cases for TaskAPIServer."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.json")
+        self.server = TaskAPIServer(TaskService(self.storage_file), ("127.0.0.1", 0))
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05})
+        self.thread.start()
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request on the kept-alive connection and return (response, decoded body)."""
+        data = None if body is None else json.dumps(body)
+        self.connection.request(method, path, body=data, headers=headers or {})
+        response = self.connection.getresponse()
+        raw = response.read()
+        if response.getheader("Content-Encoding") == "gzip":
+            raw = gzip.decompress(raw)
+        return response, json.loads(raw) if raw else None
+
+    def test_crud_over_one_connection(self):
+        """Test every endpoint, all over a single kept-alive connection."""
+        response, task = self.request("POST", "/tasks", {"title": "Write report", "priority": "HIGH"})
+        self.assertEqual(response.status, 201)
+        self.assertEqual(response.getheader("Location"), "/tasks/1")
+        self.assertEqual((task["id"], task["priority"]), (1, "high"))
+        self.request("POST", "/tasks", {"title": "Call back", "description": "Ünïcode"})
+
+        response, task = self.request("PATCH", "/tasks/2", {"priority": "low", "title": "Call back soon"})
+        self.assertEqual((task["title"], task["priority"]), ("Call back soon", "low"))
+        response, task = self.request("POST", "/tasks/1/complete")
+        self.assertTrue(task["completed"])
+        self.assertEqual(self.request("GET", "/tasks/2")[1]["description"], "Ünïcode")
+        self.assertEqual([t["id"] for t in self.request("GET", "/search?q=%C3%BCn%C3%AF")[1]["tasks"]], [2])
+        self.assertEqual([t["id"] for t in self.request("GET", "/search?query=status%3Acompleted")[1]["tasks"]], [1])
+
+        _, page = self.request("GET", "/tasks?completed=true")
+        self.assertEqual(([t["id"] for t in page["tasks"]], page["total"]), ([1], 1))
+        _, page = self.request("GET", "/tasks?order=desc&limit=1")
+        self.assertEqual(([t["id"] for t in page["tasks"]], page["total"], page["limit"]), ([2], 2, 1))
+        _, page = self.request("GET", "/tasks?sort=priority")
+        self.assertEqual([t["id"] for t in page["tasks"]], [1, 2])
+
+        response, task = self.request("DELETE", "/tasks/2")
+        self.assertEqual((response.status, task["id"]), (200, 2))
+        # The same socket served every request
+        self.assertEqual(len(self.server.service.get_all_tasks()), 1)
+        self.assertEqual([t.title for t in TaskService(self.storage_file).get_all_tasks()], ["Write report"])
+
+    def test_errors(self):
+        """Test that bad requests are answered with a status and an error body."""
+        cases = [
+            ("GET", "/tasks/42", None, 404),
+            ("GET", "/nowhere", None, 404),
+            ("PUT", "/tasks/1", {"title": "Replaced"}, 405),
+            ("DELETE", "/tasks", None, 405),
+            ("POST", "/tasks", {"description": "No title"}, 400),
+            ("POST", "/tasks", {"title": "Bad", "priority": "urgent"}, 400),
+            ("POST", "/tasks", ["not", "an", "object"], 400),
+            ("PATCH", "/tasks/1", {"id": 5}, 400),
+            ("GET", "/tasks?limit=0", None, 400),
+            ("GET", "/tasks?sort=colour", None, 400),
+            ("GET", "/search", None, 400),
+            ("GET", "/search?query=%28open", None, 400),
+        ]
+        self.request("POST", "/tasks", {"title": "Exists"})
+        for method, path, body, status in cases:
+            with self.subTest(method=method, path=path):
+                response, _ = self.request(method, path, body)
+                self.assertEqual(response.status, status)
+        _, result = self.request("GET", "/tasks/42")
+        self.assertEqual(result["error"]["type"], "TaskNotFoundException")
+
+    def test_etag_and_gzip(self):
+        """Test conditional GETs and compression of large listings."""
+        self.request("POST", "/tasks", {"title": "First"})
+        response, _ = self.request("GET", "/tasks/1")
+        etag = response.getheader("ETag")
+        self.assertIsNotNone(etag)
+        response, body = self.request("GET", "/tasks/1", headers={"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, None))
+
+        for i in range(50):
+            self.request("POST", "/tasks", {"title": f"Task {i}", "description": "A longer description"})
+        response, listing = self.request("GET", "/tasks", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(len(listing["tasks"]), 51)
+        response, plain = self.request("GET", "/tasks")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(plain, listing)
+
+        self.connection.request("GET", "/metrics")
+        response = self.connection.getresponse()
+        response.read()
+        self.assertEqual((response.status, response.getheader("Content-Type")[:10]), (200, "text/plain"))
+
+        # Changes to the task change its tag
+        self.request("PATCH", "/tasks/1", {"title": "Renamed"})
+        response, body = self.request("GET", "/tasks/1", headers={"If-None-Match": etag})
+        self.assertEqual((response.status, body["title"]), (200, "Renamed"))
+
+
+if __name__ == "__main__":
+    unittest.main()
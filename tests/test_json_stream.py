@@ -0,0 +1,44 @@
+"""
+Tests for the incremental JSON array parser.
+"""
+
+import io
+import json
+import os
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.json_stream import iter_json_array
+
+
+class TestJsonStream(unittest.TestCase):
+    """Test cases for iter_json_array."""
+
+    def test_matches_json_load_across_chunk_sizes(self):
+        """Test that elements split across chunk boundaries decode correctly."""
+        text = ' [ 1 , 2.5e3, "a]b", {"x": [1, 2]}, null, true, -0.5E-2, 123456789 ] '
+        for chunk_size in (1, 2, 3, 7, 1024):
+            self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size)), json.loads(text))
+        self.assertEqual(list(iter_json_array(io.StringIO("[]"))), [])
+        for text in ["", " \n "]:
+            self.assertEqual(list(iter_json_array(io.StringIO(text), 2)), [])
+
+    def test_malformed_input(self):
+        """Test that malformed arrays raise JSONDecodeError."""
+        for text in ["{}", " x", "[1 2]", "[1,", "[1,]"]:
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_json_array(io.StringIO(text), 2))
+
+    def test_early_exit(self):
+        """Test that consuming a prefix does not read the whole file."""
+        f = io.StringIO(json.dumps(list(range(100000))))
+        stream = iter_json_array(f, 64)
+        self.assertEqual([next(stream) for _ in range(3)], [0, 1, 2])
+        self.assertLess(f.tell(), 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,7 +9,7 @@ import unittest
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.localization.translations import get_text, load_translations, LANGUAGES
+from src.localization.translations import get_catalog, get_text, load_translations, LANGUAGES
 
 
 class TestLocalization(unittest.TestCase):
@@ -62,6 +62,26 @@ class TestLocalization(unittest.TestCase):
         self.assertIn("Test", task_added_it)
         self.assertIn("1", task_added_it)
 
+    def test_catalog(self):
+        """Test the label tables and templates of a language catalog."""
+        catalog = get_catalog("it")
+        self.assertIs(get_catalog("it"), catalog)
+        self.assertEqual(catalog.text("add_task"), get_text("add_task", "it"))
+        self.assertEqual(catalog.text("this_key_does_not_exist"), "this_key_does_not_exist")
+
+        self.assertEqual(catalog.priority_labels, {p: get_text(p, "it") for p in ("low", "medium", "high")})
+        self.assertEqual(catalog.priority_label("HIGH"), get_text("high", "it"))
+        self.assertEqual(catalog.priority_label("urgent"), "urgent")
+        self.assertEqual(catalog.priorities_by_label[get_text("low", "it")], "low")
+        self.assertEqual(catalog.status_labels[True], get_text("completed", "it"))
+        self.assertEqual(catalog.status_labels[False], get_text("active", "it"))
+
+        self.assertIs(catalog.template("task_added_success"), catalog.template("task_added_success"))
+        self.assertEqual(
+            catalog.format("task_added_success", title="Test", id=1),
+            get_text("task_added_success", "it").format(title="Test", id=1)
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
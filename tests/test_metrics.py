@@ -0,0 +1,127 @@
+"""
+Tests for the metrics registry and TaskService instrumentation.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.sqlite_task_service import SqliteTaskService
+from src.services.storage import create_storage
+from src.services.task_service import TaskService
+from src.utils import metrics
+from src.utils.exceptions import TaskNotFoundException
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the metrics module."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.json")
+        metrics.disable()
+        metrics.REGISTRY.reset()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.REGISTRY.reset()
+        self.temp_dir.cleanup()
+
+    def test_disabled_metrics_leave_methods_plain(self):
+        """Test that nothing is wrapped or recorded while metrics are off."""
+        self.assertFalse(hasattr(TaskService.add_task, "__wrapped__"))
+        service = TaskService(self.storage_file)
+        service.add_task("Untimed")
+        self.assertEqual(metrics.REGISTRY.exposition(), "")
+
+        metrics.enable()
+        self.assertTrue(hasattr(TaskService.add_task, "__wrapped__"))
+        metrics.disable()
+        self.assertFalse(hasattr(TaskService.add_task, "__wrapped__"))
+
+    def test_operations_are_recorded(self):
+        """Test durations, errors, bytes written and the task gauge of a service."""
+        metrics.enable()
+        for backend in ("json", "log"):
+            with self.subTest(backend=backend):
+                metrics.REGISTRY.reset()
+                storage_file = os.path.join(self.temp_dir.name, f"{backend}.json")
+                service = TaskService(storage_file, storage=create_storage(storage_file, backend))
+                service.add_task("First", "Détails")
+                service.add_task("Second")
+                service.complete_task(1)
+                with self.assertRaises(TaskNotFoundException):
+                    service.get_task_by_id(42)
+
+                registry = metrics.REGISTRY
+                self.assertEqual(registry.histogram(metrics.OPERATION_DURATION, operation="add_task").count, 2)
+                self.assertEqual(registry.histogram(metrics.OPERATION_DURATION, operation="load_tasks").count, 1)
+                # complete_task goes through update_task, and both are timed
+                self.assertEqual(registry.histogram(metrics.OPERATION_DURATION, operation="update_task").count, 1)
+                self.assertEqual(registry.value(metrics.OPERATION_ERRORS, operation="get_task_by_id"), 1)
+                self.assertEqual(registry.value(metrics.TASKS), 2)
+                kind = "snapshot" if backend == "json" else "log"
+                self.assertGreater(registry.value(metrics.BYTES_WRITTEN, kind=kind), 0)
+                service.close()
+
+    def test_sqlite_operations_are_recorded(self):
+        """Test that SqliteTaskService's own methods are timed too."""
+        self.assertFalse(hasattr(SqliteTaskService.add_task, "__wrapped__"))
+        metrics.enable()
+        service = SqliteTaskService(os.path.join(self.temp_dir.name, "tasks.db"))
+        service.add_task("First")
+        service.bulk_add([{"title": "Second"}, {"title": "Third"}])
+        service.complete_task(1)
+        service.search_query("first")
+        with self.assertRaises(TaskNotFoundException):
+            service.get_task_by_id(42)
+        service.close()
+
+        registry = metrics.REGISTRY
+        for operation in ("add_task", "bulk_add", "search_query", "close"):
+            self.assertEqual(registry.histogram(metrics.OPERATION_DURATION, operation=operation).count, 1)
+        # complete_task is inherited and goes through the overridden update_task
+        self.assertEqual(registry.histogram(metrics.OPERATION_DURATION, operation="complete_task").count, 1)
+        self.assertEqual(registry.histogram(metrics.OPERATION_DURATION, operation="update_task").count, 1)
+        self.assertEqual(registry.value(metrics.OPERATION_ERRORS, operation="get_task_by_id"), 1)
+
+    def test_histogram_quantiles(self):
+        """Test that quantiles land in the bucket holding the true value."""
+        registry = metrics.MetricsRegistry()
+        for i in range(1, 1001):
+            registry.observe("latency", i / 1000000, operation="lookup")
+        histogram = registry.histogram("latency", operation="lookup")
+        self.assertEqual(histogram.count, 1000)
+        # True values are 500 and 990 microseconds; buckets double in width
+        self.assertTrue(256e-6 <= histogram.quantile(0.5) <= 512e-6)
+        self.assertTrue(512e-6 <= histogram.quantile(0.99) <= 1024e-6)
+        self.assertEqual(metrics.Histogram().quantile(0.5), 0.0)
+
+    def test_prometheus_exposition(self):
+        """Test the text exposition of every metric type."""
+        registry = metrics.MetricsRegistry()
+        registry.inc(metrics.BYTES_WRITTEN, 10, kind="log")
+        registry.inc(metrics.BYTES_WRITTEN, 5, kind="log")
+        registry.set(metrics.TASKS, 3)
+        registry.observe(metrics.OPERATION_DURATION, 0.003, operation='say "hi"')
+        lines = registry.exposition().splitlines()
+
+        self.assertIn("# TYPE task_manager_bytes_written_total counter", lines)
+        self.assertIn('task_manager_bytes_written_total{kind="log"} 15', lines)
+        self.assertIn("task_manager_tasks 3", lines)
+        self.assertIn("# TYPE task_manager_operation_duration_seconds histogram", lines)
+        buckets = [line for line in lines if line.startswith("task_manager_operation_duration_seconds_bucket")]
+        counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+        self.assertEqual(counts, sorted(counts))
+        self.assertTrue(buckets[-1].startswith('task_manager_operation_duration_seconds_bucket{operation="say \\"hi\\"",le="+Inf"}'))
+        self.assertEqual(counts[-1], 1)
+        self.assertIn('task_manager_operation_duration_seconds_count{operation="say \\"hi\\""} 1', lines)
+        self.assertTrue(any('quantile="0.99"' in line for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for the inverted search index.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.task import Task
+from src.services.search_index import SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test cases for SearchIndex."""
+
+    def test_matches_substring_scan(self):
+        """Test that the index finds exactly the tasks a substring scan finds."""
+        rng = random.Random(7)
+        words = ["alpha", "beta", "Gamma", "delta", "report", "deploy", "review", "Città"]
+        tasks = [
+            Task(i, " ".join(rng.choices(words, k=3)), " ".join(rng.choices(words, k=5)))
+            for i in range(1, 300)
+        ]
+        index = SearchIndex(tasks)
+
+        for keyword in ["a", "ta", "gam", "GAMMA", "eport", "view del", "città", "zzz", ""]:
+            expected = {
+                t.id for t in tasks
+                if keyword.lower() in t.title.lower() or keyword.lower() in t.description.lower()
+            }
+            self.assertEqual(set(index.search(keyword)), expected, keyword)
+
+    def test_ranking_prefers_title_and_whole_words(self):
+        """Test that title and whole-word matches rank above weaker matches."""
+        index = SearchIndex([
+            Task(1, "Misc", "a deployment checklist"),
+            Task(2, "Deploy backend", ""),
+            Task(3, "Redeploy", ""),
+            Task(4, "Notes", "deploy on friday"),
+        ])
+        self.assertEqual(index.search("deploy"), [2, 4, 1, 3])
+
+    def test_incremental_updates(self):
+        """Test that add, update and remove keep the postings consistent."""
+        task = Task(1, "Water plants")
+        index = SearchIndex([task])
+        index.add(Task(2, "Plant trees"))
+
+        task.title = "Feed cat"
+        index.update(task)
+        self.assertEqual(index.search("plant"), [2])
+        self.assertEqual(index.search("cat"), [1])
+
+        index.remove(2)
+        self.assertEqual(index.search("plant"), [])
+        self.assertEqual(index.search(""), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
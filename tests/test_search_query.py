@@ -0,0 +1,199 @@
+"""
+Tests for the search query language.
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.task import Task
+from src.services.search_query import TITLE, DESCRIPTION, TextColumns, column_safe, compile_query
+from src.services.sqlite_task_service import SqliteTaskService, migrate_json_to_sqlite
+from src.services.task_service import TaskService
+from src.utils.exceptions import InvalidQueryException
+
+WORDS = ["report", "Reports", "deploy", "review", "budget", "Città", "notes", "weekly", "call"]
+
+
+def make_tasks(count, seed=11):
+    """Build tasks with random text, priorities, statuses and creation days."""
+    generator = random.Random(seed)
+    return [
+        Task(
+            task_id,
+            " ".join(generator.choices(WORDS, k=generator.randint(1, 3))),
+            " ".join(generator.choices(WORDS, k=generator.randint(0, 5))),
+            generator.choice(["low", "medium", "high"]),
+            generator.random() < 0.3,
+            f"2025-01-{generator.randint(1, 28):02d} {generator.randint(0, 23):02d}:00:00"
+        )
+        for task_id in range(1, count + 1)
+    ]
+
+
+class TestSearchQuery(unittest.TestCase):
+    """Test cases for compile_query and TaskService.search_query."""
+
+    QUERIES = [
+        "report",
+        "REPORT deploy",
+        '"weekly report"',
+        "title:report -desc:notes",
+        "priority:high OR status:completed",
+        "NOT (report OR budget) created:>=2025-01-15",
+        "created:2025-01-03",
+        "created:<2025-01-10 priority:low",
+        "/rep(ort)?s?\\b/",
+        "title:/^rev/",
+        "/ITT/",
+        "reprot~",
+        "title:budgt~1 OR call",
+        "citta~1",
+        "",
+    ]
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.json")
+        self.tasks = make_tasks(400)
+        TaskService(self.storage_file, lazy=True).storage.save(self.tasks)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_parse_errors(self):
+        """Test that malformed queries raise InvalidQueryException."""
+        for query in ['"open', "/open", "/[a/", "(a", "a)", "a OR", "NOT", "status:later",
+                      "created:yesterday", "priority:/hi/", "re-port~", "word~3"]:
+            with self.subTest(query=query):
+                with self.assertRaises(InvalidQueryException):
+                    compile_query(query)
+
+    def test_terms_match_their_definition(self):
+        """Test each kind of term against a plain check of every task."""
+        def text(task):
+            return f"{task.title} {task.description}".lower()
+
+        expected = {
+            "report": {t.id for t in self.tasks if "report" in text(t)},
+            "title:review": {t.id for t in self.tasks if "review" in t.title.lower()},
+            "-desc:notes": {t.id for t in self.tasks if "notes" not in t.description.lower()},
+            "priority:high status:active": {t.id for t in self.tasks if t.priority == "high" and not t.completed},
+            "budget OR call": {t.id for t in self.tasks if "budget" in text(t) or "call" in text(t)},
+            "created:2025-01-03": {t.id for t in self.tasks if t.created_at.startswith("2025-01-03")},
+            "created:>2025-01-20": {t.id for t in self.tasks if t.created_at >= "2025-01-21"},
+            "/^rev/": {
+                t.id for t in self.tasks
+                if re.search("^rev", t.title.lower()) or re.search("^rev", t.description.lower())
+            },
+            "title:revew~1": {t.id for t in self.tasks if "review" in t.title.lower()},
+        }
+        service = TaskService(self.storage_file, lazy=False)
+        for query, ids in expected.items():
+            with self.subTest(query=query):
+                self.assertEqual({task.id for task in service.search_query(query)}, ids)
+
+    def test_operator_precedence(self):
+        """Test that NOT binds tighter than AND, which binds tighter than OR."""
+        service = TaskService(self.storage_file, lazy=False)
+        ids = lambda query: [task.id for task in service.search_query(query)]
+        self.assertEqual(ids("call OR report budget"), ids("call OR (report AND budget)"))
+        self.assertEqual(ids("NOT call report"), ids("(NOT call) report"))
+        self.assertNotEqual(ids("call OR report budget"), ids("(call OR report) budget"))
+
+    def test_backends_agree(self):
+        """Test that indexed, lazy and SQLite searches return the same tasks in the same order."""
+        db_file = os.path.join(self.temp_dir.name, "tasks.db")
+        migrate_json_to_sqlite(self.storage_file, db_file)
+        loaded = TaskService(self.storage_file, lazy=False)
+        lazy = TaskService(self.storage_file, lazy=True)
+        sqlite = SqliteTaskService(db_file)
+        try:
+            for query in self.QUERIES:
+                with self.subTest(query=query):
+                    expected = [task.id for task in lazy.search_query(query)]
+                    self.assertEqual([task.id for task in loaded.search_query(query)], expected)
+                    self.assertEqual([task.id for task in sqlite.search_query(query)], expected)
+        finally:
+            sqlite.close()
+
+    def test_column_scan_matches_per_task_search(self):
+        """Test that a regex over a joined column finds what a search of each task finds."""
+        columns = TextColumns(self.tasks)
+        for pattern in ["rep", "s\\b", "o\\w*e", "t\\w", "[à-ü]", "e?", "notes report", "re(port|view)s?"]:
+            self.assertTrue(column_safe(pattern), pattern)
+            compiled = re.compile(pattern)
+            for field, attribute in ((TITLE, "title"), (DESCRIPTION, "description")):
+                with self.subTest(pattern=pattern, field=attribute):
+                    expected = {t.id for t in self.tasks if compiled.search(getattr(t, attribute).lower())}
+                    self.assertEqual(columns.search(field, compiled), expected)
+
+    def test_column_scan_of_text_containing_the_separator(self):
+        """Test that NUL characters inside task text do not shift or join matches."""
+        tasks = [
+            Task(1, "re\x00port", "\x00"),
+            Task(2, "port\x00", "rep\x00\x00ort"),
+            Task(3, "report", ""),
+            Task(4, "\x00re", "port"),
+        ]
+        columns = TextColumns(tasks)
+        for pattern in ["report", "re", "port\\b", "\\bport", "\\w+", "e?", "[a-z]{3}"]:
+            compiled = re.compile(pattern)
+            for field, attribute in ((TITLE, "title"), (DESCRIPTION, "description")):
+                with self.subTest(pattern=pattern, field=attribute):
+                    expected = {t.id for t in tasks if compiled.search(getattr(t, attribute).lower())}
+                    self.assertEqual(columns.search(field, compiled), expected)
+
+    def test_patterns_that_can_cross_tasks_are_not_column_safe(self):
+        """Test that anchors, lookarounds and anything matching the separator run per task."""
+        for pattern in ["o.*e", "[^a-z ]", "\\W+", "a\\Sb", "\\x00", "^rev", "ew$", "\\Arev", "(?<=re)port", "r(?!e)"]:
+            with self.subTest(pattern=pattern):
+                self.assertFalse(column_safe(pattern))
+        self.assertTrue(column_safe("\\.\\$\\^"))
+
+    def test_regex_search_scales_like_a_scan(self):
+        """Test that an indexed regex search costs about as much as testing each task."""
+        tasks = [Task(i, f"foo task {i}", "some notes without the other word") for i in range(1, 5001)]
+        service = TaskService(os.path.join(self.temp_dir.name, "many.json"), lazy=True)
+        service.storage.save(tasks)
+        service = TaskService(service.storage_file, lazy=False)
+
+        def best(run):
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        for query in ("/foo.*bar/", "/foo\\w*bar/", "/o[a-z ]+z/"):
+            plan = compile_query(query)
+            service.search_query(query)
+            with self.subTest(query=query):
+                scan = best(lambda: plan.filter(tasks))
+                indexed = best(lambda: service.search_query(query))
+                self.assertLess(indexed, 3 * scan + 0.02)
+
+    def test_indexes_follow_updates(self):
+        """Test that searches see tasks added, updated and deleted after indexes are built."""
+        service = TaskService(self.storage_file, lazy=False)
+        self.assertEqual(service.search_query("/zeppelin/"), [])
+        added = service.add_task("Zeppelin flight", priority="high")
+        service.update_task(1, description="zeppelin notes")
+        service.delete_task(2)
+        self.assertEqual([task.id for task in service.search_query("/zeppelin/")], [added.id, 1])
+        self.assertEqual([task.id for task in service.search_query("title:zepelin~ priority:high")], [added.id])
+        service.update_task(added.id, title="Airship")
+        self.assertEqual([task.id for task in service.search_query("title:/zeppelin/")], [])
+        self.assertNotIn(2, [task.id for task in service.search_query("")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for keyword scans sharded across worker processes.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.task import Task
+from src.services import sharded_search
+from src.services.binary_snapshot import open_snapshot
+from src.services.storage import create_storage
+from src.services.task_service import TaskService
+
+WORDS = ["report", "call", "Zeppelin", "review", "ünïcode", "budget", "deploy", "notes"]
+
+
+class TestShardedSearch(unittest.TestCase):
+    """Test cases for sharded_search and the searches built on it."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.tsb")
+        generator = random.Random(7)
+        self.tasks = [
+            Task(
+                task_id,
+                " ".join(generator.choices(WORDS, k=generator.randint(1, 4))),
+                " ".join(generator.choices(WORDS, k=generator.randint(0, 6)))
+            )
+            for task_id in range(1, 3001)
+        ]
+        # Shards of a few hundred rows, spread over several decode chunks
+        patcher = patch.object(sharded_search, "MIN_SHARD_ROWS", 500)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def service(self, workers, backend="json"):
+        """Open a lazy service over the store with a given worker count."""
+        storage = create_storage(self.storage_file, backend, durability="none")
+        return TaskService(self.storage_file, storage=storage, lazy=True, search_workers=workers)
+
+    def test_sharded_results_match_serial_scan(self):
+        """Test that every worker count finds the same tasks in the same order."""
+        self.service(1).storage.save(self.tasks)
+        for keyword in ("report", "ZEPP", "ünï", "t", "nothing like it", " "):
+            serial = [task.to_dict() for task in self.service(1).search_tasks(keyword)]
+            for workers in (2, 4, 16):
+                with self.subTest(keyword=keyword, workers=workers), \
+                        patch.object(sharded_search, "_fork_context", wraps=sharded_search._fork_context) as fork:
+                    sharded = [task.to_dict() for task in self.service(workers).search_tasks(keyword)]
+                    self.assertEqual(sharded, serial)
+                    fork.assert_called_once()
+        self.assertIsNone(sharded_search._worker_scan)
+
+    def test_threaded_processes_scan_serially(self):
+        """Test that no worker is forked while another thread runs, yet results are the same."""
+        self.service(1).storage.save(self.tasks)
+        serial = [task.id for task in self.service(1).search_tasks("report")]
+        results = []
+        with patch.object(sharded_search, "_fork_context") as fork_context:
+            worker = threading.Thread(target=lambda: results.append(self.service(4).search_tasks("report")))
+            worker.start()
+            worker.join()
+        fork_context.assert_not_called()
+        self.assertEqual([task.id for task in results[0]], serial)
+
+    def test_log_changes_apply_over_shards(self):
+        """Test that a mutation log's changes override the sharded snapshot's rows."""
+        writer = self.service(1, backend="log")
+        writer.storage.compact_threshold = 10 ** 6
+        writer.storage.save(self.tasks)
+        writer.update_task(5, title="Zeppelin sighting")
+        writer.delete_task(7)
+        writer.add_task("Another zeppelin")
+        writer.close()
+
+        serial = [task.id for task in self.service(1, backend="log").search_tasks("zeppelin")]
+        sharded = [task.id for task in self.service(4, backend="log").search_tasks("zeppelin")]
+        self.assertEqual(sharded, serial)
+        self.assertIn(5, sharded)
+        self.assertIn(3001, sharded)
+        self.assertNotIn(7, sharded)
+
+    def test_rows_and_materialization(self):
+        """Test matching_rows and tasks_at against a full decode."""
+        self.service(1).storage.save(self.tasks)
+        with open(self.storage_file, "rb") as f, open_snapshot(f) as snapshot:
+            rows = snapshot.matching_rows(lambda title, description: "budget" in title, 1000, 2500)
+            self.assertTrue(rows)
+            self.assertTrue(all(1000 <= row < 2500 for row in rows))
+            self.assertEqual(
+                [task.to_dict() for task in snapshot.tasks_at(rows)],
+                [self.tasks[row].to_dict() for row in rows]
+            )
+            self.assertEqual(snapshot.tasks_at([]), [])
+            matches = sharded_search.matching_tasks(snapshot, lambda title, description: "deploy" in description, 3)
+            self.assertEqual([task.id for task in matches],
+                             [task.id for task in self.tasks if "deploy" in task.description])
+
+    def test_configured_workers(self):
+        """Test the TASK_MANAGER_SEARCH_WORKERS environment variable."""
+        for value, expected in (("4", 4), ("0", os.cpu_count() or 1), ("-3", 1), ("many", 1)):
+            with self.subTest(value=value), patch.dict(os.environ, {"TASK_MANAGER_SEARCH_WORKERS": value}):
+                self.assertEqual(sharded_search.configured_workers(), expected)
+        with patch.dict(os.environ, {"TASK_MANAGER_SEARCH_WORKERS": "3"}):
+            self.assertEqual(TaskService(self.storage_file).search_workers, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for the creation time and priority sort index.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.task import Task
+from src.services.sort_index import SortIndex
+
+_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+class TestSortIndex(unittest.TestCase):
+    """Test cases for SortIndex."""
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.tasks = {
+            i: Task(i, f"Task {i}", priority=rng.choice(["low", "medium", "high", "someday"]),
+                    created_at=rng.randrange(1000))
+            for i in range(1, 300)
+        }
+        self.index = SortIndex(self.tasks.values())
+        for task_id in rng.sample(sorted(self.tasks), 60):
+            if rng.random() < 0.5:
+                del self.tasks[task_id]
+                self.index.remove(task_id)
+            else:
+                self.tasks[task_id].priority = rng.choice(["low", "high"])
+                self.index.update(self.tasks[task_id])
+        for task_id in range(300, 320):
+            self.tasks[task_id] = Task(task_id, "Late", created_at=rng.randrange(1000))
+            self.index.add(self.tasks[task_id])
+
+    def _expected(self, field, descending, among):
+        if field == "created_at":
+            key = lambda t: (t.created_ts, t.id)
+        else:
+            key = lambda t: (_RANK.get(t.priority, 3), t.id)
+        tasks = [t for t in self.tasks.values() if among is None or t.id in among]
+        return [t.id for t in sorted(tasks, key=key, reverse=descending)]
+
+    def test_select_matches_full_sort(self):
+        """Test every slice against a full sort, with and without a filter."""
+        rare = {task_id for task_id in self.tasks if task_id % 37 == 0}
+        common = {task_id for task_id in self.tasks if task_id % 3}
+        for field in ("created_at", "priority"):
+            for descending in (False, True):
+                for among in (None, rare, common):
+                    expected = self._expected(field, descending, among)
+                    for offset, limit in ((0, None), (0, 10), (5, 20), (len(expected) - 3, 10), (1000, 5)):
+                        stop = None if limit is None else offset + limit
+                        self.assertEqual(
+                            self.index.select(field, descending, among, offset, limit),
+                            expected[offset:stop],
+                            (field, descending, offset, limit)
+                        )
+
+
+if __name__ == "__main__":
+    unittest.main()
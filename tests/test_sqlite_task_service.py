@@ -0,0 +1,154 @@
+"""
+Tests for the SQLite-backed task service.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.async_task_service import AsyncTaskService
+from src.services.base_task_service import BaseTaskService
+from src.services.task_service import TaskService
+from src.services.sqlite_task_service import SqliteTaskService, migrate_json_to_sqlite, open_sqlite_store
+from src.utils.exceptions import TaskNotFoundException, StorageException
+
+
+def _add_tasks_in_process(db_file, worker, count):
+    """Add tasks from a separate process through its own connection."""
+    service = SqliteTaskService(db_file)
+    for i in range(count):
+        service.add_task(f"Worker {worker} task {i}")
+    service.bulk_add([{"title": f"Worker {worker} bulk {i}"} for i in range(count)])
+    service.close()
+
+
+class TestSqliteTaskService(unittest.TestCase):
+    """Test cases for SqliteTaskService."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.temp_dir.name, "tasks.db")
+        self.service = SqliteTaskService(self.db_file)
+
+    def tearDown(self):
+        self.service.close()
+        self.temp_dir.cleanup()
+
+    def test_crud_round_trip(self):
+        """Test adding, updating, completing and deleting tasks."""
+        task = self.service.add_task("Ship it", "Before Friday", "high")
+        self.assertEqual(task.id, 1)
+
+        self.service.update_task(task.id, title="Ship it now")
+        self.service.complete_task(task.id)
+        stored = self.service.get_task_by_id(task.id)
+        self.assertEqual(stored.title, "Ship it now")
+        self.assertTrue(stored.completed)
+        self.assertEqual(stored.created_at, task.created_at)
+
+        self.service.delete_task(task.id)
+        with self.assertRaises(TaskNotFoundException):
+            self.service.get_task_by_id(task.id)
+
+    def test_batch_is_one_transaction(self):
+        """Test that a failing batch leaves the database untouched."""
+        self.service.add_task("Existing")
+        with self.assertRaises(TaskNotFoundException):
+            with self.service.batch():
+                self.service.add_task("Rolled back")
+                self.service.complete_task(1)
+                self.service.delete_task(99)
+        self.assertEqual([t.title for t in self.service.get_all_tasks(show_completed=False)], ["Existing"])
+
+        added = self.service.bulk_add([{"title": f"Bulk {i}"} for i in range(3)])
+        self.assertEqual([t.id for t in added], [2, 3, 4])
+        self.service.bulk_delete([2, 4])
+        self.assertEqual([t.id for t in self.service.get_all_tasks()], [1, 3])
+
+    def test_shared_interface(self):
+        """Test that the service implements BaseTaskService, and is not a TaskService."""
+        self.assertIsInstance(self.service, BaseTaskService)
+        self.assertNotIsInstance(self.service, TaskService)
+        self.service.add_task("One")
+        self.service.add_task("Two")
+        self.assertEqual([t.id for t in self.service.bulk_update([1, 2], completed=True)], [1, 2])
+        self.assertEqual(self.service.count_tasks(show_completed=False), 0)
+        self.assertEqual([t.id for t in self.service.bulk_delete([2])], [2])
+        self.assertEqual([t.title for t in self.service.get_all_tasks()], ["One"])
+        with self.assertRaises(TypeError):
+            AsyncTaskService(self.service)
+
+    def test_parallel_processes_get_distinct_ids(self):
+        """Test that adds from several processes never pick the same id."""
+        workers = [
+            multiprocessing.Process(target=_add_tasks_in_process, args=(self.db_file, worker, 25))
+            for worker in range(4)
+        ]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        self.assertEqual([t.id for t in self.service.iter_tasks()], list(range(1, 201)))
+
+    def test_filters_match_in_memory_service(self):
+        """Test that filters, pagination and search match TaskService."""
+        memory = TaskService(os.path.join(self.temp_dir.name, "tasks.json"))
+        for service in (memory, self.service):
+            for i, priority in enumerate(["low", "High", "medium", "high", "LOW"]):
+                service.add_task(f"Task {i}", f"Détails {i}", priority)
+            service.complete_task(2)
+            service.complete_task(4)
+
+        def ids(tasks):
+            return [task.id for task in tasks]
+
+        for show_completed in (True, False):
+            for priority in (None, "low", "HIGH"):
+                self.assertEqual(
+                    ids(self.service.get_all_tasks(show_completed, priority)),
+                    ids(memory.get_all_tasks(show_completed, priority))
+                )
+                self.assertEqual(
+                    self.service.count_tasks(show_completed, priority),
+                    memory.count_tasks(show_completed, priority)
+                )
+                for offset, limit in ((0, 2), (1, 2), (2, None), (4, 10)):
+                    self.assertEqual(
+                        ids(self.service.get_all_tasks(show_completed, priority, offset, limit)),
+                        ids(memory.get_all_tasks(show_completed, priority, offset, limit))
+                    )
+                for sort_by in ("id", "created_at", "priority"):
+                    for descending in (False, True):
+                        self.assertEqual(
+                            ids(self.service.get_all_tasks(show_completed, priority, 1, 3, sort_by, descending)),
+                            ids(memory.get_all_tasks(show_completed, priority, 1, 3, sort_by, descending))
+                        )
+        self.assertEqual(ids(self.service.search_tasks("DÉTAILS 3")), ids(memory.search_tasks("DÉTAILS 3")))
+
+    def test_migration_from_json(self):
+        """Test the one-shot migration from a JSON task file."""
+        json_file = os.path.join(self.temp_dir.name, "store.json")
+        memory = TaskService(json_file)
+        memory.add_task("First")
+        memory.add_task("Second", priority="high")
+        memory.complete_task(1)
+
+        store = open_sqlite_store(json_file)
+        self.assertEqual(
+            [task.to_dict() for task in store.get_all_tasks()],
+            [task.to_dict() for task in memory.get_all_tasks()]
+        )
+        store.close()
+
+        with self.assertRaises(StorageException):
+            migrate_json_to_sqlite(json_file, os.path.join(self.temp_dir.name, "store.db"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ Tests for Streamlit functionality in the application.
 
 import os
 import sys
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -45,7 +46,11 @@ class TestStreamlitFunctions(unittest.TestCase):
     def test_dark_mode_toggle_main(self, mock_rerun):
         """Test that dark mode toggle in main() triggers rerun."""
         # Import the main function
-        from src.app import main
+        from src.app import main, get_shared_task_service
+        
+        # Make sure main() builds the service from the patched TaskService
+        get_shared_task_service.clear()
+        self.addCleanup(get_shared_task_service.clear)
         
         # Mock session_state to simulate dark mode toggle
         with patch('streamlit.session_state') as mock_session_state:
@@ -61,6 +66,7 @@ class TestStreamlitFunctions(unittest.TestCase):
             mock_task_service.get_task.return_value = None
             mock_task_service.get_task_by_title.return_value = None
             mock_task_service.search_tasks.return_value = []
+            mock_task_service.count_tasks.return_value = 0
 
             # Mock sidebar toggle to return True (dark mode enabled)
             # Import our mock columns
@@ -117,6 +123,78 @@ class TestStreamlitFunctions(unittest.TestCase):
             self.assertIn('<style>', css_arg)
             self.assertIn('background-color: #121212', css_arg)
 
+    def test_task_service_shared_across_reruns(self):
+        """Test that the task store is loaded once and reused by later reruns."""
+        from src.app import get_shared_task_service
+
+        get_shared_task_service.clear()
+        try:
+            with patch('src.app.TaskService') as mock_task_service:
+                first_service, first_lock = get_shared_task_service("tasks.json")
+                second_service, second_lock = get_shared_task_service("tasks.json")
+
+                mock_task_service.assert_called_once_with("tasks.json")
+                self.assertIs(first_service, second_service)
+                self.assertIs(first_lock, second_lock)
+        finally:
+            get_shared_task_service.clear()
+
+    def test_sqlite_service_shared_across_reruns(self):
+        """Test that the SQLite store is opened once, for use from any thread."""
+        from src.app import get_shared_sqlite_service
+
+        get_shared_sqlite_service.clear()
+        try:
+            with patch('src.services.sqlite_task_service.open_sqlite_store') as mock_open:
+                first_service, first_lock = get_shared_sqlite_service("tasks.json")
+                second_service, second_lock = get_shared_sqlite_service("tasks.json")
+
+                mock_open.assert_called_once_with("tasks.json", check_same_thread=False)
+                self.assertIs(first_service, second_service)
+                self.assertIs(first_lock, second_lock)
+        finally:
+            get_shared_sqlite_service.clear()
+
+    def test_lock_held_only_during_service_calls(self):
+        """Test that LockedTaskService holds the lock for each call and releases it after."""
+        from src.app import LockedTaskService
+
+        lock = threading.Lock()
+        service = MagicMock()
+        service.count_tasks.side_effect = lambda **kwargs: lock.locked()
+        service.storage_file = "tasks.json"
+        locked_service = LockedTaskService(service, lock)
+
+        self.assertTrue(locked_service.count_tasks(show_completed=True))
+        service.count_tasks.assert_called_once_with(show_completed=True)
+        self.assertFalse(lock.locked())
+        self.assertEqual(locked_service.storage_file, "tasks.json")
+
+    def test_task_page_counts_and_fetches_under_one_lock(self):
+        """Test that the pager total and the page are read in one locked block."""
+        from src.app import LockedTaskService, display_tasks_page
+        from src.localization.translations import get_text
+        from tests.mock_columns import create_mock_columns
+
+        lock = threading.Lock()
+        service = MagicMock()
+        calls = []
+        service.refresh.side_effect = lambda: calls.append(("refresh", lock.locked()))
+        service.count_tasks.side_effect = lambda **kwargs: calls.append(("count", lock.locked())) or 3
+        service.get_all_tasks.side_effect = lambda **kwargs: calls.append(("page", lock.locked())) or []
+        selections = iter([get_text("all", "en"), "id", 25])
+
+        with patch('streamlit.header'), \
+             patch('streamlit.columns', side_effect=lambda n: create_mock_columns(n)), \
+             patch('streamlit.checkbox', return_value=False), \
+             patch('streamlit.selectbox', side_effect=lambda *args, **kwargs: next(selections)), \
+             patch('streamlit.number_input', return_value=1), \
+             patch('streamlit.caption'):
+            display_tasks_page(LockedTaskService(service, lock), "en")
+
+        self.assertEqual(calls, [("refresh", True), ("count", True), ("page", True)])
+        self.assertFalse(lock.locked())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for the Task model and the columnar TaskTable.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.task import Task, Priority, parse_timestamp, format_timestamp
+from src.models.task_table import TaskTable
+from src.utils.exceptions import InvalidTaskDataException, TaskNotFoundException
+
+
+class TestTask(unittest.TestCase):
+    """Test cases for the Task model."""
+
+    def test_dict_round_trip(self):
+        """Test that to_dict and from_dict keep the stored format unchanged."""
+        data = {
+            "id": 7,
+            "title": "Renew passport",
+            "description": "Before the trip",
+            "priority": "high",
+            "completed": True,
+            "created_at": "2025-04-11 10:29:17"
+        }
+        task = Task.from_dict(data)
+        self.assertEqual(task.to_dict(), data)
+        self.assertIs(type(task.to_dict()["priority"]), str)
+
+    def test_priority_is_shared(self):
+        """Test that known priorities map to enum members and other spellings are kept."""
+        self.assertIs(Task(1, "a", priority="high").priority, Priority.HIGH)
+        self.assertEqual(Task.from_dict({"id": 1, "title": "a", "priority": "High"}).to_dict()["priority"], "High")
+        self.assertEqual(Task(1, "a", priority="low").priority, "low")
+        self.assertEqual(Task(1, "a", priority="urgent").priority, "urgent")
+        self.assertEqual(str(Task(1, "a", priority="medium")), "Task 1: a (Active, medium priority)")
+
+    def test_timestamps(self):
+        """Test integer timestamp conversion and validation."""
+        self.assertEqual(parse_timestamp("1970-01-02 00:00:01"), 86401)
+        self.assertEqual(format_timestamp(parse_timestamp("2024-02-29 23:59:59")), "2024-02-29 23:59:59")
+        self.assertIsInstance(Task(1, "a").created_ts, int)
+        with self.assertRaises(InvalidTaskDataException):
+            parse_timestamp("yesterday")
+        with self.assertRaises(InvalidTaskDataException):
+            Task(1, "a", created_at=["2025-01-01"])
+
+    def test_stored_timestamps_round_trip(self):
+        """Test that created_at strings outside TIMESTAMP_FORMAT come back unchanged."""
+        cases = {
+            "yesterday": 0,
+            "2025-04-11T10:29:17": parse_timestamp("2025-04-11 10:29:17"),
+            "2025-04-11 10:29:17.250000": parse_timestamp("2025-04-11 10:29:17"),
+            "2025-04-11T10:29:17+02:00": parse_timestamp("2025-04-11 10:29:17"),
+            "2025-04-11": parse_timestamp("2025-04-11 00:00:00"),
+        }
+        for created_at, timestamp in cases.items():
+            with self.subTest(created_at=created_at):
+                data = {"id": 1, "title": "a", "description": "", "priority": "medium",
+                        "completed": False, "created_at": created_at}
+                task = Task.from_dict(data)
+                self.assertEqual(task.to_dict(), data)
+                self.assertEqual(task.created_ts, timestamp)
+                self.assertEqual(TaskTable.from_tasks([task]).get(1).to_dict(), data)
+
+    def test_slots(self):
+        """Test that tasks carry no per-instance dictionary."""
+        with self.assertRaises(AttributeError):
+            Task(1, "a").__dict__
+
+
+class TestTaskTable(unittest.TestCase):
+    """Test cases for TaskTable."""
+
+    def setUp(self):
+        self.tasks = [
+            Task(1, "One", "first", "low", False, "2025-01-01 08:00:00"),
+            Task(3, "Three", "", "high", True, "2025-01-02 09:30:00"),
+            Task(4, "Four", "x", "urgent", False, "2025-01-03 10:45:00"),
+            Task(5, "Five", "", "High", False, "2025-01-04T11:00:00.5"),
+        ]
+        self.table = TaskTable.from_tasks(self.tasks)
+
+    def test_round_trip(self):
+        """Test that rows materialize back into equivalent tasks."""
+        self.assertEqual(len(self.table), 4)
+        self.assertEqual(self.table.to_dicts(), [task.to_dict() for task in self.tasks])
+        self.assertEqual(TaskTable.from_dicts(self.table.to_dicts()).to_dicts(), self.table.to_dicts())
+
+    def test_lookup_and_filters(self):
+        """Test id lookup and column filters."""
+        self.assertEqual(self.table.get(3).title, "Three")
+        with self.assertRaises(TaskNotFoundException):
+            self.table.get(2)
+        self.assertEqual(self.table.rows(completed=False), [0, 2, 3])
+        self.assertEqual(self.table.rows(priority="HIGH"), [1, 3])
+        self.assertEqual(self.table.rows(completed=False, priority="urgent"), [2])
+        self.assertEqual(self.table.rows(priority="medium"), [])
+
+    def test_rows_must_ascend_and_priorities_are_unbounded(self):
+        """Test that out-of-order ids are rejected and many priorities fit."""
+        with self.assertRaises(InvalidTaskDataException):
+            self.table.append(Task(2, "Two"))
+        table = TaskTable.from_tasks(Task(i, "t", priority=f"level {i}") for i in range(1, 1001))
+        self.assertEqual(table.get(1000).priority, "level 1000")
+        self.assertEqual(table.rows(priority="LEVEL 300"), [299])
+
+
+if __name__ == "__main__":
+    unittest.main()
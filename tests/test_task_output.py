@@ -0,0 +1,107 @@
+"""
+Tests for the buffered task output formats.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.localization.translations import get_catalog
+from src.models.task import Task
+from src.utils import task_output
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts its write calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestTaskOutput(unittest.TestCase):
+    """Test cases for the task_output module."""
+
+    def setUp(self):
+        self.catalog = get_catalog("en")
+        self.tasks = [
+            Task(1, "Plain", "Nothing special", "high"),
+            Task(2, "Tab\there", "Line one\nline two, \"quoted\"", "low"),
+            Task(3, "Ünïcode \\ backslash", "", "medium"),
+        ]
+        self.tasks[1].completed = True
+
+    def test_table_matches_row_layout(self):
+        """Test the table header, rows and rules."""
+        out = io.StringIO()
+        self.assertEqual(task_output.write_table(self.tasks, out, self.catalog), 3)
+        lines = out.getvalue().split("\n")
+        self.assertEqual(lines[0], "=" * 60)
+        self.assertIn("Priority", lines[1])
+        self.assertEqual(lines[3], f"{1:^5}|{'Plain':^20}|{'High':^10}|{'Active':^10}|{self.tasks[0].created_at:^20}")
+        self.assertEqual(lines[-3:], ["=" * 60, "", ""])
+
+        out = io.StringIO()
+        task_output.write_table(self.tasks[:1], out, self.catalog, created_at=False)
+        self.assertEqual(out.getvalue().split("\n")[3], f"{1:^5}|{'Plain':^20}|{'High':^10}|{'Active':^10}")
+
+    def test_machine_formats_round_trip(self):
+        """Test that tsv, jsonl and csv keep one task per record and every field."""
+        out = io.StringIO()
+        task_output.write_jsonl(self.tasks, out)
+        self.assertEqual([json.loads(line) for line in out.getvalue().splitlines()],
+                         [task.to_dict() for task in self.tasks])
+
+        out = io.StringIO()
+        task_output.write_csv(self.tasks, out)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(rows[0], list(task_output.FIELDS))
+        self.assertEqual(rows[2][1:5], ["Tab\there", "Line one\nline two, \"quoted\"", "low", "true"])
+
+        out = io.StringIO()
+        task_output.write_tsv(self.tasks, out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[2].split("\t")[1:3], ["Tab\\there", "Line one\\nline two, \"quoted\""])
+        self.assertEqual(lines[3].split("\t")[1], "Ünïcode \\\\ backslash")
+
+        with self.assertRaises(ValueError):
+            task_output.write_tasks(self.tasks, out, "xml", self.catalog)
+
+    def test_rows_are_written_in_chunks(self):
+        """Test one write per chunk, and that a stream is consumed lazily."""
+        tasks = [Task(i, f"Task {i}") for i in range(1, 11)]
+        pulled = []
+
+        def stream():
+            for task in tasks:
+                pulled.append(task.id)
+                yield task
+
+        with patch.object(task_output, "CHUNK_ROWS", 4):
+            for output_format in task_output.OUTPUT_FORMATS:
+                with self.subTest(output_format=output_format):
+                    out = CountingStream()
+                    self.assertEqual(task_output.write_tasks(tasks, out, output_format, self.catalog), 10)
+                    # Three chunks, plus at most a header and a trailer
+                    self.assertLessEqual(out.writes, 5)
+
+            generator = stream()
+            chunks = task_output._chunks(generator)
+            self.assertEqual(len(next(chunks)), 4)
+            self.assertEqual(pulled, [1, 2, 3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
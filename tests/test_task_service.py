@@ -0,0 +1,602 @@
+"""
+Tests for the TaskService and its storage backends.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.task_service import TaskService
+from src.services.storage import JsonStorage, LogStorage, create_storage, SYNC_GROUP
+from src.utils.exceptions import TaskNotFoundException, StorageException, InvalidTaskDataException
+
+
+def _add_tasks_in_process(storage_file, backend, worker, count):
+    """Add tasks from a separate process through its own service instance."""
+    service = TaskService(storage_file, storage=create_storage(storage_file, backend))
+    for i in range(count):
+        service.add_task(f"Worker {worker} task {i}")
+    service.close()
+
+
+class TestTaskService(unittest.TestCase):
+    """Test cases for TaskService with the default JSON backend."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.json")
+        self.service = TaskService(self.storage_file, storage=JsonStorage(self.storage_file))
+
+    def tearDown(self):
+        self.service.close()
+        self.temp_dir.cleanup()
+
+    def test_add_and_get_task(self):
+        """Test adding a task and retrieving it by ID."""
+        task = self.service.add_task("Write tests", "Cover the service", "high")
+        self.assertEqual(task.id, 1)
+        self.assertIs(self.service.get_task_by_id(1), task)
+
+        with open(self.storage_file, "r") as f:
+            stored = json.load(f)
+        self.assertEqual(stored, [task.to_dict()])
+
+    def test_update_complete_and_delete(self):
+        """Test updating, completing and deleting tasks."""
+        first = self.service.add_task("First")
+        second = self.service.add_task("Second")
+
+        self.service.update_task(first.id, title="First (edited)", priority="low")
+        self.service.complete_task(second.id)
+        self.assertEqual(self.service.get_task_by_id(first.id).title, "First (edited)")
+        self.assertEqual(self.service.get_all_tasks(show_completed=False), [first])
+
+        self.service.delete_task(first.id)
+        with self.assertRaises(TaskNotFoundException):
+            self.service.get_task_by_id(first.id)
+
+    def test_id_index_stays_consistent(self):
+        """Test that ids are never reused and the task list follows deletes."""
+        for i in range(4):
+            self.service.add_task(f"Task {i}")
+        self.service.delete_task(4)
+        self.service.delete_task(2)
+
+        task = self.service.add_task("After deletes")
+        self.assertEqual(task.id, 5)
+        self.assertEqual([t.id for t in self.service.tasks], [1, 3, 5])
+        self.assertIs(self.service.get_task_by_id(5), task)
+
+        reloaded = TaskService(self.storage_file, storage=JsonStorage(self.storage_file))
+        self.assertEqual([t.id for t in reloaded.tasks], [1, 3, 5])
+        self.assertEqual(reloaded.add_task("Next").id, 6)
+
+    def test_pagination_applies_filters_first(self):
+        """Test that offset and limit page through the filtered tasks."""
+        for i in range(10):
+            self.service.add_task(f"Task {i}", priority="high" if i % 2 else "low")
+        self.service.complete_task(2)
+
+        self.assertEqual(self.service.count_tasks(show_completed=False, priority="high"), 4)
+        pages = [
+            [t.id for t in self.service.get_all_tasks(show_completed=False, priority="high", offset=offset, limit=3)]
+            for offset in (0, 3, 6)
+        ]
+        self.assertEqual(pages, [[4, 6, 8], [10], []])
+        self.assertEqual([t.id for t in self.service.get_all_tasks(offset=8)], [9, 10])
+
+    def test_query_follows_mutations(self):
+        """Test that status and priority queries see every kind of change."""
+        for i in range(6):
+            self.service.add_task(f"Task {i}", priority="high" if i % 2 else "low")
+        self.assertEqual([t.id for t in self.service.query(priority="HIGH")], [2, 4, 6])
+
+        self.service.complete_task(2)
+        self.service.update_task(3, priority="high")
+        self.service.delete_task(4)
+        self.service.add_task("Late", priority="high")
+
+        self.assertEqual([t.id for t in self.service.query(completed=False, priority="high")], [3, 6, 7])
+        self.assertEqual([t.id for t in self.service.query(completed=True)], [2])
+        self.assertEqual(self.service.count_tasks(show_completed=False, priority="low"), 2)
+
+        other = TaskService(self.storage_file, storage=JsonStorage(self.storage_file))
+        other.complete_task(6)
+        self.service.refresh()
+        self.assertEqual([t.id for t in self.service.query(completed=False, priority="high")], [3, 7])
+
+    def test_sorted_listing(self):
+        """Test sorting by creation time and priority, with filters and paging."""
+        specs = [("low", 300), ("high", 100), ("medium", 200), ("high", 300), ("urgent", 50)]
+        for i, (priority, created_ts) in enumerate(specs):
+            self.service.add_task(f"Task {i}", priority=priority)
+            self.service.get_task_by_id(i + 1).created_ts = created_ts
+
+        def ids(**kwargs):
+            return [t.id for t in self.service.get_all_tasks(**kwargs)]
+
+        self.assertEqual(ids(sort_by="created_at"), [5, 2, 3, 1, 4])
+        self.assertEqual(ids(sort_by="created_at", descending=True, limit=2), [4, 1])
+        self.assertEqual(ids(sort_by="priority"), [2, 4, 3, 1, 5])
+        self.assertEqual(ids(sort_by="id", descending=True, offset=1, limit=2), [4, 3])
+
+        self.service.complete_task(4)
+        self.service.update_task(1, priority="high")
+        self.service.add_task("Task 5", priority="medium")
+        self.assertEqual(ids(show_completed=False, sort_by="priority"), [1, 2, 3, 6, 5])
+        self.assertEqual(ids(show_completed=False, sort_by="created_at", descending=True, limit=3), [6, 1, 3])
+        self.assertEqual(ids(priority="high", sort_by="created_at", offset=1), [1, 4])
+        with self.assertRaises(ValueError):
+            self.service.get_all_tasks(sort_by="title")
+
+    def test_id_order_of_unsorted_store(self):
+        """Test that a store listing ids out of order, as after a hand edit or merge, lists by id."""
+        stored = [
+            {"id": i, "title": f"Task {i}", "description": "", "priority": "low", "completed": i == 2,
+             "created_at": "2025-01-01 00:00:00"}
+            for i in (3, 1, 4, 2)
+        ]
+        with open(self.storage_file, "w") as f:
+            json.dump(stored, f)
+        service = TaskService(self.storage_file)
+
+        def ids(**kwargs):
+            return [t.id for t in service.get_all_tasks(**kwargs)]
+
+        self.assertEqual(ids(), [1, 2, 3, 4])
+        self.assertEqual(ids(show_completed=False), [1, 3, 4])
+        self.assertEqual(ids(descending=True, limit=3), [4, 3, 2])
+        self.assertEqual(ids(offset=1, limit=2), [2, 3])
+
+        # Adding a task keeps the id order, and a store in order lists as it is
+        service.add_task("Task 5")
+        self.assertEqual(ids(), [1, 2, 3, 4, 5])
+        self.assertIs(self.service.get_all_tasks(), self.service.tasks)
+
+    def test_lazy_service_streams_tasks(self):
+        """Test that a lazy service iterates from storage and loads on demand."""
+        for i in range(5):
+            self.service.add_task(f"Task {i}")
+        self.service.complete_task(2)
+
+        lazy = TaskService(self.storage_file, storage=JsonStorage(self.storage_file), lazy=True)
+        self.assertNotIn("_tasks_by_id", lazy.__dict__)
+        self.assertEqual([t.id for t in lazy.iter_tasks(show_completed=False)], [1, 3, 4, 5])
+        self.assertNotIn("_tasks_by_id", lazy.__dict__)
+
+        self.assertEqual(lazy.add_task("Loaded").id, 6)
+        self.assertEqual([t.id for t in lazy.iter_tasks()], [1, 2, 3, 4, 5, 6])
+
+    def test_failed_save_keeps_previous_file(self):
+        """Test that a save interrupted mid-write leaves the old file intact."""
+        self.service.add_task("Safe")
+        with patch("src.services.storage._dump_records", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.service.add_task("Lost")
+
+        with open(self.storage_file, "r") as f:
+            self.assertEqual([t["title"] for t in json.load(f)], ["Safe"])
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ["tasks.json", "tasks.json.lock"])
+
+    def test_corrupted_file_is_not_overwritten(self):
+        """Test that a corrupted store raises instead of loading as empty."""
+        with open(self.storage_file, "w") as f:
+            f.write('[{"id": 1, "title": "Trunc')
+        with self.assertRaises(StorageException):
+            TaskService(self.storage_file, storage=JsonStorage(self.storage_file))
+        with self.assertRaises(StorageException):
+            JsonStorage(self.storage_file, durability=SYNC_GROUP)
+
+    def test_empty_file_is_an_empty_store(self):
+        """Test that an empty or blank task file, as made by touch, loads with no tasks."""
+        for backend in ("json", "log"):
+            for content in ("", " \n"):
+                with self.subTest(backend=backend, content=content):
+                    with open(self.storage_file, "w") as f:
+                        f.write(content)
+                    for name in os.listdir(self.temp_dir.name):
+                        if name != "tasks.json":
+                            os.remove(os.path.join(self.temp_dir.name, name))
+                    service = TaskService(self.storage_file, storage=create_storage(self.storage_file, backend))
+                    self.assertEqual(service.get_all_tasks(), [])
+                    self.assertEqual(service.add_task("First").id, 1)
+                    service.close()
+
+    def test_stored_timestamps_load_unchanged(self):
+        """Test that a store with created_at strings in other formats loads and saves them as they were."""
+        stored = [
+            {"id": 1, "title": "Old", "description": "", "priority": "High", "completed": False,
+             "created_at": "11/04/2025"},
+            {"id": 2, "title": "Precise", "description": "", "priority": "low", "completed": True,
+             "created_at": "2025-04-11T10:29:17.123456+02:00"},
+        ]
+        with open(self.storage_file, "w") as f:
+            json.dump(stored, f)
+        service = TaskService(self.storage_file, storage=JsonStorage(self.storage_file))
+        service.add_task("New")
+        with open(self.storage_file, "r") as f:
+            self.assertEqual(json.load(f)[:2], stored)
+        self.assertEqual([t.id for t in service.get_all_tasks(priority="high")], [1])
+        self.assertEqual([t.id for t in service.get_all_tasks(sort_by="priority")], [1, 3, 2])
+
+        stored[0]["created_at"] = 20250411
+        stored[1]["created_at"] = [2025, 4, 11]
+        with open(self.storage_file, "w") as f:
+            json.dump(stored, f)
+        with self.assertRaises(StorageException):
+            TaskService(self.storage_file, storage=JsonStorage(self.storage_file))
+
+    def test_batch_persists_once(self):
+        """Test that a batch of mutations writes the store a single time."""
+        self.service.add_task("Existing")
+        with patch.object(self.service.storage, "save", wraps=self.service.storage.save) as mock_save:
+            with self.service.batch():
+                for i in range(100):
+                    self.service.add_task(f"Task {i}")
+                self.service.complete_task(1)
+                self.service.delete_task(2)
+            self.assertEqual(mock_save.call_count, 1)
+
+        reloaded = TaskService(self.storage_file, storage=JsonStorage(self.storage_file))
+        self.assertEqual(len(reloaded.tasks), 100)
+        self.assertTrue(reloaded.get_task_by_id(1).completed)
+
+    def test_batch_rolls_back_on_error(self):
+        """Test that a failing batch leaves both memory and the store unchanged."""
+        self.service.add_task("Existing")
+        with self.assertRaises(TaskNotFoundException):
+            with self.service.batch():
+                self.service.add_task("Rolled back")
+                self.service.update_task(1, title="Rolled back too")
+                self.service.delete_task(99)
+
+        self.assertEqual([t.title for t in self.service.tasks], ["Existing"])
+        self.assertEqual(self.service.add_task("Next").id, 2)
+        with open(self.storage_file, "r") as f:
+            self.assertEqual([t["title"] for t in json.load(f)], ["Existing", "Next"])
+
+    def test_bulk_operations(self):
+        """Test bulk add, update and delete, including validation."""
+        added = self.service.bulk_add([{"title": f"Task {i}", "priority": "high"} for i in range(5)])
+        self.assertEqual([t.id for t in added], [1, 2, 3, 4, 5])
+
+        self.service.bulk_update([1, 3], completed=True)
+        self.assertEqual([t.id for t in self.service.get_all_tasks(show_completed=False)], [2, 4, 5])
+        with self.assertRaises(TaskNotFoundException):
+            self.service.bulk_update([2, 42], completed=True)
+        self.assertFalse(self.service.get_task_by_id(2).completed)
+
+        with self.assertRaises(InvalidTaskDataException):
+            self.service.bulk_add([{"title": "Fine"}, {"description": "No title"}])
+        self.assertEqual(len(self.service.tasks), 5)
+
+        self.service.bulk_delete([4, 5])
+        reloaded = TaskService(self.storage_file, storage=JsonStorage(self.storage_file))
+        self.assertEqual([(t.id, t.completed) for t in reloaded.tasks], [(1, True), (2, False), (3, True)])
+
+    def test_search_tasks(self):
+        """Test case-insensitive keyword search over titles and descriptions."""
+        self.service.add_task("Buy milk", "From the store")
+        self.service.add_task("Call Bob", "About the STORE opening")
+        self.service.add_task("Read book")
+
+        self.assertEqual([t.title for t in self.service.search_tasks("store")], ["Buy milk", "Call Bob"])
+        self.assertEqual(self.service.search_tasks("nothing"), [])
+
+
+class TestLogStorage(unittest.TestCase):
+    """Test cases for the append-only log storage backend."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _open(self, compact_threshold=1000, lazy=False):
+        storage = LogStorage(self.storage_file, compact_threshold=compact_threshold)
+        return TaskService(self.storage_file, storage=storage, lazy=lazy)
+
+    def test_mutations_append_to_log(self):
+        """Test that single mutations append to the log instead of rewriting the snapshot."""
+        service = self._open()
+        service.add_task("One")
+        service.add_task("Two")
+        service.complete_task(1)
+        service.delete_task(2)
+        service.close()
+
+        self.assertFalse(os.path.exists(self.storage_file))
+        with open(self.storage_file + ".log", "r") as f:
+            ops = [json.loads(line)["op"] for line in f]
+        self.assertEqual(ops, ["add", "add", "update", "delete"])
+
+    def test_replay_rebuilds_task_list(self):
+        """Test that replaying the log yields the same tasks as the live service."""
+        service = self._open()
+        for i in range(5):
+            service.add_task(f"Task {i}", priority="high" if i % 2 else "low")
+        service.update_task(3, description="changed")
+        service.complete_task(4)
+        service.delete_task(2)
+        expected = [task.to_dict() for task in service.tasks]
+        service.close()
+
+        reloaded = self._open()
+        self.assertEqual([task.to_dict() for task in reloaded.tasks], expected)
+        reloaded.close()
+
+    def test_compaction_writes_snapshot(self):
+        """Test that the log is folded into the snapshot at the threshold."""
+        service = self._open(compact_threshold=3)
+        for i in range(4):
+            service.add_task(f"Task {i}")
+        service.close()
+
+        with open(self.storage_file, "r") as f:
+            self.assertEqual(len(json.load(f)), 3)
+        with open(self.storage_file + ".log", "r") as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+        reloaded = self._open(compact_threshold=3)
+        self.assertEqual([task.title for task in reloaded.tasks], [f"Task {i}" for i in range(4)])
+        reloaded.close()
+
+    def test_lazy_mutations_skip_loading(self):
+        """Test that a lazy service appends single mutations without loading the store."""
+        service = self._open(compact_threshold=9)
+        service.bulk_add({"title": f"Task {i}", "description": "x" * 5000} for i in range(4))
+        service.close()
+
+        lazy = self._open(compact_threshold=9, lazy=True)
+        with patch.object(LogStorage, "load", side_effect=AssertionError("store was loaded")):
+            self.assertEqual(lazy.add_task("Appended").id, 5)
+            self.assertTrue(lazy.complete_task(2).completed)
+            self.assertEqual(lazy.delete_task(5).title, "Appended")
+            self.assertEqual(lazy.add_task("Reuses the id").id, 5)
+        self.assertNotIn("_tasks_by_id", vars(lazy))
+        # The next record reaches the compaction threshold, which needs every task
+        self.assertEqual(lazy.add_task("Compacts").id, 6)
+        self.assertIn("_tasks_by_id", vars(lazy))
+        lazy.close()
+
+        reloaded = self._open()
+        self.assertEqual(
+            [(task.id, task.title, task.completed) for task in reloaded.tasks],
+            [(1, "Task 0", False), (2, "Task 1", True), (3, "Task 2", False), (4, "Task 3", False),
+             (5, "Reuses the id", False), (6, "Compacts", False)]
+        )
+        reloaded.close()
+
+    def test_highest_id(self):
+        """Test highest_id on snapshots with long records and with a deleted last task."""
+        service = self._open()
+        service.bulk_add({"title": f"Task {i}", "description": "x" * 10000} for i in range(3))
+        service.compact()
+        self.assertEqual(service.storage.highest_id(), 3)
+        self.assertEqual(JsonStorage(self.storage_file).highest_id(), 3)
+        service.delete_task(3)
+        self.assertEqual(service.storage.highest_id(), 2)
+        service.close()
+        self.assertEqual(JsonStorage(os.path.join(self.temp_dir.name, "missing.json")).highest_id(), 0)
+
+    def test_lazy_add_to_unsorted_store(self):
+        """Test that a lazy add takes the next id after the highest, wherever it is stored."""
+        stored = [
+            {"id": i, "title": f"Task {i}", "description": "", "priority": "low", "completed": False,
+             "created_at": "2025-01-01 00:00:00"}
+            for i in (2, 7, 3)
+        ]
+        with open(self.storage_file, "w") as f:
+            json.dump(stored, f, indent=2)
+        self.assertEqual(JsonStorage(self.storage_file).highest_id(), 7)
+
+        lazy = self._open(lazy=True)
+        with patch.object(LogStorage, "load", side_effect=AssertionError("store was loaded")):
+            self.assertEqual(lazy.add_task("Appended").id, 8)
+            self.assertEqual(lazy.add_task("Appended again").id, 9)
+        lazy.close()
+
+    def test_streaming_matches_load(self):
+        """Test that streaming the snapshot plus log matches a full load."""
+        service = self._open(compact_threshold=4)
+        for i in range(6):
+            service.add_task(f"Task {i}")
+        service.update_task(1, title="Renamed")
+        service.delete_task(3)
+        service.add_task("Late")
+        service.close()
+
+        storage = LogStorage(self.storage_file, compact_threshold=4)
+        self.assertEqual(
+            [task.to_dict() for task in storage.iter_tasks()],
+            [task.to_dict() for task in storage.load()]
+        )
+        self.assertEqual([task.title for task in storage.load()][:2], ["Renamed", "Task 1"])
+
+    def test_torn_record_is_ignored(self):
+        """Test that a partially written trailing record is skipped on replay."""
+        service = self._open()
+        service.add_task("Kept")
+        service.close()
+        with open(self.storage_file + ".log", "a") as f:
+            f.write('{"op": "add", "task": {"id": 2, "ti')
+
+        reloaded = self._open()
+        self.assertEqual([task.title for task in reloaded.tasks], ["Kept"])
+        reloaded.add_task("Added after recovery")
+        reloaded.close()
+
+        recovered = self._open()
+        self.assertEqual([task.title for task in recovered.tasks], ["Kept", "Added after recovery"])
+        recovered.close()
+
+    def test_corrupt_record_is_logged_not_printed(self):
+        """Test that a complete but malformed record is reported through logging, not stdout."""
+        service = self._open()
+        service.add_task("Kept")
+        service.close()
+        with open(self.storage_file + ".log", "a") as f:
+            f.write('{"op": "add", "task": \n')
+
+        with patch('sys.stdout', new_callable=StringIO) as stdout, \
+                self.assertLogs("src.services.storage", level="WARNING") as logs:
+            reloaded = self._open()
+            self.assertEqual([task.title for task in reloaded.tasks], ["Kept"])
+        reloaded.close()
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertIn("Ignoring records after byte", logs.output[0])
+
+    def test_batch_is_one_log_record(self):
+        """Test that a batch is appended as a single record and replayed whole."""
+        service = self._open()
+        service.add_task("Before")
+        with service.batch():
+            service.add_task("In batch")
+            service.complete_task(1)
+        service.close()
+
+        with open(self.storage_file + ".log", "r") as f:
+            self.assertEqual([json.loads(line)["op"] for line in f], ["add", "batch"])
+
+        reloaded = self._open()
+        self.assertEqual([(t.title, t.completed) for t in reloaded.tasks], [("Before", True), ("In batch", False)])
+        reloaded.close()
+
+    def test_group_commit_batches_fsyncs(self):
+        """Test that group commit shares one fsync across several records."""
+        storage = LogStorage(self.storage_file, durability=SYNC_GROUP, group_commit_ops=4, group_commit_ms=20)
+        service = TaskService(self.storage_file, storage=storage)
+        with patch("src.services.storage.os.fsync") as mock_fsync:
+            for i in range(10):
+                service.add_task(f"Task {i}")
+            # One directory sync for the new log, then one per group of four
+            self.assertEqual(mock_fsync.call_count, 3)
+
+            # The remaining records are synced by the timer
+            time.sleep(0.2)
+            self.assertEqual(mock_fsync.call_count, 4)
+        service.close()
+
+        reloaded = self._open()
+        self.assertEqual(len(reloaded.tasks), 10)
+        reloaded.close()
+
+    def test_create_storage_rejects_unknown_backend(self):
+        """Test that backend selection validates the backend name."""
+        self.assertIsInstance(create_storage(self.storage_file, "log"), LogStorage)
+        with self.assertRaises(StorageException):
+            create_storage(self.storage_file, "carrier-pigeon")
+        with self.assertRaisesRegex(StorageException, "open_sqlite_store"):
+            create_storage(self.storage_file, "sqlite")
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """Test cases for several services writing to the same store."""
+
+    BACKENDS = ("json", "log")
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage_file = os.path.join(self.temp_dir.name, "tasks.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _open(self, backend):
+        return TaskService(self.storage_file, storage=create_storage(self.storage_file, backend))
+
+    def _reset(self):
+        for name in os.listdir(self.temp_dir.name):
+            os.remove(os.path.join(self.temp_dir.name, name))
+
+    def test_interleaved_adds_get_distinct_ids(self):
+        """Test that two stale services never hand out the same id."""
+        for backend in self.BACKENDS:
+            with self.subTest(backend=backend):
+                first, second = self._open(backend), self._open(backend)
+                first.add_task("From first")
+                second.add_task("From second")
+                first.add_task("First again")
+                self.assertEqual([t.id for t in first.tasks], [1, 2, 3])
+                first.close()
+                second.close()
+
+                reloaded = self._open(backend)
+                self.assertEqual(
+                    [t.title for t in reloaded.tasks],
+                    ["From first", "From second", "First again"]
+                )
+                reloaded.close()
+                self._reset()
+
+    def test_field_edits_merge(self):
+        """Test that edits to different fields of one task are both kept."""
+        for backend in self.BACKENDS:
+            with self.subTest(backend=backend):
+                first = self._open(backend)
+                first.add_task("Original")
+                second = self._open(backend)
+                first.update_task(1, title="Renamed")
+                task = second.complete_task(1)
+                self.assertEqual(task.title, "Renamed")
+                self.assertTrue(task.completed)
+                first.close()
+                second.close()
+
+                reloaded = self._open(backend)
+                self.assertEqual(reloaded.get_task_by_id(1).title, "Renamed")
+                self.assertTrue(reloaded.get_task_by_id(1).completed)
+                reloaded.close()
+                self._reset()
+
+    def test_update_of_deleted_task_is_rejected(self):
+        """Test that a task deleted elsewhere cannot be updated."""
+        for backend in self.BACKENDS:
+            with self.subTest(backend=backend):
+                first = self._open(backend)
+                first.add_task("Doomed")
+                second = self._open(backend)
+                first.delete_task(1)
+                with self.assertRaises(TaskNotFoundException):
+                    second.update_task(1, title="Too late")
+                self.assertEqual(second.tasks, [])
+                first.close()
+                second.close()
+                self._reset()
+
+    def test_parallel_processes(self):
+        """Test that tasks added from several processes are all kept."""
+        for backend in self.BACKENDS:
+            with self.subTest(backend=backend):
+                workers = [
+                    multiprocessing.Process(
+                        target=_add_tasks_in_process, args=(self.storage_file, backend, worker, 20)
+                    )
+                    for worker in range(4)
+                ]
+                for process in workers:
+                    process.start()
+                for process in workers:
+                    process.join()
+                    self.assertEqual(process.exitcode, 0)
+
+                service = self._open(backend)
+                self.assertEqual([t.id for t in service.tasks], list(range(1, 81)))
+                self.assertEqual(len({t.title for t in service.tasks}), 80)
+                service.close()
+                self._reset()
+
+
+if __name__ == "__main__":
+    unittest.main()